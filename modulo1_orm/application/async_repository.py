@@ -0,0 +1,251 @@
+import json
+from typing import AsyncIterator, Generic, TypeVar, Type, List, Optional
+from sqlalchemy import select, insert, delete, update
+
+from ..domain.entities import Estudante, Disciplina, Turma, Matricula
+from ..infrastructure.models import AsyncDatabase, EstudanteModel, DisciplinaModel, TurmaModel, MatriculaModel
+from ..infrastructure.redis_publisher import CrudOperation, OperationType, Source
+from ..infrastructure.async_redis_publisher import AsyncRedisPublisher, get_async_publisher
+from .mapper import get_mapper, ChangeTracker
+
+T = TypeVar('T')
+M = TypeVar('M')
+
+
+class AsyncRepository(Generic[T, M]):
+    """
+    Versão asyncio do Repository (SQLAlchemy asyncio + aiosqlite + redis.asyncio).
+    
+    Oferece a mesma API (create, create_many, load_from_id, load_all,
+    load_page, iter_all, update, delete) como corrotinas, sem bloquear o
+    event loop em I/O de SQLite ou Redis.
+    """
+    
+    def __init__(self, database: AsyncDatabase, entity_class: Type[T], model_class: Type[M], enable_crud_publishing: bool = True,
+                 redis_publisher: Optional[AsyncRedisPublisher] = None):
+        self.database = database
+        self.entity_class = entity_class
+        self.model_class = model_class
+        self.mapper = get_mapper(entity_class, model_class)
+        self.change_tracker = ChangeTracker()
+        self.enable_crud_publishing = enable_crud_publishing
+        # Publisher compartilhado do processo, a menos que outro seja injetado (fechado por quem o criou)
+        self.redis_publisher = (redis_publisher or get_async_publisher()) if enable_crud_publishing else None
+    
+    def _build_crud_operation(self, operation_type: OperationType, entity: T, payload: Optional[dict] = None) -> CrudOperation:
+        """Monta a operação CRUD publicada para a entidade (ou apenas para `payload`, se informado)"""
+        return CrudOperation(
+            entity=self.entity_class.__name__,
+            operation=operation_type,
+            source=Source.ORM,
+            data=json.dumps(payload if payload is not None else self.mapper.to_dict(entity), default=str)
+        )
+    
+    async def _publish_crud_operation(self, operation_type: OperationType, entity: T, payload: Optional[dict] = None) -> None:
+        """Publica operação CRUD no Redis"""
+        if not self.enable_crud_publishing or not self.redis_publisher:
+            return
+        
+        try:
+            await self.redis_publisher.publish_operation(self._build_crud_operation(operation_type, entity, payload))
+        except Exception as e:
+            print(f"❌ Erro ao publicar operação no Redis: {e}")
+    
+    async def _publish_crud_operations(self, operation_type: OperationType, entities: List[T]) -> None:
+        """Publica um lote de operações CRUD no Redis"""
+        if not self.enable_crud_publishing or not self.redis_publisher or not entities:
+            return
+        
+        try:
+            operations = [self._build_crud_operation(operation_type, entity) for entity in entities]
+            await self.redis_publisher.publish_operations(operations)
+        except Exception as e:
+            print(f"❌ Erro ao publicar lote de operações no Redis: {e}")
+    
+    async def create(self, entity: T) -> T:
+        """Cria uma nova entidade no banco de dados"""
+        values = self.mapper.to_dict(entity)
+        if values.get('id') is None:
+            values.pop('id', None)
+        
+        async with self.database.get_session() as session:
+            try:
+                result = await session.execute(insert(self.model_class).values(**values).returning(self.model_class.id))
+                entity.id = result.scalar_one()
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                print(f"❌ Erro ao criar entidade: {e}")
+                raise
+        
+        self.change_tracker.track(entity, self.mapper.to_dict(entity))
+        if self.enable_crud_publishing:
+            await self._publish_crud_operation(OperationType.CREATE, entity)
+        return entity
+    
+    async def create_many(self, entities: List[T]) -> List[int]:
+        """Cria várias entidades em uma única transação e retorna os IDs atribuídos"""
+        if not entities:
+            return []
+        
+        rows = []
+        for entity in entities:
+            row = self.mapper.to_dict(entity)
+            if row.get('id') is None:
+                row.pop('id', None)
+            rows.append(row)
+        
+        async with self.database.get_session() as session:
+            try:
+                statement = insert(self.model_class).returning(self.model_class.id, sort_by_parameter_order=True)
+                ids = list(await session.scalars(statement, rows))
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                print(f"❌ Erro ao criar entidades em lote: {e}")
+                raise
+        
+        for entity, entity_id in zip(entities, ids):
+            entity.id = entity_id
+            self.change_tracker.track(entity, self.mapper.to_dict(entity))
+        if self.enable_crud_publishing:
+            await self._publish_crud_operations(OperationType.CREATE, entities)
+        return ids
+    
+    async def load_from_id(self, entity_id: int) -> Optional[T]:
+        """Carrega entidade por ID"""
+        async with self.database.get_session() as session:
+            result = await session.execute(select(*self.mapper.columns).where(self.model_class.id == entity_id))
+            row = result.first()
+        
+        if row is None:
+            return None
+        entity = self.mapper.from_row(row)
+        self.change_tracker.track(entity, self.mapper.to_dict(entity))
+        return entity
+    
+    async def load_all(self) -> List[T]:
+        """Carrega todas as entidades"""
+        async with self.database.get_session() as session:
+            result = await session.execute(select(*self.mapper.columns))
+            return [self.mapper.from_row(row) for row in result.all()]
+    
+    async def _load_page_rows(self, after_id: Optional[int], limit: int) -> list:
+        """Busca uma página de linhas ordenada pela chave primária (keyset)"""
+        async with self.database.get_session() as session:
+            statement = select(*self.mapper.columns).order_by(self.model_class.id).limit(limit)
+            if after_id is not None:
+                statement = statement.where(self.model_class.id > after_id)
+            return (await session.execute(statement)).all()
+    
+    async def load_page(self, after_id: Optional[int] = None, limit: int = 100) -> List[T]:
+        """Carrega até `limit` entidades com ID maior que `after_id`, em ordem de ID"""
+        return [self.mapper.from_row(row) for row in await self._load_page_rows(after_id, limit)]
+    
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[T]:
+        """Itera sobre todas as entidades em lotes de `batch_size` (paginação keyset)"""
+        if batch_size <= 0:
+            raise ValueError("batch_size deve ser positivo")
+        
+        after_id = None
+        while True:
+            rows = await self._load_page_rows(after_id, batch_size)
+            if not rows:
+                return
+            after_id = rows[-1].id
+            for row in rows:
+                yield self.mapper.from_row(row)
+            if len(rows) < batch_size:
+                return
+    
+    async def update(self, entity: T) -> T:
+        """Atualiza uma entidade existente com um único UPDATE (apenas colunas alteradas, se rastreada; sem alterações, só confirma que existe)"""
+        values = self.mapper.to_dict(entity)
+        changes = self.change_tracker.changes(entity, values)
+        set_values = {key: value for key, value in (values if changes is None else changes).items() if key != 'id'}
+        
+        async with self.database.get_session() as session:
+            if not set_values:
+                # Nada mudou desde o último estado gravado: só confirma que a linha existe
+                result = await session.execute(select(self.model_class.id).where(self.model_class.id == entity.id))
+                if result.first() is None:
+                    raise ValueError(f"Entidade com ID {entity.id} não encontrada")
+                return entity
+            
+            try:
+                statement = (
+                    update(self.model_class)
+                    .where(self.model_class.id == entity.id)
+                    .values(**set_values)
+                    .execution_options(synchronize_session=False)
+                )
+                if (await session.execute(statement)).rowcount == 0:
+                    raise ValueError(f"Entidade com ID {entity.id} não encontrada")
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                print(f"❌ Erro ao atualizar entidade: {e}")
+                raise
+        
+        self.change_tracker.track(entity, values)
+        if self.enable_crud_publishing:
+            await self._publish_crud_operation(OperationType.UPDATE, entity, {"id": entity.id, **set_values})
+        return entity
+    
+    async def delete(self, entity: T) -> None:
+        """Remove uma entidade do banco de dados"""
+        async with self.database.get_session() as session:
+            try:
+                statement = (
+                    delete(self.model_class)
+                    .where(self.model_class.id == entity.id)
+                    .execution_options(synchronize_session=False)
+                )
+                deleted = (await session.execute(statement)).rowcount > 0
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                print(f"❌ Erro ao deletar entidade: {e}")
+                raise
+        
+        if deleted:
+            self.change_tracker.forget(entity)
+            if self.enable_crud_publishing:
+                await self._publish_crud_operation(OperationType.DELETE, entity)
+    
+    async def set_enable_crud_publishing(self, enable: bool) -> None:
+        """Habilita ou desabilita a publicação de eventos CRUD"""
+        self.enable_crud_publishing = enable
+        if enable and not self.redis_publisher:
+            self.redis_publisher = get_async_publisher()
+        elif not enable:
+            self.redis_publisher = None
+    
+    async def close(self) -> None:
+        """Solta o publisher do repositório (os compartilhados são fechados por close_async_publishers)"""
+        self.redis_publisher = None
+
+
+# Repositórios específicos
+class AsyncEstudanteRepository(AsyncRepository[Estudante, EstudanteModel]):
+    def __init__(self, database: AsyncDatabase, enable_crud_publishing: bool = True,
+                 redis_publisher: Optional[AsyncRedisPublisher] = None):
+        super().__init__(database, Estudante, EstudanteModel, enable_crud_publishing, redis_publisher)
+
+
+class AsyncDisciplinaRepository(AsyncRepository[Disciplina, DisciplinaModel]):
+    def __init__(self, database: AsyncDatabase, enable_crud_publishing: bool = True,
+                 redis_publisher: Optional[AsyncRedisPublisher] = None):
+        super().__init__(database, Disciplina, DisciplinaModel, enable_crud_publishing, redis_publisher)
+
+
+class AsyncTurmaRepository(AsyncRepository[Turma, TurmaModel]):
+    def __init__(self, database: AsyncDatabase, enable_crud_publishing: bool = True,
+                 redis_publisher: Optional[AsyncRedisPublisher] = None):
+        super().__init__(database, Turma, TurmaModel, enable_crud_publishing, redis_publisher)
+
+
+class AsyncMatriculaRepository(AsyncRepository[Matricula, MatriculaModel]):
+    def __init__(self, database: AsyncDatabase, enable_crud_publishing: bool = True,
+                 redis_publisher: Optional[AsyncRedisPublisher] = None):
+        super().__init__(database, Matricula, MatriculaModel, enable_crud_publishing, redis_publisher)
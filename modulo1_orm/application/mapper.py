@@ -0,0 +1,124 @@
+import dataclasses
+import threading
+import weakref
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union, get_args, get_origin, get_type_hints
+
+T = TypeVar('T')
+M = TypeVar('M')
+
+
+def _enum_class(hint: Any) -> Union[Type[Enum], None]:
+    """Retorna a classe Enum de uma anotação (inclusive Optional[Enum])"""
+    if isinstance(hint, type) and issubclass(hint, Enum):
+        return hint
+    if get_origin(hint) is Union:
+        for arg in get_args(hint):
+            enum_class = _enum_class(arg)
+            if enum_class:
+                return enum_class
+    return None
+
+
+def _enum_from_value(enum_class: Type[Enum]) -> Callable[[Any], Enum]:
+    """Cria um conversor valor -> membro do Enum com lookup em dicionário"""
+    members = {member.value: member for member in enum_class}
+    
+    def convert(value: Any) -> Enum:
+        member = members.get(value)
+        return member if member is not None else enum_class(value)
+    return convert
+
+
+class EntityMapper(Generic[T, M]):
+    """
+    Conversor pré-compilado entre uma entidade de domínio (dataclass) e seu
+    modelo SQLAlchemy. A lista de colunas, os campos Enum e seus conversores
+    são calculados uma única vez na construção, em vez de a cada linha.
+    """
+    
+    def __init__(self, entity_class: Type[T], model_class: Type[M]):
+        self.entity_class = entity_class
+        self.model_class = model_class
+        self.columns = list(model_class.__table__.columns)
+        self.column_names: Tuple[str, ...] = tuple(column.name for column in self.columns)
+        self.field_names: Tuple[str, ...] = tuple(field.name for field in dataclasses.fields(entity_class))
+        
+        hints = get_type_hints(entity_class)
+        enum_classes = {name: _enum_class(hints.get(name)) for name in self.field_names}
+        self.enum_fields: Tuple[str, ...] = tuple(name for name, enum_class in enum_classes.items() if enum_class)
+        self._enum_converters: List[Tuple[str, Callable[[Any], Enum]]] = [
+            (name, _enum_from_value(enum_classes[name])) for name in self.enum_fields
+        ]
+    
+    def to_dict(self, entity: T) -> Dict[str, Any]:
+        """Converte a entidade para um dicionário de colunas (Enums viram seus valores)"""
+        values = {name: getattr(entity, name) for name in self.field_names}
+        for name in self.enum_fields:
+            value = values[name]
+            if isinstance(value, Enum):
+                values[name] = value.value
+        return values
+    
+    def to_model(self, entity: T) -> M:
+        """Converte a entidade para uma instância do modelo"""
+        return self.model_class(**self.to_dict(entity))
+    
+    def from_values(self, values: Dict[str, Any]) -> T:
+        """Constrói a entidade a partir de um dicionário de colunas"""
+        for name, convert in self._enum_converters:
+            value = values.get(name)
+            if value is not None:
+                values[name] = convert(value)
+        return self.entity_class(**values)
+    
+    def from_model(self, model: M) -> T:
+        """Converte uma instância do modelo para a entidade"""
+        return self.from_values({name: getattr(model, name) for name in self.column_names})
+    
+    def from_row(self, row: Sequence[Any]) -> T:
+        """Converte uma tupla na ordem de `columns` (caminho rápido para cargas em lote)"""
+        return self.from_values(dict(zip(self.column_names, row)))
+
+
+class ChangeTracker:
+    """
+    Guarda o último estado persistido conhecido de cada entidade, para que
+    um update grave e publique apenas as colunas alteradas. As entradas são
+    indexadas por id() do objeto e removidas quando a entidade é coletada.
+    """
+    
+    def __init__(self):
+        self._snapshots: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def track(self, entity: Any, values: Dict[str, Any]) -> None:
+        """Registra `values` como o estado persistido da entidade"""
+        key = id(entity)
+        with self._lock:
+            if key not in self._snapshots:
+                weakref.finalize(entity, self._forget, key)
+            self._snapshots[key] = dict(values)
+    
+    def forget(self, entity: Any) -> None:
+        """Descarta o estado registrado da entidade"""
+        self._forget(id(entity))
+    
+    def _forget(self, key: int) -> None:
+        with self._lock:
+            self._snapshots.pop(key, None)
+    
+    def changes(self, entity: Any, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Retorna as colunas que diferem do estado registrado, ou None se a entidade não é rastreada"""
+        with self._lock:
+            snapshot = self._snapshots.get(id(entity))
+        if snapshot is None:
+            return None
+        return {name: value for name, value in values.items() if snapshot.get(name) != value}
+
+
+@lru_cache(maxsize=None)
+def get_mapper(entity_class: Type[T], model_class: Type[M]) -> EntityMapper[T, M]:
+    """Retorna o mapper compartilhado para o par (entidade, modelo)"""
+    return EntityMapper(entity_class, model_class)
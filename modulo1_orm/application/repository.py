@@ -1,57 +1,99 @@
+import copy
 import json
-from typing import Generic, TypeVar, Type, List, Optional
-from sqlalchemy.orm import Session
+from typing import Generic, TypeVar, Type, List, Optional, Iterator, Dict, Iterable
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from ..domain.entities import Estudante, Disciplina, Turma, Matricula
-from ..infrastructure.models import Database, EstudanteModel, DisciplinaModel, TurmaModel, MatriculaModel
-from ..infrastructure.redis_publisher import RedisPublisher, CrudOperation, OperationType, Source
+from ..domain.entities import Estudante, Disciplina, Turma, Matricula, StatusMatricula, MatriculaDetalhada, TurmaDetalhada
+from ..infrastructure.models import Database, EstudanteModel, DisciplinaModel, TurmaModel, MatriculaModel, OutboxEventModel
+from ..infrastructure.entity_cache import EntityCache
+from ..infrastructure.redis_publisher import CrudOperation, OperationType, Source, get_publisher
+from .mapper import get_mapper, ChangeTracker
 
 T = TypeVar('T')
 M = TypeVar('M')
 
+# Limite de parâmetros por cláusula IN (SQLite aceita no mínimo 999 variáveis)
+BULK_CHUNK_SIZE = 500
+
 
 class Repository(Generic[T, M]):
-    def __init__(self, database: Database, entity_class: Type[T], model_class: Type[M], enable_crud_publishing: bool = True):
+    def __init__(self, database: Database, entity_class: Type[T], model_class: Type[M], enable_crud_publishing: bool = True,
+                 use_outbox: bool = False):
         self.database = database
         self.entity_class = entity_class
         self.model_class = model_class
+        self.mapper = get_mapper(entity_class, model_class)
+        self.change_tracker = ChangeTracker()
         self.enable_crud_publishing = enable_crud_publishing
-        self.redis_publisher = RedisPublisher() if enable_crud_publishing else None
+        # Com outbox, os eventos são gravados na mesma transação e entregues pelo OutboxRelay
+        self.use_outbox = use_outbox
+        self.redis_publisher = get_publisher() if enable_crud_publishing and not use_outbox else None
+        self.cache: Optional[EntityCache] = None
+    
+    def _entity_to_dict(self, entity: T) -> dict:
+        """Converte entidade de domínio para dicionário de colunas"""
+        return self.mapper.to_dict(entity)
     
     def _entity_to_model(self, entity: T) -> M:
         """Converte entidade de domínio para modelo de banco de dados"""
-        entity_dict = entity.__dict__.copy()
-        if hasattr(entity, 'status_emprestimo_livros') and entity.status_emprestimo_livros:
-            entity_dict['status_emprestimo_livros'] = entity.status_emprestimo_livros.value
-        if hasattr(entity, 'status') and entity.status:
-            entity_dict['status'] = entity.status.value
-        return self.model_class(**entity_dict)
+        return self.mapper.to_model(entity)
     
     def _model_to_entity(self, model: M) -> T:
         """Converte modelo de banco de dados para entidade de domínio"""
-        model_dict = {c.name: getattr(model, c.name) for c in model.__table__.columns}
-        return self.entity_class(**model_dict)
+        return self.mapper.from_model(model)
     
-    def _publish_crud_operation(self, operation_type: OperationType, entity: T) -> None:
+    def _build_crud_operation(self, operation_type: OperationType, entity: T, payload: Optional[dict] = None) -> CrudOperation:
+        """Monta a operação CRUD publicada para a entidade (ou apenas para `payload`, se informado)"""
+        return CrudOperation(
+            entity=self.entity_class.__name__,
+            operation=operation_type,
+            source=Source.ORM,
+            data=json.dumps(payload if payload is not None else self.mapper.to_dict(entity), default=str)
+        )
+    
+    def _publish_crud_operation(self, operation_type: OperationType, entity: T, payload: Optional[dict] = None) -> None:
         """Publica operação CRUD no Redis"""
         if not self.enable_crud_publishing or not self.redis_publisher:
             return
         
         try:
-            entity_name = self.entity_class.__name__
-            entity_json = json.dumps(entity.__dict__, default=str)
-            
-            operation = CrudOperation(
-                entity=entity_name,
-                operation=operation_type,
-                source=Source.ORM,
-                data=entity_json
-            )
-            
+            operation = self._build_crud_operation(operation_type, entity, payload)
             self.redis_publisher.publish_operation(operation)
         except Exception as e:
             print(f"❌ Erro ao publicar operação no Redis: {e}")
     
+    def _publish_crud_operations(self, operation_type: OperationType, entities: List[T]) -> None:
+        """Publica um lote de operações CRUD no Redis"""
+        if not self.enable_crud_publishing or not self.redis_publisher or not entities:
+            return
+        
+        try:
+            operations = [self._build_crud_operation(operation_type, entity) for entity in entities]
+            self.redis_publisher.publish_operations(operations)
+        except Exception as e:
+            print(f"❌ Erro ao publicar lote de operações no Redis: {e}")
+    
+    def _enqueue_crud_operations(self, session: Session, operation_type: OperationType, entities: List[T],
+                                 payloads: Optional[List[dict]] = None) -> None:
+        """Grava operações CRUD no outbox, dentro da transação da sessão"""
+        if not self.enable_crud_publishing or not self.use_outbox or not entities:
+            return
+        
+        rows = []
+        for index, entity in enumerate(entities):
+            payload = payloads[index] if payloads is not None else None
+            operation = self._build_crud_operation(operation_type, entity, payload)
+            rows.append({
+                "entity": operation.entity,
+                "operation": operation.operation.value,
+                "source": operation.source.value,
+                "data": operation.data,
+                "timestamp": operation.timestamp
+            })
+        session.execute(insert(OutboxEventModel), rows)
+        print(f"📥 {len(rows)} evento(s) {self.entity_class.__name__} - {operation_type.value} enfileirado(s) no outbox")
+    
     def create(self, entity: T) -> T:
         """Cria uma nova entidade no banco de dados"""
         session = self.database.get_session()
@@ -59,15 +101,20 @@ class Repository(Generic[T, M]):
             print(f"🔍 Criando entidade: {entity}")
             model = self._entity_to_model(entity)
             session.add(model)
-            session.commit()
-            session.refresh(model)
+            session.flush()
             
             # Atualiza o ID da entidade
             entity.id = model.id
             
+            self._enqueue_crud_operations(session, OperationType.CREATE, [entity])
+            session.commit()
+            self._invalidate_cache([entity.id])
+            self.change_tracker.track(entity, self.mapper.to_dict(entity))
+            
             if self.enable_crud_publishing:
                 print(f"✅ Entidade criada: {entity}")
-                print(f"  - Operation: CREATE")
+                if not self.use_outbox:
+                    print(f"  - Operation: CREATE")
                 self._publish_crud_operation(OperationType.CREATE, entity)
             
             return entity
@@ -80,42 +127,113 @@ class Repository(Generic[T, M]):
     
     def load_from_id(self, entity_id: int) -> Optional[T]:
         """Carrega entidade por ID"""
+        cache = self.cache
+        if cache is not None:
+            cached = cache.get(entity_id)
+            if cached is not None:
+                entity = copy.copy(cached)
+                self.change_tracker.track(entity, self.mapper.to_dict(entity))
+                return entity
+            generation = cache.generation
+        
         session = self.database.get_session()
         try:
             model = session.query(self.model_class).filter_by(id=entity_id).first()
-            return self._model_to_entity(model) if model else None
+            entity = self._model_to_entity(model) if model else None
         finally:
             session.close()
+        
+        if entity is None:
+            return None
+        if cache is not None:
+            cache.put(entity_id, copy.copy(entity), generation)
+        self.change_tracker.track(entity, self.mapper.to_dict(entity))
+        return entity
     
     def load_all(self) -> List[T]:
         """Carrega todas as entidades"""
         session = self.database.get_session()
         try:
-            models = session.query(self.model_class).all()
-            return [self._model_to_entity(model) for model in models]
+            rows = session.execute(select(*self.mapper.columns)).all()
+            return [self.mapper.from_row(row) for row in rows]
         finally:
             session.close()
     
+    def _load_page_rows(self, after_id: Optional[int], limit: int) -> list:
+        """Busca uma página de linhas ordenada pela chave primária (keyset)"""
+        session = self.database.get_session()
+        try:
+            statement = select(*self.mapper.columns).order_by(self.model_class.id).limit(limit)
+            if after_id is not None:
+                statement = statement.where(self.model_class.id > after_id)
+            return session.execute(statement).all()
+        finally:
+            session.close()
+    
+    def load_page(self, after_id: Optional[int] = None, limit: int = 100) -> List[T]:
+        """Carrega até `limit` entidades com ID maior que `after_id`, em ordem de ID"""
+        return [self.mapper.from_row(row) for row in self._load_page_rows(after_id, limit)]
+    
+    def iter_all(self, batch_size: int = 1000) -> Iterator[T]:
+        """
+        Itera sobre todas as entidades em lotes de `batch_size`.
+        
+        Cada lote é lido em uma sessão curta por paginação keyset na chave
+        primária e convertido sob demanda, então o consumo de memória depende
+        apenas do tamanho do lote e não do tamanho da tabela.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size deve ser positivo")
+        
+        after_id = None
+        while True:
+            rows = self._load_page_rows(after_id, batch_size)
+            if not rows:
+                return
+            after_id = rows[-1].id
+            for row in rows:
+                yield self.mapper.from_row(row)
+            if len(rows) < batch_size:
+                return
+    
     def update(self, entity: T) -> T:
-        """Atualiza uma entidade existente"""
+        """
+        Atualiza uma entidade existente com um único UPDATE ... WHERE id = ?.
+        
+        Para entidades obtidas por create/load_from_id/update, apenas as
+        colunas alteradas desde então (ou por create_many/update_many) são
+        gravadas e publicadas no evento UPDATE (junto com o id); se nada
+        mudou, apenas confirma que a linha existe. Demais entidades gravam e
+        publicam todas as colunas.
+        """
+        values = self.mapper.to_dict(entity)
+        changes = self.change_tracker.changes(entity, values)
+        set_values = {key: value for key, value in (values if changes is None else changes).items() if key != 'id'}
+        
         session = self.database.get_session()
         try:
-            model = session.query(self.model_class).filter_by(id=entity.id).first()
-            if not model:
-                raise ValueError(f"Entidade com ID {entity.id} não encontrada")
+            if not set_values:
+                if entity.id is None or not self._existing_ids(session, [entity.id]):
+                    raise ValueError(f"Entidade com ID {entity.id} não encontrada")
+                return entity
             
-            # Atualiza os campos do modelo
-            for key, value in entity.__dict__.items():
-                if hasattr(model, key) and key != 'id':
-                    if hasattr(value, 'value'):  # Para enums
-                        setattr(model, key, value.value)
-                    else:
-                        setattr(model, key, value)
+            statement = (
+                update(self.model_class)
+                .where(self.model_class.id == entity.id)
+                .values(**set_values)
+                .execution_options(synchronize_session=False)
+            )
+            if session.execute(statement).rowcount == 0:
+                raise ValueError(f"Entidade com ID {entity.id} não encontrada")
             
+            payload = {"id": entity.id, **set_values}
+            self._enqueue_crud_operations(session, OperationType.UPDATE, [entity], [payload])
             session.commit()
+            self._invalidate_cache([entity.id])
+            self.change_tracker.track(entity, values)
             
             if self.enable_crud_publishing:
-                self._publish_crud_operation(OperationType.UPDATE, entity)
+                self._publish_crud_operation(OperationType.UPDATE, entity, payload)
             
             return entity
         except Exception as e:
@@ -129,10 +247,16 @@ class Repository(Generic[T, M]):
         """Remove uma entidade do banco de dados"""
         session = self.database.get_session()
         try:
-            model = session.query(self.model_class).filter_by(id=entity.id).first()
-            if model:
-                session.delete(model)
+            statement = (
+                delete(self.model_class)
+                .where(self.model_class.id == entity.id)
+                .execution_options(synchronize_session=False)
+            )
+            if session.execute(statement).rowcount > 0:
+                self._enqueue_crud_operations(session, OperationType.DELETE, [entity])
                 session.commit()
+                self._invalidate_cache([entity.id])
+                self.change_tracker.forget(entity)
                 
                 if self.enable_crud_publishing:
                     self._publish_crud_operation(OperationType.DELETE, entity)
@@ -143,32 +267,267 @@ class Repository(Generic[T, M]):
         finally:
             session.close()
     
+    def create_many(self, entities: List[T]) -> List[int]:
+        """Cria várias entidades em uma única transação e retorna os IDs atribuídos"""
+        if not entities:
+            return []
+        
+        session = self.database.get_session()
+        try:
+            rows = []
+            for entity in entities:
+                row = self._entity_to_dict(entity)
+                if row.get('id') is None:
+                    row.pop('id', None)
+                rows.append(row)
+            
+            statement = insert(self.model_class).returning(self.model_class.id, sort_by_parameter_order=True)
+            ids = list(session.scalars(statement, rows))
+            
+            for entity, entity_id in zip(entities, ids):
+                entity.id = entity_id
+            
+            self._enqueue_crud_operations(session, OperationType.CREATE, entities)
+            session.commit()
+            self._invalidate_cache(ids)
+            self._track_many(entities)
+            
+            if self.enable_crud_publishing:
+                print(f"✅ {len(ids)} entidades criadas em lote")
+                self._publish_crud_operations(OperationType.CREATE, entities)
+            
+            return ids
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Erro ao criar entidades em lote: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def update_many(self, entities: List[T]) -> List[T]:
+        """Atualiza várias entidades existentes em uma única transação"""
+        if not entities:
+            return []
+        
+        ids = [entity.id for entity in entities]
+        if any(entity_id is None for entity_id in ids):
+            raise ValueError("ID da entidade é obrigatório para atualização")
+        
+        session = self.database.get_session()
+        try:
+            found = self._existing_ids(session, ids)
+            missing = [entity_id for entity_id in ids if entity_id not in found]
+            if missing:
+                raise ValueError(f"Entidades com IDs {missing} não encontradas")
+            
+            rows = [self._entity_to_dict(entity) for entity in entities]
+            session.execute(update(self.model_class), rows)
+            self._enqueue_crud_operations(session, OperationType.UPDATE, entities)
+            session.commit()
+            self._invalidate_cache(ids)
+            self._track_many(entities)
+            
+            if self.enable_crud_publishing:
+                self._publish_crud_operations(OperationType.UPDATE, entities)
+            
+            return entities
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Erro ao atualizar entidades em lote: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def delete_many(self, entities: List[T]) -> List[int]:
+        """Remove várias entidades em uma única transação e retorna os IDs removidos"""
+        ids = [entity.id for entity in entities if entity.id is not None]
+        if not ids:
+            return []
+        
+        session = self.database.get_session()
+        try:
+            deleted_ids = []
+            for start in range(0, len(ids), BULK_CHUNK_SIZE):
+                chunk = ids[start:start + BULK_CHUNK_SIZE]
+                statement = (
+                    delete(self.model_class)
+                    .where(self.model_class.id.in_(chunk))
+                    .returning(self.model_class.id)
+                )
+                deleted_ids.extend(session.scalars(statement))
+            
+            deleted = set(deleted_ids)
+            deleted_entities = [entity for entity in entities if entity.id in deleted]
+            self._enqueue_crud_operations(session, OperationType.DELETE, deleted_entities)
+            session.commit()
+            self._invalidate_cache(deleted_ids)
+            for entity in deleted_entities:
+                self.change_tracker.forget(entity)
+            
+            if self.enable_crud_publishing:
+                self._publish_crud_operations(OperationType.DELETE, deleted_entities)
+            
+            return deleted_ids
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Erro ao deletar entidades em lote: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def _track_many(self, entities: List[T]) -> None:
+        """Registra o estado recém-gravado das entidades no change tracker"""
+        for entity in entities:
+            self.change_tracker.track(entity, self.mapper.to_dict(entity))
+    
+    def _existing_ids(self, session: Session, ids: List[int]) -> set:
+        """Retorna o subconjunto de IDs que existe na tabela"""
+        found = set()
+        for start in range(0, len(ids), BULK_CHUNK_SIZE):
+            chunk = ids[start:start + BULK_CHUNK_SIZE]
+            found.update(session.scalars(
+                select(self.model_class.id).where(self.model_class.id.in_(chunk))
+            ))
+        return found
+    
+    def _invalidate_cache(self, ids: List[int]) -> None:
+        """Remove do cache as entidades alteradas"""
+        if self.cache is not None:
+            self.cache.invalidate(ids)
+    
+    def enable_cache(self, max_size: int = 1024, ttl: Optional[float] = 60.0) -> None:
+        """Habilita o cache LRU de load_from_id (desabilitado por padrão)"""
+        self.cache = EntityCache(max_size=max_size, ttl=ttl)
+    
+    def disable_cache(self) -> None:
+        """Desabilita e descarta o cache de load_from_id"""
+        self.cache = None
+    
+    def cache_stats(self) -> Optional[dict]:
+        """Retorna os contadores do cache, ou None se estiver desabilitado"""
+        return self.cache.stats() if self.cache is not None else None
+    
     def set_enable_crud_publishing(self, enable: bool) -> None:
         """Habilita ou desabilita a publicação de eventos CRUD"""
         self.enable_crud_publishing = enable
+        if self.use_outbox:
+            return
         if enable and not self.redis_publisher:
-            self.redis_publisher = RedisPublisher()
-        elif not enable and self.redis_publisher:
-            self.redis_publisher.close()
+            self.redis_publisher = get_publisher()
+        elif not enable:
+            # O publisher é o compartilhado do processo (fechado por close_publishers)
             self.redis_publisher = None
 
 
 # Repositórios específicos
 class EstudanteRepository(Repository[Estudante, EstudanteModel]):
-    def __init__(self, database: Database, enable_crud_publishing: bool = True):
-        super().__init__(database, Estudante, EstudanteModel, enable_crud_publishing)
+    def __init__(self, database: Database, enable_crud_publishing: bool = True, use_outbox: bool = False):
+        super().__init__(database, Estudante, EstudanteModel, enable_crud_publishing, use_outbox)
+    
+    def _creditos_statement(self, status: Optional[StatusMatricula]):
+        """SELECT estudante_id, SUM(creditos) sobre matriculas -> turmas -> disciplinas"""
+        statement = (
+            select(MatriculaModel.estudante_id, func.sum(DisciplinaModel.creditos))
+            .join(TurmaModel, MatriculaModel.turma_id == TurmaModel.id)
+            .join(DisciplinaModel, TurmaModel.disciplina_id == DisciplinaModel.id)
+            .group_by(MatriculaModel.estudante_id)
+        )
+        if status is not None:
+            statement = statement.where(MatriculaModel.status == status.value)
+        return statement
+    
+    def total_creditos(self, estudante_id: int, status: Optional[StatusMatricula] = StatusMatricula.ATIVA) -> int:
+        """Soma, no banco, os créditos das disciplinas em que o estudante está matriculado"""
+        return self.creditos_por_estudante([estudante_id], status).get(estudante_id, 0)
+    
+    def creditos_por_estudante(self, estudante_ids: Optional[Iterable[int]] = None,
+                               status: Optional[StatusMatricula] = StatusMatricula.ATIVA) -> Dict[int, int]:
+        """Retorna {estudante_id: total de créditos} calculado com GROUP BY no banco"""
+        session = self.database.get_session()
+        try:
+            statement = self._creditos_statement(status)
+            if estudante_ids is None:
+                return {estudante_id: total for estudante_id, total in session.execute(statement)}
+            
+            ids = list(estudante_ids)
+            totals = {}
+            for start in range(0, len(ids), BULK_CHUNK_SIZE):
+                chunk = ids[start:start + BULK_CHUNK_SIZE]
+                rows = session.execute(statement.where(MatriculaModel.estudante_id.in_(chunk)))
+                totals.update({estudante_id: total for estudante_id, total in rows})
+            return totals
+        finally:
+            session.close()
 
 
 class DisciplinaRepository(Repository[Disciplina, DisciplinaModel]):
-    def __init__(self, database: Database, enable_crud_publishing: bool = True):
-        super().__init__(database, Disciplina, DisciplinaModel, enable_crud_publishing)
+    def __init__(self, database: Database, enable_crud_publishing: bool = True, use_outbox: bool = False):
+        super().__init__(database, Disciplina, DisciplinaModel, enable_crud_publishing, use_outbox)
 
 
 class TurmaRepository(Repository[Turma, TurmaModel]):
-    def __init__(self, database: Database, enable_crud_publishing: bool = True):
-        super().__init__(database, Turma, TurmaModel, enable_crud_publishing)
+    def __init__(self, database: Database, enable_crud_publishing: bool = True, use_outbox: bool = False):
+        super().__init__(database, Turma, TurmaModel, enable_crud_publishing, use_outbox)
+        self.disciplina_mapper = get_mapper(Disciplina, DisciplinaModel)
+        self.estudante_mapper = get_mapper(Estudante, EstudanteModel)
+    
+    def load_roster(self, turma_id: int, status: Optional[StatusMatricula] = StatusMatricula.ATIVA) -> Optional[TurmaDetalhada]:
+        """
+        Carrega a turma com sua disciplina e os estudantes matriculados.
+        
+        A disciplina vem no mesmo SELECT (joined) e os estudantes em uma única
+        consulta adicional (selectin), em vez de um SELECT por matrícula.
+        """
+        session = self.database.get_session()
+        try:
+            model = session.scalars(
+                select(TurmaModel)
+                .where(TurmaModel.id == turma_id)
+                .options(
+                    joinedload(TurmaModel.disciplina),
+                    selectinload(TurmaModel.matriculas).joinedload(MatriculaModel.estudante)
+                )
+            ).first()
+            if model is None:
+                return None
+            
+            estudantes = [
+                self.estudante_mapper.from_model(matricula.estudante)
+                for matricula in sorted(model.matriculas, key=lambda m: m.estudante_id)
+                if status is None or matricula.status == status.value
+            ]
+            return TurmaDetalhada(
+                turma=self.mapper.from_model(model),
+                disciplina=self.disciplina_mapper.from_model(model.disciplina),
+                estudantes=estudantes
+            )
+        finally:
+            session.close()
 
 
 class MatriculaRepository(Repository[Matricula, MatriculaModel]):
-    def __init__(self, database: Database, enable_crud_publishing: bool = True):
-        super().__init__(database, Matricula, MatriculaModel, enable_crud_publishing)
\ No newline at end of file
+    def __init__(self, database: Database, enable_crud_publishing: bool = True, use_outbox: bool = False):
+        super().__init__(database, Matricula, MatriculaModel, enable_crud_publishing, use_outbox)
+        self.turma_mapper = get_mapper(Turma, TurmaModel)
+        self.disciplina_mapper = get_mapper(Disciplina, DisciplinaModel)
+    
+    def load_by_estudante(self, estudante_id: int) -> List[MatriculaDetalhada]:
+        """Carrega as matrículas do estudante com turma e disciplina em um único SELECT (joined)"""
+        session = self.database.get_session()
+        try:
+            models = session.scalars(
+                select(MatriculaModel)
+                .where(MatriculaModel.estudante_id == estudante_id)
+                .order_by(MatriculaModel.id)
+                .options(joinedload(MatriculaModel.turma).joinedload(TurmaModel.disciplina))
+            ).all()
+            return [
+                MatriculaDetalhada(
+                    matricula=self.mapper.from_model(model),
+                    turma=self.turma_mapper.from_model(model.turma),
+                    disciplina=self.disciplina_mapper.from_model(model.turma.disciplina)
+                )
+                for model in models
+            ]
+        finally:
+            session.close()
\ No newline at end of file
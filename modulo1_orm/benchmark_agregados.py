@@ -0,0 +1,131 @@
+"""
+Benchmark das consultas de agregados sobre 100k matrículas sintéticas
+
+Compara, para uma amostra de estudantes e turmas:
+- matrículas do estudante: carga preguiçosa (N+1) x load_by_estudante (joined)
+- lista da turma: carga preguiçosa (N+1) x load_roster (joined + selectin)
+- créditos: soma em Python sobre os relacionamentos x total_creditos (SQL)
+e repete as consultas otimizadas sem os índices das chaves estrangeiras.
+
+Uso (a partir da raiz do projeto):
+    python modulo1_orm/benchmark_agregados.py [--matriculas 100000] [--amostra 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sqlalchemy import insert, select, text
+
+from modulo1_orm.infrastructure.models import Database, EstudanteModel, DisciplinaModel, TurmaModel, MatriculaModel
+from modulo1_orm.application.repository import EstudanteRepository, TurmaRepository, MatriculaRepository
+
+
+def popular(db: Database, total_matriculas: int) -> None:
+    """Insere disciplinas, turmas, estudantes e matrículas com INSERTs em lote"""
+    total_estudantes = max(1, total_matriculas // 5)
+    total_disciplinas = 200
+    total_turmas = 1000
+    rng = random.Random(42)
+    
+    with db.engine.begin() as connection:
+        connection.execute(insert(DisciplinaModel), [
+            {"nome": f"Disciplina {i}", "codigo": f"D{i:04d}", "creditos": rng.choice([2, 4, 6])}
+            for i in range(total_disciplinas)
+        ])
+        connection.execute(insert(TurmaModel), [
+            {"codigo": f"T{i:04d}", "disciplina_id": rng.randint(1, total_disciplinas), "semestre": "2024.1",
+             "professor": f"Professor {i % 97}"}
+            for i in range(total_turmas)
+        ])
+        connection.execute(insert(EstudanteModel), [
+            {"nome_completo": f"Estudante {i}", "data_de_nascimento": "01/01/2000", "matricula": i,
+             "status_emprestimo_livros": "QUITADO"}
+            for i in range(total_estudantes)
+        ])
+        connection.execute(insert(MatriculaModel), [
+            {"estudante_id": rng.randint(1, total_estudantes), "turma_id": rng.randint(1, total_turmas),
+             "status": "ATIVA", "data_matricula": "01/02/2024"}
+            for _ in range(total_matriculas)
+        ])
+
+
+def lazy_matriculas(db: Database, estudante_id: int) -> int:
+    session = db.get_session()
+    try:
+        models = session.scalars(select(MatriculaModel).where(MatriculaModel.estudante_id == estudante_id)).all()
+        return sum(len(m.turma.disciplina.nome) for m in models)
+    finally:
+        session.close()
+
+
+def lazy_roster(db: Database, turma_id: int) -> int:
+    session = db.get_session()
+    try:
+        turma = session.get(TurmaModel, turma_id)
+        return len(turma.disciplina.nome) + sum(len(m.estudante.nome_completo) for m in turma.matriculas)
+    finally:
+        session.close()
+
+
+def lazy_creditos(db: Database, estudante_id: int) -> int:
+    session = db.get_session()
+    try:
+        estudante = session.get(EstudanteModel, estudante_id)
+        return sum(m.turma.disciplina.creditos for m in estudante.matriculas if m.status == "ATIVA")
+    finally:
+        session.close()
+
+
+def medir(nome: str, func, ids) -> None:
+    start = time.perf_counter()
+    for entity_id in ids:
+        func(entity_id)
+    elapsed = time.perf_counter() - start
+    print(f"{nome:46} {elapsed / len(ids) * 1000:9.3f} ms/consulta")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de consultas de agregados")
+    parser.add_argument("--matriculas", type=int, default=100_000)
+    parser.add_argument("--amostra", type=int, default=200)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "bench_agregados.db"))
+        popular(db, args.matriculas)
+        
+        estudante_repo = EstudanteRepository(db, enable_crud_publishing=False)
+        turma_repo = TurmaRepository(db, enable_crud_publishing=False)
+        matricula_repo = MatriculaRepository(db, enable_crud_publishing=False)
+        
+        rng = random.Random(7)
+        estudantes = [rng.randint(1, max(1, args.matriculas // 5)) for _ in range(args.amostra)]
+        turmas = [rng.randint(1, 1000) for _ in range(args.amostra)]
+        
+        print(f"📊 {args.matriculas} matrículas, amostra de {args.amostra} consultas")
+        medir("matrículas do estudante: lazy (N+1)", lambda i: lazy_matriculas(db, i), estudantes)
+        medir("matrículas do estudante: load_by_estudante", matricula_repo.load_by_estudante, estudantes)
+        medir("turma: lazy (N+1)", lambda i: lazy_roster(db, i), turmas)
+        medir("turma: load_roster", turma_repo.load_roster, turmas)
+        medir("créditos: soma em Python", lambda i: lazy_creditos(db, i), estudantes)
+        medir("créditos: total_creditos (SQL)", estudante_repo.total_creditos, estudantes)
+        
+        with db.engine.begin() as connection:
+            for index in ("ix_matriculas_estudante_id", "ix_matriculas_turma_id", "ix_turmas_disciplina_id"):
+                connection.execute(text(f"DROP INDEX {index}"))
+        print("🔻 sem índices nas chaves estrangeiras")
+        medir("matrículas do estudante: load_by_estudante", matricula_repo.load_by_estudante, estudantes)
+        medir("turma: load_roster", turma_repo.load_roster, turmas)
+        medir("créditos: total_creditos (SQL)", estudante_repo.total_creditos, estudantes)
+        
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
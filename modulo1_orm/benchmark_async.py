@@ -0,0 +1,141 @@
+"""
+Benchmark de concorrência: AsyncRepository x Repository em thread pool
+
+Executa a mesma carga (create seguido de load_from_id) com N operações
+concorrentes, uma vez com o AsyncEstudanteRepository em asyncio e outra com
+o EstudanteRepository síncrono em um ThreadPoolExecutor, e reporta
+operações por segundo e a latência p99 de cada operação. Para as variantes
+executadas em um event loop, mede também o maior atraso do loop (o tempo
+em que outras corrotinas ficariam sem executar), comparando com o
+repositório síncrono chamado diretamente dentro do loop.
+
+Uso (a partir da raiz do projeto):
+    python modulo1_orm/benchmark_async.py [--operacoes 5000] [--concorrencia 32]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modulo1_orm.infrastructure.models import Database, AsyncDatabase
+from modulo1_orm.application.repository import EstudanteRepository
+from modulo1_orm.application.async_repository import AsyncEstudanteRepository
+from modulo1_orm.domain.entities import Estudante
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def novo_estudante(matricula: int) -> Estudante:
+    return Estudante(nome_completo=f"Estudante {matricula}", data_de_nascimento="01/01/2000", matricula=matricula)
+
+
+def relatar(nome: str, operacoes: int, elapsed: float, latencies, loop_lag: float = None) -> None:
+    lag = f"   atraso máx. do loop {loop_lag * 1000:8.2f} ms" if loop_lag is not None else ""
+    print(f"{nome:28} {operacoes / elapsed:10.0f} ops/s   p99 {percentile(latencies, 0.99) * 1000:8.2f} ms{lag}")
+
+
+async def medir_atraso_do_loop(stop: asyncio.Event, intervalo: float = 0.005) -> float:
+    """Retorna o maior atraso observado entre o tick esperado e o real do event loop"""
+    maior = 0.0
+    while not stop.is_set():
+        esperado = time.perf_counter() + intervalo
+        await asyncio.sleep(intervalo)
+        maior = max(maior, time.perf_counter() - esperado)
+    return maior
+
+
+def executar_sync(db_path: str, operacoes: int, concorrencia: int) -> None:
+    db = Database(db_path)
+    repo = EstudanteRepository(db, enable_crud_publishing=False)
+    latencies = []
+    
+    def operacao(i: int) -> None:
+        start = time.perf_counter()
+        created = repo.create(novo_estudante(i))
+        repo.load_from_id(created.id)
+        latencies.append(time.perf_counter() - start)
+    
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            list(executor.map(operacao, range(operacoes)))
+        elapsed = time.perf_counter() - start
+    db.close()
+    relatar(f"sync + {concorrencia} threads", operacoes, elapsed, latencies)
+
+
+async def executar_async(db_path: str, operacoes: int, concorrencia: int) -> None:
+    db = AsyncDatabase(db_path)
+    await db.create_tables()
+    repo = AsyncEstudanteRepository(db, enable_crud_publishing=False)
+    semaphore = asyncio.Semaphore(concorrencia)
+    latencies = []
+    
+    async def operacao(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            created = await repo.create(novo_estudante(i))
+            await repo.load_from_id(created.id)
+            latencies.append(time.perf_counter() - start)
+    
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(medir_atraso_do_loop(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(operacao(i) for i in range(operacoes)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    loop_lag = await ticker
+    await db.close()
+    relatar(f"asyncio ({concorrencia} em voo)", operacoes, elapsed, latencies, loop_lag)
+
+
+async def executar_sync_no_loop(db_path: str, operacoes: int) -> None:
+    """Repositório síncrono chamado direto de corrotinas, bloqueando o event loop"""
+    db = Database(db_path)
+    repo = EstudanteRepository(db, enable_crud_publishing=False)
+    latencies = []
+    
+    async def operacao(i: int) -> None:
+        start = time.perf_counter()
+        created = repo.create(novo_estudante(i))
+        repo.load_from_id(created.id)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+    
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(medir_atraso_do_loop(stop))
+    await asyncio.sleep(0)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        await asyncio.gather(*(operacao(i) for i in range(operacoes)))
+        elapsed = time.perf_counter() - start
+    stop.set()
+    loop_lag = await ticker
+    db.close()
+    relatar("sync direto no event loop", operacoes, elapsed, latencies, loop_lag)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AsyncRepository x Repository")
+    parser.add_argument("--operacoes", type=int, default=5000)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        executar_sync(os.path.join(tmpdir, "bench_sync.db"), args.operacoes, args.concorrencia)
+        asyncio.run(executar_async(os.path.join(tmpdir, "bench_async.db"), args.operacoes, args.concorrencia))
+        asyncio.run(executar_sync_no_loop(os.path.join(tmpdir, "bench_sync_loop.db"), args.operacoes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark do EntityMapper pré-compilado
+
+Compara, em linhas por segundo, a conversão genérica por reflexão usada
+antes (cópia de __dict__ + hasattr, varredura de __table__.columns a cada
+linha) com o mapper construído uma vez por par entidade/modelo, incluindo o
+caminho por tupla usado nas cargas em lote.
+
+Uso (a partir da raiz do projeto):
+    python modulo1_orm/benchmark_mapper.py [--rows 200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modulo1_orm.application.mapper import get_mapper
+from modulo1_orm.infrastructure.models import MatriculaModel
+from modulo1_orm.domain.entities import Matricula, StatusMatricula
+
+
+def reflexao_entity_to_model(entity):
+    entity_dict = entity.__dict__.copy()
+    if hasattr(entity, 'status_emprestimo_livros') and entity.status_emprestimo_livros:
+        entity_dict['status_emprestimo_livros'] = entity.status_emprestimo_livros.value
+    if hasattr(entity, 'status') and entity.status:
+        entity_dict['status'] = entity.status.value
+    return MatriculaModel(**entity_dict)
+
+
+def reflexao_model_to_entity(model):
+    model_dict = {c.name: getattr(model, c.name) for c in model.__table__.columns}
+    return Matricula(**model_dict)
+
+
+def medir(nome: str, func, items) -> None:
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    elapsed = time.perf_counter() - start
+    print(f"{nome:34} {len(items) / elapsed:14,.0f} linhas/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark do EntityMapper")
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    
+    mapper = get_mapper(Matricula, MatriculaModel)
+    entities = [
+        Matricula(id=i, estudante_id=i, turma_id=i % 50, status=StatusMatricula.ATIVA, data_matricula="01/02/2024")
+        for i in range(args.rows)
+    ]
+    models = [mapper.to_model(entity) for entity in entities]
+    rows = [tuple(getattr(model, name) for name in mapper.column_names) for model in models]
+    
+    print("entidade -> modelo")
+    medir("  reflexão (__dict__ + hasattr)", reflexao_entity_to_model, entities)
+    medir("  EntityMapper.to_model", mapper.to_model, entities)
+    print("modelo -> entidade")
+    medir("  reflexão (__table__.columns)", reflexao_model_to_entity, models)
+    medir("  EntityMapper.from_model", mapper.from_model, models)
+    medir("  EntityMapper.from_row (tupla)", mapper.from_row, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark do perfil de desempenho do SQLite (SQLiteProfile)
+
+Compara o engine padrão do SQLite (rollback journal, synchronous=FULL) com o
+perfil ajustado (WAL, synchronous=NORMAL, mmap, cache, QueuePool):
+- Escrita: transações por segundo com um commit por estudante
+- Leitura concorrente: latência de load_from_id enquanto um escritor grava
+
+Uso (a partir da raiz do projeto):
+    python modulo1_orm/benchmark_sqlite.py [--writes 2000] [--readers 4] [--duration 3]
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modulo1_orm.infrastructure.models import Database
+from modulo1_orm.infrastructure.sqlite_profile import SQLiteProfile
+from modulo1_orm.application.repository import EstudanteRepository
+from modulo1_orm.domain.entities import Estudante
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def novo_estudante(matricula: int) -> Estudante:
+    return Estudante(
+        nome_completo=f"Estudante {matricula}",
+        data_de_nascimento="01/01/2000",
+        matricula=matricula
+    )
+
+
+def medir_escrita(repo: EstudanteRepository, writes: int) -> float:
+    """Retorna transações de escrita por segundo"""
+    start = time.perf_counter()
+    for i in range(writes):
+        repo.create(novo_estudante(1_000_000 + i))
+    return writes / (time.perf_counter() - start)
+
+
+def medir_leitura_concorrente(repo: EstudanteRepository, readers: int, duration: float) -> dict:
+    """Mede a latência de leitura com um escritor ativo em paralelo"""
+    ids = [e.id for e in repo.load_all()]
+    stop = threading.Event()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    
+    def writer():
+        matricula = 2_000_000
+        while not stop.is_set():
+            try:
+                repo.create(novo_estudante(matricula))
+            except Exception as e:
+                errors.append(e)
+            matricula += 1
+    
+    def reader():
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                repo.load_from_id(random.choice(ids))
+            except Exception as e:
+                errors.append(e)
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+    
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    return {
+        "reads": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": len(errors)
+    }
+
+
+def executar(nome: str, profile: SQLiteProfile, args) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "bench_sga.db"), profile=profile)
+        repo = EstudanteRepository(db, enable_crud_publishing=False)
+        
+        # Silencia os prints do repositório durante a medição
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            tps = medir_escrita(repo, args.writes)
+            leitura = medir_leitura_concorrente(repo, args.readers, args.duration)
+        db.close()
+    
+    print(f"{nome:18} {tps:10.0f} {leitura['reads']:10d} {leitura['p50_ms']:9.3f} "
+          f"{leitura['p99_ms']:9.3f} {leitura['errors']:7d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do SQLiteProfile")
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+    
+    print(f"{'perfil':18} {'write TPS':>10} {'leituras':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'erros':>7}")
+    executar("padrão SQLite", SQLiteProfile.sqlite_defaults(), args)
+    executar("WAL ajustado", SQLiteProfile(), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
 from enum import Enum
 
 
@@ -46,4 +46,20 @@ class Matricula:
     estudante_id: int = 0
     turma_id: int = 0
     status: StatusMatricula = StatusMatricula.ATIVA
-    data_matricula: str = ""
\ No newline at end of file
+    data_matricula: str = ""
+
+
+@dataclass
+class MatriculaDetalhada:
+    """Matrícula com sua turma e disciplina carregadas"""
+    matricula: Matricula
+    turma: Turma
+    disciplina: Disciplina
+
+
+@dataclass
+class TurmaDetalhada:
+    """Turma com sua disciplina e a lista de estudantes matriculados"""
+    turma: Turma
+    disciplina: Disciplina
+    estudantes: List[Estudante] = field(default_factory=list)
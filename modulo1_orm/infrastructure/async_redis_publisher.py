@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+import redis.asyncio as aioredis
+
+from .redis_publisher import CrudOperation, DEFAULT_CHANNEL, DEFAULT_REDIS_URL, _config
+
+
+class AsyncRedisPublisher:
+    """Equivalente assíncrono de RedisPublisher, sobre redis.asyncio"""
+    
+    def __init__(self, redis_url: str = DEFAULT_REDIS_URL, channel: str = DEFAULT_CHANNEL,
+                 connection_pool: Optional[aioredis.ConnectionPool] = None):
+        if connection_pool is not None:
+            self.redis_client = aioredis.Redis(connection_pool=connection_pool)
+        else:
+            self.redis_client = aioredis.from_url(redis_url, decode_responses=True)
+        self.channel = channel
+        # Publishers do registro são compartilhados e só são fechados por close_async_publishers()
+        self.shared = False
+    
+    async def publish_operation(self, operation: CrudOperation) -> None:
+        """Publica uma operação CRUD no Redis"""
+        try:
+            message = json.dumps(operation.to_dict())
+            await self.redis_client.publish(self.channel, message)
+            print(f"✅ Evento publicado: {operation.entity} - {operation.operation.value}")
+        except Exception as e:
+            print(f"❌ Erro ao publicar evento: {e}")
+    
+    async def publish_operations(self, operations: List[CrudOperation]) -> bool:
+        """Publica um lote de operações CRUD no Redis em um único pipeline"""
+        if not operations:
+            return True
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipeline:
+                for operation in operations:
+                    pipeline.publish(self.channel, json.dumps(operation.to_dict()))
+                await pipeline.execute()
+            print(f"✅ Lote publicado: {len(operations)} eventos {operations[0].entity} - {operations[0].operation.value}")
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao publicar lote de eventos: {e}")
+            return False
+    
+    async def close(self):
+        if not self.shared:
+            await self.redis_client.aclose()
+
+
+# Registro de publishers assíncronos do processo, nos moldes de get_publisher(): um pool
+# por URL e um publisher por (URL, canal). As conexões ficam presas ao event loop em que
+# foram abertas, então close_async_publishers() deve ser chamado antes de o loop terminar.
+_registry_lock = threading.Lock()
+_pools: Dict[str, aioredis.ConnectionPool] = {}
+_publishers: Dict[Tuple[str, str], AsyncRedisPublisher] = {}
+
+
+def get_async_publisher(redis_url: Optional[str] = None, channel: str = DEFAULT_CHANNEL) -> AsyncRedisPublisher:
+    """Retorna o publisher assíncrono compartilhado do processo para (URL, canal)"""
+    url = redis_url or _config["redis_url"]
+    with _registry_lock:
+        publisher = _publishers.get((url, channel))
+        if publisher is None:
+            pool = _pools.get(url)
+            if pool is None:
+                pool = aioredis.ConnectionPool.from_url(
+                    url, max_connections=_config["max_connections"], decode_responses=True
+                )
+                _pools[url] = pool
+            publisher = AsyncRedisPublisher(url, channel, connection_pool=pool)
+            publisher.shared = True
+            _publishers[(url, channel)] = publisher
+        return publisher
+
+
+async def close_async_publishers() -> None:
+    """Fecha todos os publishers assíncronos compartilhados e seus pools"""
+    with _registry_lock:
+        publishers, pools = list(_publishers.values()), list(_pools.values())
+        _publishers.clear()
+        _pools.clear()
+    for publisher in publishers:
+        await publisher.redis_client.aclose()
+    for pool in pools:
+        await pool.disconnect()
+
+
+def _reset_after_fork() -> None:
+    """No processo filho, descarta o registro herdado sem fechar os sockets do processo pai"""
+    global _registry_lock
+    _registry_lock = threading.Lock()
+    _publishers.clear()
+    _pools.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
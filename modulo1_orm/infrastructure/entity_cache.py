@@ -0,0 +1,81 @@
+# Cópia idêntica de modulo2_odm/infrastructure/entity_cache.py: cada módulo é implantado e testado
+# isoladamente (como redis_publisher.py); correções devem ser aplicadas nas duas.
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+
+class EntityCache:
+    """
+    Cache LRU com TTL, seguro para uso entre threads.
+    
+    Cada invalidação incrementa uma geração; put() recebe a geração lida
+    antes da consulta ao banco e descarta o valor se alguma invalidação
+    ocorreu nesse intervalo, evitando que uma leitura concorrente com uma
+    escrita grave no cache um valor já desatualizado.
+    """
+    
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 60.0):
+        if max_size <= 0:
+            raise ValueError("max_size deve ser positivo")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache ou None (contabilizando hit/miss)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """Armazena o valor, a menos que tenha havido invalidação desde `generation`"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Remove as chaves informadas"""
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove todas as entradas"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna contadores de uso do cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
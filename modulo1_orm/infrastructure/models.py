@@ -1,7 +1,11 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, create_engine
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 
+from .sqlite_profile import SQLiteProfile
+
 Base = declarative_base()
 
 
@@ -33,7 +37,7 @@ class TurmaModel(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     codigo = Column(String(20), nullable=False)
-    disciplina_id = Column(Integer, ForeignKey("disciplinas.id"), nullable=False)
+    disciplina_id = Column(Integer, ForeignKey("disciplinas.id"), nullable=False, index=True)
     semestre = Column(String(10), nullable=False)
     professor = Column(String(255), nullable=False)
     
@@ -45,8 +49,8 @@ class MatriculaModel(Base):
     __tablename__ = "matriculas"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    estudante_id = Column(Integer, ForeignKey("estudantes.id"), nullable=False)
-    turma_id = Column(Integer, ForeignKey("turmas.id"), nullable=False)
+    estudante_id = Column(Integer, ForeignKey("estudantes.id"), nullable=False, index=True)
+    turma_id = Column(Integer, ForeignKey("turmas.id"), nullable=False, index=True)
     status = Column(String(20), default="ATIVA")
     data_matricula = Column(String(10), nullable=False)
     
@@ -54,14 +58,67 @@ class MatriculaModel(Base):
     turma = relationship("TurmaModel", back_populates="matriculas")
 
 
+class OutboxEventModel(Base):
+    """Evento CRUD pendente de envio ao Redis (transactional outbox)"""
+    __tablename__ = "outbox_events"
+    # AUTOINCREMENT impede reutilização de IDs após a limpeza dos eventos já enviados
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(50), nullable=False)
+    operation = Column(String(10), nullable=False)
+    source = Column(String(10), nullable=False)
+    data = Column(Text, nullable=False)
+    timestamp = Column(String(30), nullable=False)
+
+
+class OutboxOffsetModel(Base):
+    """High-water mark do último evento do outbox entregue por um relay"""
+    __tablename__ = "outbox_offsets"
+    
+    relay_name = Column(String(50), primary_key=True)
+    last_event_id = Column(Integer, nullable=False, default=0)
+
+
 class Database:
-    def __init__(self, db_name: str = "sga.db"):
-        self.engine = create_engine(f"sqlite:///{db_name}")
+    def __init__(self, db_name: str = "sga.db", profile: Optional[SQLiteProfile] = None):
+        self.profile = profile or SQLiteProfile()
+        self.engine = self.profile.create_engine(db_name)
         Base.metadata.create_all(self.engine)
+        self._create_missing_indexes()
         self.SessionLocal = sessionmaker(bind=self.engine)
     
+    def _create_missing_indexes(self):
+        """Cria índices adicionados depois que as tabelas já existiam (create_all não os cria)"""
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(self.engine, checkfirst=True)
+    
     def get_session(self):
         return self.SessionLocal()
     
     def close(self):
-        self.engine.dispose()
\ No newline at end of file
+        self.engine.dispose()
+
+
+class AsyncDatabase:
+    """Equivalente assíncrono de Database, sobre sqlalchemy.ext.asyncio + aiosqlite"""
+    
+    def __init__(self, db_name: str = "sga.db", profile: Optional[SQLiteProfile] = None):
+        self.profile = profile or SQLiteProfile()
+        self.engine = self.profile.create_async_engine(db_name)
+        self.SessionLocal = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+    
+    async def create_tables(self):
+        """Cria tabelas e índices (equivalente ao create_all do Database)"""
+        async with self.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    await connection.run_sync(index.create, checkfirst=True)
+    
+    def get_session(self):
+        return self.SessionLocal()
+    
+    async def close(self):
+        await self.engine.dispose()
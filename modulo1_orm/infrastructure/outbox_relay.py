@@ -0,0 +1,129 @@
+import threading
+from typing import List, Optional
+from sqlalchemy import select, delete, func
+
+from .models import Database, OutboxEventModel, OutboxOffsetModel
+from .redis_publisher import RedisPublisher, CrudOperation, OperationType, Source, get_publisher
+
+
+class OutboxRelay:
+    """
+    Drena a tabela outbox_events para o Redis em segundo plano.
+    
+    Os eventos são lidos em lotes a partir do high-water mark persistido em
+    outbox_offsets e publicados em um único pipeline. O high-water mark só
+    avança (e os eventos entregues só são removidos) depois que o pipeline
+    foi executado, então um restart retoma do último lote confirmado.
+    A entrega é at-least-once: um lote pode ser reenviado após uma falha.
+    
+    Com vários relays (relay_name distintos) sobre a mesma tabela, cada um
+    mantém o seu high-water mark e a remoção só alcança os eventos já
+    entregues por todos eles (o menor high-water mark registrado).
+    """
+    
+    def __init__(self, database: Database, redis_publisher: Optional[RedisPublisher] = None,
+                 relay_name: str = "default", batch_size: int = 500, poll_interval: float = 0.5,
+                 purge_published: bool = True):
+        self.database = database
+        self.redis_publisher = redis_publisher or get_publisher()
+        self.relay_name = relay_name
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.purge_published = purge_published
+        self.is_running = False
+        self.relay_thread = None
+        self._stop_event = threading.Event()
+    
+    def _load_offset(self, session) -> OutboxOffsetModel:
+        """
+        Retorna o high-water mark deste relay, registrando-o (em 0) na primeira
+        execução para que os demais relays não removam eventos que ele ainda
+        não entregou.
+        """
+        offset = session.get(OutboxOffsetModel, self.relay_name)
+        if offset is None:
+            offset = OutboxOffsetModel(relay_name=self.relay_name, last_event_id=0)
+            session.add(offset)
+            session.commit()
+        return offset
+    
+    def _to_operation(self, event: OutboxEventModel) -> CrudOperation:
+        """Reconstrói a operação CRUD a partir da linha do outbox"""
+        return CrudOperation(
+            entity=event.entity,
+            operation=OperationType(event.operation),
+            source=Source(event.source),
+            data=event.data,
+            timestamp=event.timestamp
+        )
+    
+    def drain_once(self) -> int:
+        """Publica um lote de eventos pendentes e retorna quantos foram entregues"""
+        session = self.database.get_session()
+        try:
+            offset = self._load_offset(session)
+            events: List[OutboxEventModel] = list(session.scalars(
+                select(OutboxEventModel)
+                .where(OutboxEventModel.id > offset.last_event_id)
+                .order_by(OutboxEventModel.id)
+                .limit(self.batch_size)
+            ))
+            if not events:
+                return 0
+            
+            operations = [self._to_operation(event) for event in events]
+            if not self.redis_publisher.publish_operations(operations):
+                return 0
+            
+            offset.last_event_id = events[-1].id
+            if self.purge_published:
+                session.flush()
+                purge_up_to = session.scalar(select(func.min(OutboxOffsetModel.last_event_id)))
+                session.execute(delete(OutboxEventModel).where(OutboxEventModel.id <= purge_up_to))
+            session.commit()
+            
+            return len(events)
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Erro ao drenar outbox: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def start(self):
+        """Inicia a thread de relay do outbox"""
+        if self.is_running:
+            print("⚠️ Relay do outbox já está ativo")
+            return
+        
+        self.is_running = True
+        self._stop_event.clear()
+        self.relay_thread = threading.Thread(target=self._relay_loop, daemon=True)
+        self.relay_thread.start()
+        print(f"🟢 Relay do outbox iniciado: {self.relay_name}")
+    
+    def _relay_loop(self):
+        """Loop principal: drena lotes cheios imediatamente e espera quando o outbox esvazia"""
+        try:
+            while not self._stop_event.is_set():
+                delivered = self.drain_once()
+                if delivered < self.batch_size:
+                    self._stop_event.wait(self.poll_interval)
+        finally:
+            self.is_running = False
+    
+    def stop(self):
+        """Para o relay, aguardando o lote em andamento"""
+        if not self.is_running:
+            return
+        
+        self._stop_event.set()
+        if self.relay_thread and self.relay_thread.is_alive():
+            self.relay_thread.join(timeout=5)
+        
+        print("🛑 Relay do outbox parado")
+    
+    def close(self):
+        """Para o relay e fecha a conexão Redis"""
+        self.stop()
+        self.redis_publisher.close()
@@ -1,4 +1,6 @@
+import os
 from infrastructure.models import Database
+from infrastructure.outbox_relay import OutboxRelay
 from application.repository import EstudanteRepository
 from domain.entities import Estudante, StatusEmprestimo
 
@@ -9,8 +11,14 @@ def main():
     # Inicializa o banco de dados
     db = Database("sga.db")
     
+    # Com o outbox, os eventos são gravados na transação e entregues ao Redis pelo OutboxRelay
+    use_outbox = os.getenv("CRUD_OUTBOX_ENABLED", "false").lower() == "true"
+    relay = OutboxRelay(db) if use_outbox else None
+    if relay:
+        relay.start()
+    
     # Cria repositório
-    estudante_repo = EstudanteRepository(db, enable_crud_publishing=True)
+    estudante_repo = EstudanteRepository(db, enable_crud_publishing=True, use_outbox=use_outbox)
     
     # Exemplo de criação de estudante
     estudante = Estudante(
@@ -20,7 +28,7 @@ def main():
         status_emprestimo_livros=StatusEmprestimo.QUITADO
     )
     
-    # Cria o estudante (vai publicar evento no Redis)
+    # Cria o estudante (vai publicar evento no Redis, direto ou pelo outbox)
     estudante_criado = estudante_repo.create(estudante)
     print(f"📝 Estudante criado com ID: {estudante_criado.id}")
     
@@ -28,6 +36,12 @@ def main():
     estudantes = estudante_repo.load_all()
     print(f"📋 Total de estudantes cadastrados: {len(estudantes)}")
     
+    if relay:
+        # Para o relay e entrega o que ainda estiver pendente no outbox
+        relay.stop()
+        while relay.drain_once():
+            pass
+    
     # Fecha o banco de dados
     db.close()
 
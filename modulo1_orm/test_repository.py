@@ -1,8 +1,16 @@
 import unittest
+import json
 import os
-from infrastructure.models import Database
-from application.repository import EstudanteRepository
-from domain.entities import Estudante, StatusEmprestimo
+from unittest.mock import Mock
+from infrastructure.models import Database, AsyncDatabase, MatriculaModel, OutboxEventModel, OutboxOffsetModel
+from infrastructure.outbox_relay import OutboxRelay
+from infrastructure.sqlite_profile import SQLiteProfile
+from infrastructure.redis_publisher import CrudOperation, OperationType, Source, get_publisher
+from infrastructure.async_redis_publisher import get_async_publisher
+from application.mapper import get_mapper
+from application.async_repository import AsyncEstudanteRepository
+from application.repository import EstudanteRepository, DisciplinaRepository, TurmaRepository, MatriculaRepository
+from domain.entities import Estudante, Disciplina, Turma, Matricula, StatusEmprestimo, StatusMatricula
 
 
 class TestEstudanteRepository(unittest.TestCase):
@@ -64,6 +72,43 @@ class TestEstudanteRepository(unittest.TestCase):
         estudantes = self.repo.load_all()
         self.assertEqual(3, len(estudantes))
     
+    def test_iter_all(self):
+        """Testa a iteração em lotes de todos os estudantes"""
+        self.repo.create_many([
+            Estudante(nome_completo=f"Iter {i}", data_de_nascimento="01/01/2000", matricula=600000 + i)
+            for i in range(7)
+        ])
+        
+        nomes = [e.nome_completo for e in self.repo.iter_all(batch_size=3)]
+        self.assertEqual([f"Iter {i}" for i in range(7)], nomes)
+    
+    def test_load_page(self):
+        """Testa a paginação keyset por ID"""
+        ids = self.repo.create_many([
+            Estudante(nome_completo=f"Pagina {i}", data_de_nascimento="01/01/2000", matricula=700000 + i)
+            for i in range(5)
+        ])
+        
+        primeira = self.repo.load_page(limit=2)
+        segunda = self.repo.load_page(after_id=primeira[-1].id, limit=2)
+        ultima = self.repo.load_page(after_id=ids[-1], limit=2)
+        
+        self.assertEqual(ids[:2], [e.id for e in primeira])
+        self.assertEqual(ids[2:4], [e.id for e in segunda])
+        self.assertEqual([], ultima)
+    
+    def test_load_converte_enum(self):
+        """Testa que o status é carregado como StatusEmprestimo"""
+        created = self.repo.create(Estudante(
+            nome_completo="Enum",
+            data_de_nascimento="01/01/2000",
+            matricula=800000,
+            status_emprestimo_livros=StatusEmprestimo.EM_ABERTO
+        ))
+        
+        self.assertIs(StatusEmprestimo.EM_ABERTO, self.repo.load_from_id(created.id).status_emprestimo_livros)
+        self.assertIs(StatusEmprestimo.EM_ABERTO, self.repo.load_all()[0].status_emprestimo_livros)
+    
     def test_update(self):
         """Testa a atualização de um estudante"""
         estudante = Estudante(
@@ -79,6 +124,25 @@ class TestEstudanteRepository(unittest.TestCase):
         loaded = self.repo.load_from_id(created.id)
         self.assertEqual("Nome Atualizado", loaded.nome_completo)
     
+    def test_update_publica_apenas_campos_alterados(self):
+        """Testa que o evento UPDATE carrega apenas o id e as colunas alteradas"""
+        created = self.repo.create(Estudante(nome_completo="Diff", data_de_nascimento="01/01/2000", matricula=111111))
+        self.repo.redis_publisher = Mock()
+        
+        created.nome_completo = "Diff Alterado"
+        self.repo.update(created)
+        
+        operation = self.repo.redis_publisher.publish_operation.call_args[0][0]
+        self.assertEqual({"id": created.id, "nome_completo": "Diff Alterado"}, json.loads(operation.data))
+        
+        self.repo.update(created)
+        self.assertEqual(1, self.repo.redis_publisher.publish_operation.call_count)
+    
+    def test_update_nao_encontrado(self):
+        """Testa que atualizar um ID inexistente gera ValueError"""
+        with self.assertRaises(ValueError):
+            self.repo.update(Estudante(id=4242, nome_completo="Inexistente", data_de_nascimento="01/01/2000", matricula=1))
+    
     def test_delete(self):
         """Testa a exclusão de um estudante"""
         estudante = Estudante(
@@ -94,6 +158,418 @@ class TestEstudanteRepository(unittest.TestCase):
         
         loaded = self.repo.load_from_id(entity_id)
         self.assertIsNone(loaded)
+    
+    def test_create_many(self):
+        """Testa a criação de estudantes em lote"""
+        estudantes = [
+            Estudante(
+                nome_completo=f"Lote {i+1}",
+                data_de_nascimento="01/01/2000",
+                matricula=200000 + i
+            )
+            for i in range(5)
+        ]
+        
+        ids = self.repo.create_many(estudantes)
+        
+        self.assertEqual(5, len(ids))
+        self.assertEqual(ids, [e.id for e in estudantes])
+        self.assertEqual("Lote 3", self.repo.load_from_id(ids[2]).nome_completo)
+    
+    def test_update_many(self):
+        """Testa a atualização de estudantes em lote"""
+        estudantes = [
+            Estudante(nome_completo=f"Original {i}", data_de_nascimento="01/01/2000", matricula=300000 + i)
+            for i in range(3)
+        ]
+        self.repo.create_many(estudantes)
+        
+        for estudante in estudantes:
+            estudante.nome_completo = estudante.nome_completo.replace("Original", "Atualizado")
+        self.repo.update_many(estudantes)
+        
+        nomes = sorted(e.nome_completo for e in self.repo.load_all())
+        self.assertEqual(["Atualizado 0", "Atualizado 1", "Atualizado 2"], nomes)
+    
+    def test_update_many_not_found(self):
+        """Testa que a atualização em lote falha inteira se um ID não existe"""
+        estudante = Estudante(nome_completo="Existente", data_de_nascimento="01/01/2000", matricula=400000)
+        self.repo.create(estudante)
+        estudante.nome_completo = "Alterado"
+        fantasma = Estudante(id=9999, nome_completo="Fantasma", data_de_nascimento="01/01/2000", matricula=400001)
+        
+        with self.assertRaises(ValueError):
+            self.repo.update_many([estudante, fantasma])
+        
+        self.assertEqual("Existente", self.repo.load_from_id(estudante.id).nome_completo)
+    
+    def test_update_apos_update_many(self):
+        """Testa que update_many atualiza o estado rastreado e um update posterior não é perdido"""
+        created = self.repo.create(Estudante(nome_completo="A", data_de_nascimento="01/01/2000", matricula=410000))
+        loaded = self.repo.load_from_id(created.id)
+        
+        loaded.nome_completo = "B"
+        self.repo.update_many([loaded])
+        loaded.nome_completo = "A"
+        self.repo.update(loaded)
+        
+        self.assertEqual("A", self.repo.load_from_id(created.id).nome_completo)
+    
+    def test_update_sem_alteracoes_apos_delete_many(self):
+        """Testa que update sem alterações de uma entidade removida gera ValueError"""
+        created = self.repo.create(Estudante(nome_completo="Removido", data_de_nascimento="01/01/2000", matricula=420000))
+        loaded = self.repo.load_from_id(created.id)
+        self.repo.delete_many([created])
+        
+        with self.assertRaises(ValueError):
+            self.repo.update(loaded)
+    
+    def test_delete_many(self):
+        """Testa a exclusão de estudantes em lote"""
+        estudantes = [
+            Estudante(nome_completo=f"Remover {i}", data_de_nascimento="01/01/2000", matricula=500000 + i)
+            for i in range(4)
+        ]
+        ids = self.repo.create_many(estudantes)
+        
+        deleted = self.repo.delete_many(estudantes[:3])
+        
+        self.assertEqual(sorted(ids[:3]), sorted(deleted))
+        self.assertEqual(1, len(self.repo.load_all()))
+    
+    def test_cache_load_from_id(self):
+        """Testa o cache de load_from_id com invalidação por update/delete"""
+        self.assertIsNone(self.repo.cache_stats())
+        self.repo.enable_cache(max_size=2, ttl=60)
+        created = self.repo.create(Estudante(nome_completo="Cache", data_de_nascimento="01/01/2000", matricula=900000))
+        
+        self.repo.load_from_id(created.id)
+        cached = self.repo.load_from_id(created.id)
+        cached.nome_completo = "Mutado fora do repositório"
+        self.assertEqual("Cache", self.repo.load_from_id(created.id).nome_completo)
+        self.assertEqual(1, self.repo.cache_stats()["misses"])
+        self.assertEqual(2, self.repo.cache_stats()["hits"])
+        
+        created.nome_completo = "Cache Atualizado"
+        self.repo.update(created)
+        self.assertEqual("Cache Atualizado", self.repo.load_from_id(created.id).nome_completo)
+        
+        self.repo.delete(created)
+        self.assertIsNone(self.repo.load_from_id(created.id))
+
+
+class TestAsyncEstudanteRepository(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.test_db_name = "test_sga_async.db"
+        if os.path.exists(self.test_db_name):
+            os.remove(self.test_db_name)
+        
+        self.db = AsyncDatabase(self.test_db_name)
+        await self.db.create_tables()
+        self.repo = AsyncEstudanteRepository(self.db, enable_crud_publishing=False)
+    
+    async def asyncTearDown(self):
+        await self.db.close()
+        if os.path.exists(self.test_db_name):
+            os.remove(self.test_db_name)
+    
+    async def test_crud(self):
+        """Testa create, load_from_id, update e delete assíncronos"""
+        created = await self.repo.create(Estudante(nome_completo="Async", data_de_nascimento="01/01/2000", matricula=1))
+        self.assertIsNotNone(created.id)
+        
+        loaded = await self.repo.load_from_id(created.id)
+        self.assertEqual("Async", loaded.nome_completo)
+        self.assertIs(StatusEmprestimo.QUITADO, loaded.status_emprestimo_livros)
+        
+        loaded.nome_completo = "Async Atualizado"
+        await self.repo.update(loaded)
+        self.assertEqual("Async Atualizado", (await self.repo.load_from_id(created.id)).nome_completo)
+        
+        await self.repo.delete(loaded)
+        self.assertIsNone(await self.repo.load_from_id(created.id))
+    
+    async def test_create_many_e_iter_all(self):
+        """Testa a criação em lote e a iteração assíncrona em lotes"""
+        ids = await self.repo.create_many([
+            Estudante(nome_completo=f"Async {i}", data_de_nascimento="01/01/2000", matricula=10 + i)
+            for i in range(5)
+        ])
+        
+        self.assertEqual(5, len(await self.repo.load_all()))
+        self.assertEqual(ids, [e.id async for e in self.repo.iter_all(batch_size=2)])
+        self.assertEqual(ids[3:], [e.id for e in await self.repo.load_page(after_id=ids[2], limit=10)])
+    
+    async def test_update_apos_create_many(self):
+        """Testa update após create_many e que update sem alterações de entidade removida gera ValueError"""
+        estudantes = [Estudante(nome_completo="Async A", data_de_nascimento="01/01/2000", matricula=20)]
+        await self.repo.create_many(estudantes)
+        
+        estudantes[0].nome_completo = "Async B"
+        await self.repo.update(estudantes[0])
+        self.assertEqual("Async B", (await self.repo.load_from_id(estudantes[0].id)).nome_completo)
+        
+        loaded = await self.repo.load_from_id(estudantes[0].id)
+        await self.repo.delete(estudantes[0])
+        with self.assertRaises(ValueError):
+            await self.repo.update(loaded)
+
+
+class TestAgregados(unittest.TestCase):
+    def setUp(self):
+        self.test_db_name = "test_sga_agregados.db"
+        if os.path.exists(self.test_db_name):
+            os.remove(self.test_db_name)
+        
+        self.db = Database(self.test_db_name)
+        self.estudante_repo = EstudanteRepository(self.db, enable_crud_publishing=False)
+        self.turma_repo = TurmaRepository(self.db, enable_crud_publishing=False)
+        self.matricula_repo = MatriculaRepository(self.db, enable_crud_publishing=False)
+        disciplina_repo = DisciplinaRepository(self.db, enable_crud_publishing=False)
+        
+        calculo = disciplina_repo.create(Disciplina(nome="Cálculo", codigo="MAT01", creditos=6))
+        algoritmos = disciplina_repo.create(Disciplina(nome="Algoritmos", codigo="INF01", creditos=4))
+        self.turma_calculo = self.turma_repo.create(Turma(codigo="A", disciplina_id=calculo.id, semestre="2024.1", professor="Ana"))
+        self.turma_algoritmos = self.turma_repo.create(Turma(codigo="B", disciplina_id=algoritmos.id, semestre="2024.1", professor="Bruno"))
+        self.joao = self.estudante_repo.create(Estudante(nome_completo="João", data_de_nascimento="01/01/2000", matricula=1))
+        self.maria = self.estudante_repo.create(Estudante(nome_completo="Maria", data_de_nascimento="01/01/2000", matricula=2))
+        
+        self.matricula_repo.create_many([
+            Matricula(estudante_id=self.joao.id, turma_id=self.turma_calculo.id, data_matricula="01/02/2024"),
+            Matricula(estudante_id=self.joao.id, turma_id=self.turma_algoritmos.id, data_matricula="01/02/2024"),
+            Matricula(estudante_id=self.maria.id, turma_id=self.turma_calculo.id, data_matricula="01/02/2024",
+                      status=StatusMatricula.TRANCADA),
+        ])
+    
+    def tearDown(self):
+        self.db.close()
+        if os.path.exists(self.test_db_name):
+            os.remove(self.test_db_name)
+    
+    def test_indices_das_chaves_estrangeiras(self):
+        """Testa que as chaves estrangeiras de turmas/matrículas são indexadas"""
+        with self.db.engine.connect() as connection:
+            indices = {row[1] for row in connection.exec_driver_sql("PRAGMA index_list(matriculas)")}
+            indices |= {row[1] for row in connection.exec_driver_sql("PRAGMA index_list(turmas)")}
+        self.assertIn("ix_matriculas_estudante_id", indices)
+        self.assertIn("ix_matriculas_turma_id", indices)
+        self.assertIn("ix_turmas_disciplina_id", indices)
+    
+    def test_load_by_estudante(self):
+        """Testa o carregamento das matrículas com turma e disciplina"""
+        detalhes = self.matricula_repo.load_by_estudante(self.joao.id)
+        
+        self.assertEqual(["Cálculo", "Algoritmos"], [d.disciplina.nome for d in detalhes])
+        self.assertEqual("Bruno", detalhes[1].turma.professor)
+        self.assertIs(StatusMatricula.ATIVA, detalhes[0].matricula.status)
+    
+    def test_load_roster(self):
+        """Testa a lista de estudantes ativos de uma turma"""
+        roster = self.turma_repo.load_roster(self.turma_calculo.id)
+        
+        self.assertEqual("Cálculo", roster.disciplina.nome)
+        self.assertEqual(["João"], [e.nome_completo for e in roster.estudantes])
+        self.assertEqual(2, len(self.turma_repo.load_roster(self.turma_calculo.id, status=None).estudantes))
+        self.assertIsNone(self.turma_repo.load_roster(9999))
+    
+    def test_total_creditos(self):
+        """Testa a soma de créditos calculada no banco"""
+        self.assertEqual(10, self.estudante_repo.total_creditos(self.joao.id))
+        self.assertEqual(0, self.estudante_repo.total_creditos(self.maria.id))
+        self.assertEqual({self.joao.id: 10, self.maria.id: 6}, self.estudante_repo.creditos_por_estudante(status=None))
+
+
+class TestEntityMapper(unittest.TestCase):
+    def setUp(self):
+        self.mapper = get_mapper(Matricula, MatriculaModel)
+    
+    def test_mapper_compartilhado(self):
+        """Testa que o mapper é construído uma vez por par entidade/modelo"""
+        self.assertIs(self.mapper, get_mapper(Matricula, MatriculaModel))
+        self.assertEqual(("status",), self.mapper.enum_fields)
+    
+    def test_ida_e_volta(self):
+        """Testa a conversão entidade -> modelo -> entidade e o caminho por tupla"""
+        matricula = Matricula(id=1, estudante_id=2, turma_id=3, status=StatusMatricula.TRANCADA, data_matricula="01/02/2024")
+        
+        model = self.mapper.to_model(matricula)
+        self.assertEqual("TRANCADA", model.status)
+        self.assertEqual(matricula, self.mapper.from_model(model))
+        
+        row = tuple(getattr(model, name) for name in self.mapper.column_names)
+        self.assertEqual(matricula, self.mapper.from_row(row))
+
+
+class TestRedisPublisherRegistry(unittest.TestCase):
+    def test_publisher_compartilhado(self):
+        """Testa que repositórios do processo compartilham o mesmo publisher e pool"""
+        db = Database(":memory:")
+        try:
+            repo_a = EstudanteRepository(db)
+            repo_b = EstudanteRepository(db)
+            self.assertIs(repo_a.redis_publisher, repo_b.redis_publisher)
+            self.assertIs(get_publisher(), repo_a.redis_publisher)
+            
+            repo_a.set_enable_crud_publishing(False)
+            repo_a.set_enable_crud_publishing(True)
+            self.assertIs(repo_b.redis_publisher, repo_a.redis_publisher)
+        finally:
+            db.close()
+    
+    def test_publisher_assincrono_compartilhado(self):
+        """Testa que repositórios assíncronos usam o publisher assíncrono compartilhado, salvo injeção"""
+        db = AsyncDatabase(":memory:")
+        repo_a = AsyncEstudanteRepository(db)
+        repo_b = AsyncEstudanteRepository(db)
+        self.assertIs(get_async_publisher(), repo_a.redis_publisher)
+        self.assertIs(repo_a.redis_publisher, repo_b.redis_publisher)
+        
+        injetado = Mock()
+        self.assertIs(injetado, AsyncEstudanteRepository(db, redis_publisher=injetado).redis_publisher)
+    
+    def test_batch_envia_em_um_pipeline(self):
+        """Testa que publicações dentro de batch() são enviadas juntas ao sair do bloco"""
+        publisher = get_publisher(channel="test-batch-channel")
+        redis_client = publisher.redis_client
+        publisher.redis_client = Mock()
+        try:
+            with publisher.batch():
+                for i in range(3):
+                    publisher.publish_operation(CrudOperation("Estudante", OperationType.CREATE, Source.ORM, "{}"))
+                publisher.redis_client.publish.assert_not_called()
+            
+            publisher.redis_client.pipeline.assert_called_once_with(transaction=False)
+            self.assertEqual(3, publisher.redis_client.pipeline.return_value.publish.call_count)
+        finally:
+            publisher.redis_client = redis_client
+
+
+class TestOutbox(unittest.TestCase):
+    def setUp(self):
+        self.test_db_name = "test_sga_outbox.db"
+        if os.path.exists(self.test_db_name):
+            os.remove(self.test_db_name)
+        
+        self.db = Database(self.test_db_name)
+        self.repo = EstudanteRepository(self.db, enable_crud_publishing=True, use_outbox=True)
+        self.publisher = Mock()
+        self.publisher.publish_operations.return_value = True
+        self.relay = OutboxRelay(self.db, redis_publisher=self.publisher, batch_size=2)
+    
+    def tearDown(self):
+        self.db.close()
+        if os.path.exists(self.test_db_name):
+            os.remove(self.test_db_name)
+    
+    def _count(self, model_class):
+        session = self.db.get_session()
+        try:
+            return session.query(model_class).count()
+        finally:
+            session.close()
+    
+    def test_create_grava_evento_no_outbox(self):
+        """Testa que o evento é gravado na mesma transação, sem publicar no Redis"""
+        self.assertIsNone(self.repo.redis_publisher)
+        
+        created = self.repo.create(Estudante(nome_completo="Outbox", data_de_nascimento="01/01/2000", matricula=1))
+        
+        session = self.db.get_session()
+        try:
+            event = session.query(OutboxEventModel).one()
+        finally:
+            session.close()
+        self.assertEqual("Estudante", event.entity)
+        self.assertEqual("CREATE", event.operation)
+        self.assertIn(f'"id": {created.id}', event.data)
+    
+    def test_relay_drena_em_lotes_e_avanca_high_water_mark(self):
+        """Testa que o relay publica em lotes e remove os eventos entregues"""
+        self.repo.create_many([
+            Estudante(nome_completo=f"Relay {i}", data_de_nascimento="01/01/2000", matricula=10 + i)
+            for i in range(3)
+        ])
+        
+        self.assertEqual(2, self.relay.drain_once())
+        self.assertEqual(1, self.relay.drain_once())
+        self.assertEqual(0, self.relay.drain_once())
+        
+        self.assertEqual(2, self.publisher.publish_operations.call_count)
+        self.assertEqual(0, self._count(OutboxEventModel))
+        session = self.db.get_session()
+        try:
+            self.assertEqual(3, session.get(OutboxOffsetModel, "default").last_event_id)
+        finally:
+            session.close()
+    
+    def test_relay_nao_avanca_quando_redis_falha(self):
+        """Testa que eventos não entregues permanecem no outbox"""
+        self.repo.create(Estudante(nome_completo="Falha", data_de_nascimento="01/01/2000", matricula=99))
+        self.publisher.publish_operations.return_value = False
+        
+        self.assertEqual(0, self.relay.drain_once())
+        self.assertEqual(1, self._count(OutboxEventModel))
+        
+        self.publisher.publish_operations.return_value = True
+        self.assertEqual(1, self.relay.drain_once())
+    
+    def test_relays_distintos_so_removem_eventos_entregues_por_todos(self):
+        """Testa que um relay não remove eventos que outro relay ainda não entregou"""
+        outro = OutboxRelay(self.db, redis_publisher=self.publisher, relay_name="auditoria", batch_size=10)
+        self.assertEqual(0, outro.drain_once())
+        self.repo.create_many([
+            Estudante(nome_completo=f"Relay {i}", data_de_nascimento="01/01/2000", matricula=20 + i)
+            for i in range(3)
+        ])
+        
+        self.assertEqual(2, self.relay.drain_once())
+        self.assertEqual(3, self._count(OutboxEventModel))
+        
+        self.assertEqual(3, outro.drain_once())
+        self.assertEqual(1, self._count(OutboxEventModel))
+        self.assertEqual(1, self.relay.drain_once())
+        self.assertEqual(0, self._count(OutboxEventModel))
+
+
+class TestSQLiteProfile(unittest.TestCase):
+    def setUp(self):
+        self.test_db_name = "test_sga_profile.db"
+        if os.path.exists(self.test_db_name):
+            os.remove(self.test_db_name)
+    
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.test_db_name + suffix):
+                os.remove(self.test_db_name + suffix)
+    
+    def _pragma(self, db, name):
+        with db.engine.connect() as connection:
+            return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+    
+    def test_perfil_padrao_aplica_wal(self):
+        """Testa que o Database aplica o perfil WAL por padrão"""
+        db = Database(self.test_db_name)
+        try:
+            self.assertEqual("wal", self._pragma(db, "journal_mode"))
+            self.assertEqual(1, self._pragma(db, "synchronous"))  # NORMAL
+            self.assertEqual(5000, self._pragma(db, "busy_timeout"))
+        finally:
+            db.close()
+    
+    def test_perfil_customizado(self):
+        """Testa um perfil com valores ajustados"""
+        profile = SQLiteProfile(synchronous="full", cache_size=-2000)
+        db = Database(self.test_db_name, profile=profile)
+        try:
+            self.assertEqual(2, self._pragma(db, "synchronous"))  # FULL
+            self.assertEqual(-2000, self._pragma(db, "cache_size"))
+        finally:
+            db.close()
+    
+    def test_valor_invalido(self):
+        """Testa que valores textuais desconhecidos são rejeitados"""
+        with self.assertRaises(ValueError):
+            SQLiteProfile(journal_mode="WAL; DROP TABLE estudantes").pragmas()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,603 @@
+import copy
+import json
+import re
+import struct
+from dataclasses import fields as dataclass_fields
+from datetime import date, datetime, timezone
+from typing import Generic, TypeVar, Type, List, Optional, Tuple, Dict, Any, AsyncIterator
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from ..domain.entities import Usuario, Obra, RegistroEmprestimo, chave_busca, normalizar_data
+from ..infrastructure.database import AsyncMongoDB
+from ..infrastructure.redis_publisher import CrudOperation, OperationType, Source
+from ..infrastructure.async_redis_publisher import AsyncRedisPublisher, get_async_publisher
+from ..infrastructure.entity_cache import EntityCache
+from .repository import (
+    DATE_FIELDS, SEARCH_KEYS, ObraDocumentMixin, RegistroEmprestimoDocumentMixin, _bulk_write_errors, _crud_operations,
+    _delete_operations, _delete_results, _insert_documents, _insert_results, _object_id, _update_errors,
+    _update_needs_lookup, _update_operations, _update_results
+)
+
+T = TypeVar('T')
+
+
+def _raw_document(doc: dict) -> dict:
+    """Documento como dicionário de resposta (id em texto no lugar de _id), sem passar pela entidade"""
+    return {"id": str(doc.pop("_id")), **doc}
+
+
+def _since_filter(since: str) -> dict:
+    """
+    Converte o parâmetro `since` em filtro sobre _id.
+    
+    Aceita um ObjectId (exporta os documentos posteriores a ele) ou um
+    timestamp ISO 8601 (exporta os documentos criados a partir dele, usando
+    o instante embutido no ObjectId).
+    """
+    if ObjectId.is_valid(since):
+        return {"_id": {"$gt": ObjectId(since)}}
+    try:
+        moment = datetime.fromisoformat(since)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return {"_id": {"$gte": ObjectId.from_datetime(moment)}}
+    except (ValueError, OverflowError, struct.error):
+        raise ValueError(f"since inválido: {since} (use um _id ou um timestamp ISO 8601)")
+
+
+class AsyncMongoRepository(Generic[T]):
+    """
+    Versão não bloqueante do MongoRepository, sobre Motor e redis.asyncio.
+    
+    Mantém a mesma API (create, find_by_id, find_all, update, delete) como
+    corrotinas, para uso direto nos handlers async do FastAPI sem bloquear
+    o event loop a cada ida ao MongoDB ou ao Redis.
+    """
+    
+    # Campos gravados apenas para consultas (ex.: chaves de busca), fora da entidade
+    hidden_fields: Tuple[str, ...] = ()
+    
+    def __init__(self, mongodb: AsyncMongoDB, collection_name: str, entity_class: Type[T], enable_crud_publishing: bool = True,
+                 redis_publisher: Optional[AsyncRedisPublisher] = None):
+        self.mongodb = mongodb
+        self.collection: AsyncIOMotorCollection = mongodb.get_collection(collection_name)
+        self.entity_class = entity_class
+        self.enable_crud_publishing = enable_crud_publishing
+        # Publisher compartilhado do processo, a menos que outro seja injetado (fechado por quem o criou)
+        self.redis_publisher = (redis_publisher or get_async_publisher()) if enable_crud_publishing else None
+        # Cache opcional de find_by_id (ver enable_cache)
+        self.cache: Optional[EntityCache] = None
+        self._field_names = {f.name for f in dataclass_fields(entity_class)}
+    
+    def _entity_to_dict(self, entity: T) -> dict:
+        """Converte entidade para dicionário MongoDB"""
+        entity_dict = entity.__dict__.copy()
+        # Remove o ID se for None para inserção
+        if entity_dict.get('id') is None:
+            entity_dict.pop('id', None)
+        # Converte string ID para ObjectId se necessário
+        elif isinstance(entity_dict.get('id'), str) and entity_dict['id']:
+            try:
+                entity_dict['_id'] = ObjectId(entity_dict['id'])
+                del entity_dict['id']
+            except Exception:
+                pass
+        return entity_dict
+    
+    def _normalize(self, values: dict) -> dict:
+        """Ajusta os valores antes da gravação (sobrescrito por repositórios específicos)"""
+        return values
+    
+    def _hidden_projection(self) -> Optional[dict]:
+        """Projeção que omite os campos auxiliares (hidden_fields) nas listagens"""
+        return {name: 0 for name in self.hidden_fields} or None
+    
+    def _dict_to_entity(self, doc: dict) -> Optional[T]:
+        """Converte documento MongoDB para entidade"""
+        if doc is None:
+            return None
+        
+        # Converte ObjectId para string
+        if '_id' in doc:
+            doc['id'] = str(doc['_id'])
+            del doc['_id']
+        
+        # Ignora campos auxiliares gravados só para consultas (ver hidden_fields)
+        return self.entity_class(**{k: v for k, v in doc.items() if k in self._field_names})
+    
+    async def _publish_crud_operation(self, operation_type: OperationType, entity: T) -> None:
+        """Publica operação CRUD no Redis"""
+        if not self.enable_crud_publishing or not self.redis_publisher:
+            return
+        
+        try:
+            operation = CrudOperation(
+                entity=self.entity_class.__name__,
+                operation=operation_type,
+                source=Source.ODM,
+                data=json.dumps(entity.__dict__, default=str)
+            )
+            await self.redis_publisher.publish_operation(operation)
+        except Exception as e:
+            print(f"❌ Erro ao publicar operação no Redis: {e}")
+    
+    async def create(self, entity: T) -> T:
+        """Cria uma nova entidade no MongoDB"""
+        try:
+            entity_dict = self._entity_to_dict(entity)
+            result = await self.collection.insert_one(entity_dict)
+            
+            # Atualiza o ID da entidade
+            entity.id = str(result.inserted_id)
+            
+            if self.enable_crud_publishing:
+                await self._publish_crud_operation(OperationType.CREATE, entity)
+            
+            return entity
+        except Exception as e:
+            print(f"❌ Erro ao criar entidade: {e}")
+            raise
+    
+    async def find_by_id(self, entity_id: str) -> Optional[T]:
+        """Busca entidade por ID (consultando antes o cache, se habilitado)"""
+        cache = self.cache
+        generation = None
+        if cache is not None:
+            cached = cache.get(entity_id)
+            if cached is not None:
+                return copy.copy(cached)
+            generation = cache.generation
+        
+        try:
+            doc = await self.collection.find_one({"_id": ObjectId(entity_id)})
+            entity = self._dict_to_entity(doc)
+            if cache is not None and entity is not None:
+                cache.put(entity_id, copy.copy(entity), generation)
+            return entity
+        except Exception as e:
+            print(f"❌ Erro ao buscar entidade por ID: {e}")
+            return None
+    
+    async def find_all(self) -> List[T]:
+        """Busca todas as entidades"""
+        try:
+            return [self._dict_to_entity(doc) async for doc in self.collection.find()]
+        except Exception as e:
+            print(f"❌ Erro ao buscar todas as entidades: {e}")
+            return []
+    
+    async def find_page(self, limit: int = 100, after: Optional[str] = None,
+                        filters: Optional[Dict[str, Any]] = None,
+                        fields: Optional[List[str]] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        Busca uma página de documentos ordenada por _id (paginação por cursor).
+        
+        Filtros de igualdade, projeção e o limite são enviados ao MongoDB, que
+        percorre o índice a partir de `after` em vez de pular documentos. Retorna
+        os documentos como dicionários (com `id` em vez de `_id`) e o cursor da
+        próxima página, ou None quando não há mais documentos.
+        """
+        field_names = {f.name for f in dataclass_fields(self.entity_class)} - {"id"}
+        filters = filters or {}
+        invalid = [name for name in list(filters) + list(fields or []) if name not in field_names]
+        if invalid:
+            raise ValueError(f"Campos inválidos: {', '.join(invalid)}")
+        if limit < 1:
+            raise ValueError("limit deve ser maior que zero")
+        
+        query = dict(filters)
+        if after:
+            if not ObjectId.is_valid(after):
+                raise ValueError(f"Cursor inválido: {after}")
+            query["_id"] = {"$gt": ObjectId(after)}
+        projection = {name: 1 for name in fields} if fields else self._hidden_projection()
+        
+        # Busca um documento a mais para saber se existe próxima página
+        docs = await self.collection.find(query, projection).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+        next_cursor = str(docs[limit - 1]["_id"]) if len(docs) > limit else None
+        
+        items = [_raw_document(doc) for doc in docs[:limit]]
+        return items, next_cursor
+    
+    async def update(self, entity: T) -> T:
+        """Atualiza uma entidade existente"""
+        try:
+            if not entity.id:
+                raise ValueError("ID da entidade é obrigatório para atualização")
+            
+            entity_dict = self._entity_to_dict(entity)
+            # Remove o _id do dict para update
+            entity_dict.pop('_id', None)
+            
+            result = await self.collection.update_one(
+                {"_id": ObjectId(entity.id)},
+                {"$set": entity_dict}
+            )
+            
+            if result.matched_count == 0:
+                raise ValueError(f"Entidade com ID {entity.id} não encontrada")
+            self.invalidate_cache([entity.id])
+            
+            if self.enable_crud_publishing:
+                await self._publish_crud_operation(OperationType.UPDATE, entity)
+            
+            return entity
+        except Exception as e:
+            print(f"❌ Erro ao atualizar entidade: {e}")
+            raise
+    
+    async def delete(self, entity: T) -> None:
+        """Remove uma entidade do MongoDB"""
+        try:
+            if not entity.id:
+                raise ValueError("ID da entidade é obrigatório para exclusão")
+            
+            result = await self.collection.delete_one({"_id": ObjectId(entity.id)})
+            self.invalidate_cache([entity.id])
+            
+            if result.deleted_count > 0 and self.enable_crud_publishing:
+                await self._publish_crud_operation(OperationType.DELETE, entity)
+        except Exception as e:
+            print(f"❌ Erro ao deletar entidade: {e}")
+            raise
+    
+    async def update_fields(self, entity_id: str, changes: Dict[str, Any]) -> Optional[T]:
+        """
+        Aplica $set apenas nos campos informados e retorna a entidade atualizada.
+        
+        Usa find_one_and_update: uma única ida ao MongoDB devolve o documento
+        já alterado, que também é publicado no evento UPDATE. Retorna None se
+        a entidade não existir.
+        """
+        field_names = {f.name for f in dataclass_fields(self.entity_class)} - {"id"}
+        invalid = [name for name in changes if name not in field_names]
+        if invalid:
+            raise ValueError(f"Campos inválidos: {', '.join(invalid)}")
+        object_id = _object_id(entity_id)
+        if object_id is None:
+            return None
+        changes = self._normalize(dict(changes))
+        if not changes:
+            return await self.find_by_id(entity_id)
+        
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": object_id}, {"$set": changes}, return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            print(f"❌ Erro ao atualizar entidade: {e}")
+            raise
+        self.invalidate_cache([entity_id])
+        entity = self._dict_to_entity(doc)
+        if entity is not None and self.enable_crud_publishing:
+            await self._publish_crud_operation(OperationType.UPDATE, entity)
+        return entity
+    
+    async def delete_by_id(self, entity_id: str) -> Optional[T]:
+        """Remove a entidade com find_one_and_delete e retorna o documento removido (None se não existir)"""
+        object_id = _object_id(entity_id)
+        if object_id is None:
+            return None
+        
+        try:
+            doc = await self.collection.find_one_and_delete({"_id": object_id})
+        except Exception as e:
+            print(f"❌ Erro ao deletar entidade: {e}")
+            raise
+        self.invalidate_cache([entity_id])
+        entity = self._dict_to_entity(doc)
+        if entity is not None and self.enable_crud_publishing:
+            await self._publish_crud_operation(OperationType.DELETE, entity)
+        return entity
+    
+    def iter_documents(self, batch_size: int = 1000, since: Optional[str] = None) -> AsyncIterator[dict]:
+        """
+        Percorre a coleção inteira em ordem de _id, lote a lote, sem materializá-la.
+        
+        O filtro `since` é validado aqui (ValueError) antes de qualquer leitura,
+        para que o chamador possa recusar a requisição antes de iniciar o streaming.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser maior que zero")
+        query = _since_filter(since) if since else {}
+        cursor = self.collection.find(query, self._hidden_projection()).sort("_id", 1).batch_size(batch_size)
+        return self._iter_cursor(cursor)
+    
+    @staticmethod
+    async def _iter_cursor(cursor) -> AsyncIterator[dict]:
+        async for doc in cursor:
+            yield _raw_document(doc)
+    
+    async def _publish_crud_operations(self, operation_type: OperationType, entities: List[T]) -> None:
+        """Publica as operações CRUD de um lote em um único pipeline Redis"""
+        if not self.enable_crud_publishing or not self.redis_publisher or not entities:
+            return
+        await self.redis_publisher.publish_operations(_crud_operations(self.entity_class.__name__, operation_type, entities))
+    
+    async def find_by_ids(self, entity_ids: List[str]) -> Dict[str, T]:
+        """Busca várias entidades por ID em uma única consulta"""
+        object_ids = [oid for oid in map(_object_id, entity_ids) if oid is not None]
+        if not object_ids:
+            return {}
+        entities = [self._dict_to_entity(doc) async for doc in self.collection.find({"_id": {"$in": object_ids}})]
+        return {entity.id: entity for entity in entities}
+    
+    async def create_many(self, entities: List[T]) -> List[dict]:
+        """Cria várias entidades com um único bulk_write não ordenado (ver MongoRepository.create_many)"""
+        docs = _insert_documents(entities, self._entity_to_dict)
+        if not docs:
+            return []
+        
+        try:
+            await self.collection.bulk_write([InsertOne(doc) for doc in docs], ordered=False)
+            errors = {}
+        except BulkWriteError as e:
+            errors = _bulk_write_errors(e)
+        
+        results, created = _insert_results(entities, docs, errors)
+        await self._publish_crud_operations(OperationType.CREATE, created)
+        return results
+    
+    async def update_many(self, entities: List[T]) -> List[dict]:
+        """Atualiza várias entidades com um único bulk_write não ordenado"""
+        results, pending = _update_operations(entities, self._entity_to_dict)
+        
+        errors, matched = {}, len(pending)
+        if pending:
+            try:
+                matched = (await self.collection.bulk_write([op for _, _, op in pending], ordered=False)).matched_count
+            except BulkWriteError as e:
+                errors, matched = _update_errors(e, pending)
+            self.invalidate_cache([entity.id for _, entity, _ in pending])
+        
+        existing = None
+        if _update_needs_lookup(pending, errors, matched):
+            existing = await self.find_by_ids([entity.id for _, entity, _ in pending])
+        
+        results, updated = _update_results(entities, results, pending, errors, existing)
+        await self._publish_crud_operations(OperationType.UPDATE, updated)
+        return results
+    
+    async def delete_many(self, entity_ids: List[str]) -> List[dict]:
+        """Remove várias entidades por ID com uma consulta prévia e um único bulk_write (ver MongoRepository.delete_many)"""
+        pending = _delete_operations(entity_ids, await self.find_by_ids(entity_ids))
+        
+        errors = {}
+        if pending:
+            try:
+                await self.collection.bulk_write([op for _, _, op in pending], ordered=False)
+            except BulkWriteError as e:
+                errors = _bulk_write_errors(e)
+        
+        results, deleted = _delete_results(entity_ids, pending, errors)
+        self.invalidate_cache([entity.id for entity in deleted])
+        await self._publish_crud_operations(OperationType.DELETE, deleted)
+        return results
+    
+    def invalidate_cache(self, entity_ids: List[str]) -> None:
+        """Remove do cache as entidades alteradas (também chamado ao receber eventos CRUD de outros processos)"""
+        if self.cache is not None:
+            self.cache.invalidate(entity_ids)
+    
+    def enable_cache(self, max_size: int = 1024, ttl: Optional[float] = 60.0) -> None:
+        """Habilita o cache LRU de find_by_id (desabilitado por padrão)"""
+        self.cache = EntityCache(max_size=max_size, ttl=ttl)
+    
+    def disable_cache(self) -> None:
+        """Desabilita e descarta o cache de find_by_id"""
+        self.cache = None
+    
+    def cache_stats(self) -> Optional[dict]:
+        """Retorna os contadores do cache, ou None se estiver desabilitado"""
+        return self.cache.stats() if self.cache is not None else None
+    
+    async def set_enable_crud_publishing(self, enable: bool) -> None:
+        """Habilita ou desabilita a publicação de eventos CRUD"""
+        self.enable_crud_publishing = enable
+        if enable and not self.redis_publisher:
+            self.redis_publisher = get_async_publisher()
+        elif not enable:
+            self.redis_publisher = None
+    
+    async def close(self) -> None:
+        """Solta o publisher do repositório (os compartilhados são fechados por close_async_publishers)"""
+        self.redis_publisher = None
+
+
+# Repositórios específicos
+class AsyncUsuarioRepository(AsyncMongoRepository[Usuario]):
+    def __init__(self, mongodb: AsyncMongoDB, enable_crud_publishing: bool = True,
+                 redis_publisher: Optional[AsyncRedisPublisher] = None):
+        super().__init__(mongodb, "usuarios", Usuario, enable_crud_publishing, redis_publisher)
+
+
+class AsyncObraRepository(ObraDocumentMixin, AsyncMongoRepository[Obra]):
+    hidden_fields = tuple(SEARCH_KEYS.values())
+    
+    def __init__(self, mongodb: AsyncMongoDB, enable_crud_publishing: bool = True,
+                 redis_publisher: Optional[AsyncRedisPublisher] = None):
+        super().__init__(mongodb, "obras", Obra, enable_crud_publishing, redis_publisher)
+    
+    def _to_result(self, doc: dict) -> dict:
+        # Os campos auxiliares já vêm fora da projeção; o score (modo texto) segue no resultado
+        return _raw_document(doc)
+    
+    async def search(self, q: Optional[str] = None, isbn: Optional[str] = None, mode: str = "auto",
+                     limit: int = 20, offset: int = 0) -> dict:
+        """
+        Busca no catálogo por ISBN exato, por texto ou por prefixo de título/autor.
+        
+        - isbn: consulta de igualdade no índice único de isbn
+        - "texto": índice de texto em titulo_principal/autor_principal, ordenado por relevância
+        - "prefixo": prefixo ancorado sobre as chaves sem acento/maiúsculas;
+          títulos que começam com o termo vêm antes dos autores
+        - "auto": texto e, se nada for encontrado, prefixo (útil para fragmentos de palavras)
+        
+        A paginação é por offset, pois a ordem é por relevância. Retorna o modo
+        usado, para que as próximas páginas repitam o mesmo modo.
+        """
+        if isbn:
+            doc = await self.collection.find_one({"isbn": isbn}, self._hidden_projection())
+            return {"modo": "isbn", "resultados": [self._to_result(doc)] if doc else [], "proximo_offset": None}
+        if not q or not q.strip():
+            raise ValueError("Informe q ou isbn")
+        if mode not in ("auto", "texto", "prefixo"):
+            raise ValueError(f"Modo de busca inválido: {mode}")
+        
+        if mode in ("auto", "texto"):
+            docs = await self._search_text(q, limit + 1, offset)
+            if docs or mode == "texto":
+                return self._search_page("texto", docs, limit, offset)
+        return self._search_page("prefixo", await self._search_prefix(q, limit + 1, offset), limit, offset)
+    
+    def _search_page(self, mode: str, docs: List[dict], limit: int, offset: int) -> dict:
+        return {
+            "modo": mode,
+            "resultados": [self._to_result(doc) for doc in docs[:limit]],
+            "proximo_offset": offset + limit if len(docs) > limit else None
+        }
+    
+    async def _search_text(self, q: str, limit: int, offset: int) -> List[dict]:
+        projection = {"score": {"$meta": "textScore"}, **(self._hidden_projection() or {})}
+        cursor = (self.collection.find({"$text": {"$search": q}}, projection)
+                  .sort([("score", {"$meta": "textScore"})]).skip(offset).limit(limit))
+        return await cursor.to_list(length=limit)
+    
+    async def _search_prefix(self, q: str, limit: int, offset: int) -> List[dict]:
+        pattern = re.compile("^" + re.escape(chave_busca(q.strip())))
+        by_title = {"busca_titulo": pattern}
+        # Primeiro os títulos com o prefixo; depois os autores com o prefixo cujo título não o tem
+        by_author = {"busca_autor": pattern, "busca_titulo": {"$not": pattern}}
+        
+        docs = await (self.collection.find(by_title, self._hidden_projection())
+                      .sort("busca_titulo", ASCENDING).skip(offset).limit(limit).to_list(length=limit))
+        if len(docs) < limit:
+            # Só é preciso contar os títulos quando a página começa depois deles
+            skip = max(0, offset - await self.collection.count_documents(by_title)) if offset and not docs else 0
+            docs += await (self.collection.find(by_author, self._hidden_projection())
+                           .sort("busca_autor", ASCENDING).skip(skip).limit(limit - len(docs))
+                           .to_list(length=limit - len(docs)))
+        return docs
+    
+    async def backfill_search_keys(self, batch_size: int = 1000) -> int:
+        """Migração: grava as chaves de busca nas obras cadastradas antes delas existirem"""
+        alterados, operacoes = 0, []
+        query = {"$or": [{key: {"$exists": False}} for key in SEARCH_KEYS.values()]}
+        async for doc in self.collection.find(query, list(SEARCH_KEYS)).batch_size(batch_size):
+            operacoes.append(UpdateOne({"_id": doc["_id"]}, {"$set": self._normalize(
+                {field: doc.get(field, "") for field in SEARCH_KEYS}
+            )}))
+            if len(operacoes) >= batch_size:
+                alterados += (await self.collection.bulk_write(operacoes, ordered=False)).modified_count
+                operacoes = []
+        if operacoes:
+            alterados += (await self.collection.bulk_write(operacoes, ordered=False)).modified_count
+        return alterados
+
+
+class AsyncRegistroEmprestimoRepository(RegistroEmprestimoDocumentMixin, AsyncMongoRepository[RegistroEmprestimo]):
+    def __init__(self, mongodb: AsyncMongoDB, enable_crud_publishing: bool = True,
+                 redis_publisher: Optional[AsyncRedisPublisher] = None):
+        super().__init__(mongodb, "registros_emprestimo", RegistroEmprestimo, enable_crud_publishing, redis_publisher)
+    
+    async def normalize_stored_dates(self, batch_size: int = 1000) -> int:
+        """
+        Migração: reescreve no formato ISO as datas gravadas como texto livre.
+        
+        Percorre a coleção uma vez e envia as correções em bulk_write de até
+        `batch_size` operações. Datas que não podem ser interpretadas são
+        mantidas e reportadas. Retorna o número de documentos alterados.
+        """
+        alterados, operacoes = 0, []
+        projection = {field: 1 for field in DATE_FIELDS}
+        async for doc in self.collection.find({}, projection).batch_size(batch_size):
+            mudancas = {}
+            for field in DATE_FIELDS:
+                valor = doc.get(field, "")
+                try:
+                    normalizado = normalizar_data(valor)
+                except ValueError:
+                    print(f"⚠️ Data inválida em {doc['_id']}.{field}: {valor}")
+                    continue
+                if normalizado != valor:
+                    mudancas[field] = normalizado
+            if mudancas:
+                operacoes.append(UpdateOne({"_id": doc["_id"]}, {"$set": mudancas}))
+            if len(operacoes) >= batch_size:
+                alterados += (await self.collection.bulk_write(operacoes, ordered=False)).modified_count
+                operacoes = []
+        if operacoes:
+            alterados += (await self.collection.bulk_write(operacoes, ordered=False)).modified_count
+        if alterados and self.cache is not None:
+            self.cache.clear()
+        return alterados
+    
+    async def _find_sorted(self, query: dict, limit: int, raw: bool) -> list:
+        cursor = self.collection.find(query).sort("data_previsao_devolucao", 1).limit(limit)
+        convert = _raw_document if raw else self._dict_to_entity
+        return [convert(doc) async for doc in cursor]
+    
+    async def find_by_usuario(self, usuario_id: str, limit: int = 100, raw: bool = False) -> list:
+        """
+        Empréstimos de um usuário por data prevista de devolução (índice usuario_id + data).
+        
+        Com raw=True retorna os documentos como dicionários, sem criar entidades
+        (caminho usado pelas listagens da API).
+        """
+        return await self._find_sorted({"usuario_id": usuario_id}, limit, raw)
+    
+    async def find_by_obra(self, obra_id: str, limit: int = 100, raw: bool = False) -> list:
+        """Empréstimos de uma obra por data prevista de devolução (índice obra_id + data); ver find_by_usuario"""
+        return await self._find_sorted({"obra_id": obra_id}, limit, raw)
+    
+    async def overdue_report(self, as_of: str, limit: int = 100) -> dict:
+        """
+        Relatório de empréstimos atrasados na data `as_of` (previsão de devolução anterior a ela).
+        
+        Executado inteiramente no MongoDB por um pipeline de agregação: o $match
+        usa o índice de data_previsao_devolucao e o $facet devolve, em uma ida,
+        o total, os empréstimos mais atrasados e o resumo por usuário. A saída
+        do $facet é um único documento (máximo de 16 MB), então o resumo também
+        traz só os `limit` usuários com mais atrasos; total_usuarios conta todos.
+        """
+        referencia = normalizar_data(as_of)
+        if not referencia:
+            raise ValueError("Informe a data de referência")
+        pipeline = [
+            {"$match": {"data_previsao_devolucao": {"$gt": "", "$lt": referencia}}},
+            {"$sort": {"data_previsao_devolucao": 1}},
+            {"$facet": {
+                "total": [{"$count": "quantidade"}],
+                "emprestimos": [{"$limit": limit}],
+                "por_usuario": [
+                    {"$group": {"_id": "$usuario_id", "quantidade": {"$sum": 1},
+                                "previsao_mais_antiga": {"$min": "$data_previsao_devolucao"}}},
+                    {"$sort": {"quantidade": -1, "_id": 1}},
+                    {"$limit": limit}
+                ],
+                "total_usuarios": [{"$group": {"_id": "$usuario_id"}}, {"$count": "quantidade"}]
+            }}
+        ]
+        resultado = (await self.collection.aggregate(pipeline).to_list(length=1))[0]
+        
+        data_referencia = date.fromisoformat(referencia)
+        emprestimos = []
+        for entity in map(self._dict_to_entity, resultado["emprestimos"]):
+            try:
+                dias = (data_referencia - date.fromisoformat(normalizar_data(entity.data_previsao_devolucao))).days
+            except ValueError:
+                dias = None  # registro antigo com data fora do padrão (ver normalize_stored_dates)
+            emprestimos.append({**entity.__dict__, "dias_atraso": dias})
+        return {
+            "data_referencia": referencia,
+            "total": resultado["total"][0]["quantidade"] if resultado["total"] else 0,
+            "emprestimos": emprestimos,
+            "total_usuarios": resultado["total_usuarios"][0]["quantidade"] if resultado["total_usuarios"] else 0,
+            "por_usuario": [
+                {"usuario_id": g["_id"], "quantidade": g["quantidade"], "previsao_mais_antiga": g["previsao_mais_antiga"]}
+                for g in resultado["por_usuario"]
+            ]
+        }
@@ -1,14 +1,178 @@
 import json
-from typing import Generic, TypeVar, Type, List, Optional
+from dataclasses import fields as dataclass_fields
+from typing import Callable, Generic, TypeVar, Type, List, Optional, Dict, Any, Tuple
 from bson import ObjectId
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
 from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
 
-from ..domain.entities import Usuario, Obra, RegistroEmprestimo
+from ..domain.entities import Usuario, Obra, RegistroEmprestimo, chave_busca, normalizar_data
 from ..infrastructure.database import MongoDB
-from ..infrastructure.redis_publisher import RedisPublisher, CrudOperation, OperationType, Source
+from ..infrastructure.redis_publisher import CrudOperation, OperationType, Source, get_publisher
 
 T = TypeVar('T')
 
+# Campos de data do RegistroEmprestimo, gravados como texto ISO (AAAA-MM-DD)
+DATE_FIELDS = ("data_inicio", "data_previsao_devolucao")
+
+# Chaves de busca da Obra (minúsculas, sem acentos) gravadas junto ao documento
+SEARCH_KEYS = {"titulo_principal": "busca_titulo", "autor_principal": "busca_autor"}
+
+
+def _bulk_write_errors(error: BulkWriteError) -> Dict[int, str]:
+    """Extrai os erros por posição de um BulkWriteError (bulk_write não ordenado)"""
+    return {e["index"]: e.get("errmsg", "erro de escrita") for e in error.details.get("writeErrors", [])}
+
+
+def _bulk_result(index: int, entity_id: Optional[str], error: Optional[str] = None) -> dict:
+    """Monta o resultado de um item de uma operação em lote"""
+    if error:
+        return {"index": index, "id": entity_id, "ok": False, "error": error}
+    return {"index": index, "id": entity_id, "ok": True}
+
+
+def _object_id(entity_id: Optional[str]) -> Optional[ObjectId]:
+    """Converte um ID string em ObjectId, retornando None se for inválido"""
+    return ObjectId(entity_id) if entity_id and ObjectId.is_valid(entity_id) else None
+
+
+# Etapas das operações em lote sem I/O, comuns a MongoRepository e AsyncMongoRepository:
+# cada versão só executa (ou aguarda) as idas ao MongoDB entre elas.
+def _insert_documents(entities: list, to_dict: Callable[[Any], dict]) -> List[dict]:
+    """Documentos de create_many, já com o _id gerado"""
+    docs = []
+    for entity in entities:
+        doc = to_dict(entity)
+        doc.setdefault('_id', ObjectId())
+        docs.append(doc)
+    return docs
+
+
+def _insert_results(entities: list, docs: List[dict], errors: Dict[int, str]) -> Tuple[List[dict], list]:
+    """Resultado por item de create_many e as entidades gravadas (com o ID atribuído)"""
+    results, created = [], []
+    for index, (entity, doc) in enumerate(zip(entities, docs)):
+        if index in errors:
+            results.append(_bulk_result(index, None, errors[index]))
+            continue
+        entity.id = str(doc['_id'])
+        created.append(entity)
+        results.append(_bulk_result(index, entity.id))
+    return results, created
+
+
+def _update_operations(entities: list, to_dict: Callable[[Any], dict]) -> Tuple[Dict[int, dict], list]:
+    """Resultados dos itens sem ID válido e as operações (índice, entidade, UpdateOne) de update_many"""
+    results: Dict[int, dict] = {}
+    pending = []
+    for index, entity in enumerate(entities):
+        object_id = _object_id(entity.id)
+        if object_id is None:
+            results[index] = _bulk_result(index, entity.id, "ID da entidade é obrigatório para atualização")
+            continue
+        entity_dict = to_dict(entity)
+        entity_dict.pop('_id', None)
+        pending.append((index, entity, UpdateOne({"_id": object_id}, {"$set": entity_dict})))
+    return results, pending
+
+
+def _update_errors(error: BulkWriteError, pending: list) -> Tuple[Dict[int, str], int]:
+    """Erros de update_many por índice do lote original e quantos documentos foram encontrados"""
+    errors = {pending[i][0]: msg for i, msg in _bulk_write_errors(error).items()}
+    return errors, error.details.get("nMatched", 0)
+
+
+def _update_needs_lookup(pending: list, errors: Dict[int, str], matched: int) -> bool:
+    """Só é preciso consultar quais IDs existem quando algum item não foi encontrado"""
+    return matched < len(pending) - len(errors)
+
+
+def _update_results(entities: list, results: Dict[int, dict], pending: list, errors: Dict[int, str],
+                    existing: Optional[Dict[str, Any]] = None) -> Tuple[List[dict], list]:
+    """Resultado por item de update_many e as entidades atualizadas (existing: IDs encontrados, se consultados)"""
+    updated = []
+    for index, entity, _ in pending:
+        if index in errors:
+            results[index] = _bulk_result(index, entity.id, errors[index])
+        elif existing is not None and entity.id not in existing:
+            results[index] = _bulk_result(index, entity.id, f"Entidade com ID {entity.id} não encontrada")
+        else:
+            updated.append(entity)
+            results[index] = _bulk_result(index, entity.id)
+    return [results[index] for index in range(len(entities))], updated
+
+
+def _delete_operations(entity_ids: List[str], pre_images: Dict[str, Any]) -> list:
+    """Operações (índice, entidade, DeleteOne) de delete_many, uma por ID encontrado na consulta prévia"""
+    pending, seen = [], set()
+    for index, entity_id in enumerate(entity_ids):
+        if entity_id in pre_images and entity_id not in seen:
+            seen.add(entity_id)
+            pending.append((index, pre_images[entity_id], DeleteOne({"_id": ObjectId(entity_id)})))
+    return pending
+
+
+def _delete_results(entity_ids: List[str], pending: list, errors: Dict[int, str]) -> Tuple[List[dict], list]:
+    """
+    Resultado por item de delete_many (errors: erros do bulk_write por posição
+    em pending) e as entidades removidas; IDs ausentes ou repetidos saem como
+    não encontrados.
+    """
+    results = [_bulk_result(index, entity_id, f"Entidade com ID {entity_id} não encontrada")
+               for index, entity_id in enumerate(entity_ids)]
+    deleted = []
+    for position, (index, entity, _) in enumerate(pending):
+        if position in errors:
+            results[index] = _bulk_result(index, entity.id, errors[position])
+        else:
+            deleted.append(entity)
+            results[index] = _bulk_result(index, entity.id)
+    return results, deleted
+
+
+def _crud_operations(entity_name: str, operation_type: OperationType, entities: list) -> List[CrudOperation]:
+    """Eventos CRUD de um lote de entidades"""
+    return [
+        CrudOperation(
+            entity=entity_name,
+            operation=operation_type,
+            source=Source.ODM,
+            data=json.dumps(entity.__dict__, default=str)
+        )
+        for entity in entities
+    ]
+
+
+class ObraDocumentMixin:
+    """Normalização dos documentos de Obra, comum às versões síncrona e assíncrona do repositório"""
+    
+    def _normalize(self, values: dict) -> dict:
+        """Acrescenta as chaves de busca por prefixo de título e autor"""
+        for field, key in SEARCH_KEYS.items():
+            if field in values:
+                values[key] = chave_busca(values[field])
+        return values
+    
+    def _entity_to_dict(self, entity: Obra) -> dict:
+        return self._normalize(super()._entity_to_dict(entity))
+
+
+class RegistroEmprestimoDocumentMixin:
+    """Normalização dos documentos de RegistroEmprestimo, comum às versões síncrona e assíncrona do repositório"""
+    
+    def _normalize(self, values: dict) -> dict:
+        """Grava as datas no formato ISO (AAAA-MM-DD), comparável e indexável"""
+        for field in DATE_FIELDS:
+            if field in values:
+                values[field] = normalizar_data(values[field])
+        return values
+    
+    def _entity_to_dict(self, entity: RegistroEmprestimo) -> dict:
+        # Normaliza a própria entidade, para que o retorno reflita o que foi gravado
+        for field, value in self._normalize({field: getattr(entity, field) for field in DATE_FIELDS}).items():
+            setattr(entity, field, value)
+        return super()._entity_to_dict(entity)
+
 
 class MongoRepository(Generic[T]):
     def __init__(self, mongodb: MongoDB, collection_name: str, entity_class: Type[T], enable_crud_publishing: bool = True):
@@ -16,7 +180,8 @@ class MongoRepository(Generic[T]):
         self.collection: Collection = mongodb.get_collection(collection_name)
         self.entity_class = entity_class
         self.enable_crud_publishing = enable_crud_publishing
-        self.redis_publisher = RedisPublisher() if enable_crud_publishing else None
+        self.redis_publisher = get_publisher() if enable_crud_publishing else None
+        self._field_names = {f.name for f in dataclass_fields(entity_class)}
     
     def _entity_to_dict(self, entity: T) -> dict:
         """Converte entidade para dicionário MongoDB"""
@@ -33,6 +198,10 @@ class MongoRepository(Generic[T]):
                 pass
         return entity_dict
     
+    def _normalize(self, values: dict) -> dict:
+        """Ajusta os valores antes da gravação (sobrescrito por repositórios específicos)"""
+        return values
+    
     def _dict_to_entity(self, doc: dict) -> T:
         """Converte documento MongoDB para entidade"""
         if doc is None:
@@ -43,7 +212,8 @@ class MongoRepository(Generic[T]):
             doc['id'] = str(doc['_id'])
             del doc['_id']
         
-        return self.entity_class(**doc)
+        # Ignora campos auxiliares gravados só para consultas (ex.: chaves de busca)
+        return self.entity_class(**{k: v for k, v in doc.items() if k in self._field_names})
     
     def _publish_crud_operation(self, operation_type: OperationType, entity: T) -> None:
         """Publica operação CRUD no Redis"""
@@ -143,13 +313,137 @@ class MongoRepository(Generic[T]):
             print(f"❌ Erro ao deletar entidade: {e}")
             raise
     
+    def update_fields(self, entity_id: str, changes: Dict[str, Any]) -> Optional[T]:
+        """
+        Aplica $set apenas nos campos informados e retorna a entidade atualizada.
+        
+        Usa find_one_and_update: uma única ida ao MongoDB devolve o documento
+        já alterado, que também é publicado no evento UPDATE. Retorna None se
+        a entidade não existir.
+        """
+        field_names = {f.name for f in dataclass_fields(self.entity_class)} - {"id"}
+        invalid = [name for name in changes if name not in field_names]
+        if invalid:
+            raise ValueError(f"Campos inválidos: {', '.join(invalid)}")
+        object_id = _object_id(entity_id)
+        if object_id is None:
+            return None
+        changes = self._normalize(dict(changes))
+        if not changes:
+            return self.find_by_id(entity_id)
+        
+        try:
+            doc = self.collection.find_one_and_update(
+                {"_id": object_id}, {"$set": changes}, return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            print(f"❌ Erro ao atualizar entidade: {e}")
+            raise
+        entity = self._dict_to_entity(doc)
+        if entity is not None and self.enable_crud_publishing:
+            self._publish_crud_operation(OperationType.UPDATE, entity)
+        return entity
+    
+    def delete_by_id(self, entity_id: str) -> Optional[T]:
+        """Remove a entidade com find_one_and_delete e retorna o documento removido (None se não existir)"""
+        object_id = _object_id(entity_id)
+        if object_id is None:
+            return None
+        
+        try:
+            doc = self.collection.find_one_and_delete({"_id": object_id})
+        except Exception as e:
+            print(f"❌ Erro ao deletar entidade: {e}")
+            raise
+        entity = self._dict_to_entity(doc)
+        if entity is not None and self.enable_crud_publishing:
+            self._publish_crud_operation(OperationType.DELETE, entity)
+        return entity
+    
+    def _publish_crud_operations(self, operation_type: OperationType, entities: List[T]) -> None:
+        """Publica as operações CRUD de um lote em um único pipeline Redis"""
+        if not self.enable_crud_publishing or not self.redis_publisher or not entities:
+            return
+        self.redis_publisher.publish_operations(_crud_operations(self.entity_class.__name__, operation_type, entities))
+    
+    def find_by_ids(self, entity_ids: List[str]) -> Dict[str, T]:
+        """Busca várias entidades por ID em uma única consulta"""
+        object_ids = [oid for oid in map(_object_id, entity_ids) if oid is not None]
+        if not object_ids:
+            return {}
+        entities = [self._dict_to_entity(doc) for doc in self.collection.find({"_id": {"$in": object_ids}})]
+        return {entity.id: entity for entity in entities}
+    
+    def create_many(self, entities: List[T]) -> List[dict]:
+        """
+        Cria várias entidades com um único bulk_write não ordenado.
+        
+        Um item com erro (ex.: ISBN duplicado) não interrompe os demais. Retorna
+        o resultado de cada item na ordem recebida e publica os eventos CREATE
+        dos itens gravados em um único pipeline.
+        """
+        docs = _insert_documents(entities, self._entity_to_dict)
+        if not docs:
+            return []
+        
+        try:
+            self.collection.bulk_write([InsertOne(doc) for doc in docs], ordered=False)
+            errors = {}
+        except BulkWriteError as e:
+            errors = _bulk_write_errors(e)
+        
+        results, created = _insert_results(entities, docs, errors)
+        self._publish_crud_operations(OperationType.CREATE, created)
+        return results
+    
+    def update_many(self, entities: List[T]) -> List[dict]:
+        """Atualiza várias entidades com um único bulk_write não ordenado"""
+        results, pending = _update_operations(entities, self._entity_to_dict)
+        
+        errors, matched = {}, len(pending)
+        if pending:
+            try:
+                matched = self.collection.bulk_write([op for _, _, op in pending], ordered=False).matched_count
+            except BulkWriteError as e:
+                errors, matched = _update_errors(e, pending)
+        
+        existing = None
+        if _update_needs_lookup(pending, errors, matched):
+            existing = self.find_by_ids([entity.id for _, entity, _ in pending])
+        
+        results, updated = _update_results(entities, results, pending, errors, existing)
+        self._publish_crud_operations(OperationType.UPDATE, updated)
+        return results
+    
+    def delete_many(self, entity_ids: List[str]) -> List[dict]:
+        """
+        Remove várias entidades por ID com um único bulk_write não ordenado.
+        
+        Os documentos a remover são lidos antes em uma única consulta ($in):
+        eles definem quais itens existem e são os publicados nos eventos DELETE.
+        Um documento removido por outro processo entre a consulta e o
+        bulk_write também sai como removido.
+        """
+        pending = _delete_operations(entity_ids, self.find_by_ids(entity_ids))
+        
+        errors = {}
+        if pending:
+            try:
+                self.collection.bulk_write([op for _, _, op in pending], ordered=False)
+            except BulkWriteError as e:
+                errors = _bulk_write_errors(e)
+        
+        results, deleted = _delete_results(entity_ids, pending, errors)
+        self._publish_crud_operations(OperationType.DELETE, deleted)
+        return results
+    
     def set_enable_crud_publishing(self, enable: bool) -> None:
         """Habilita ou desabilita a publicação de eventos CRUD"""
         self.enable_crud_publishing = enable
         if enable and not self.redis_publisher:
-            self.redis_publisher = RedisPublisher()
-        elif not enable and self.redis_publisher:
-            self.redis_publisher.close()
+            self.redis_publisher = get_publisher()
+        elif not enable:
+            # O publisher é o compartilhado do processo (fechado por close_publishers)
             self.redis_publisher = None
 
 
@@ -159,11 +453,11 @@ class UsuarioRepository(MongoRepository[Usuario]):
         super().__init__(mongodb, "usuarios", Usuario, enable_crud_publishing)
 
 
-class ObraRepository(MongoRepository[Obra]):
+class ObraRepository(ObraDocumentMixin, MongoRepository[Obra]):
     def __init__(self, mongodb: MongoDB, enable_crud_publishing: bool = True):
         super().__init__(mongodb, "obras", Obra, enable_crud_publishing)
 
 
-class RegistroEmprestimoRepository(MongoRepository[RegistroEmprestimo]):
+class RegistroEmprestimoRepository(RegistroEmprestimoDocumentMixin, MongoRepository[RegistroEmprestimo]):
     def __init__(self, mongodb: MongoDB, enable_crud_publishing: bool = True):
         super().__init__(mongodb, "registros_emprestimo", RegistroEmprestimo, enable_crud_publishing)
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Teste de carga da API do Sistema de Biblioteca (SB)
+
+Dispara requisições concorrentes contra um servidor já em execução e
+reporta requisições por segundo e latências p50/p99 por cenário:
+- GET /usuarios/{id} sobre um conjunto de usuários criados no aquecimento
+- POST /usuarios
+Execute-o contra o build anterior e contra o atual para comparar.
+
+Uso:
+    python main.py                                        # em outro terminal
+    python benchmark_api.py [--url http://localhost:8080] [--requisicoes 5000] [--concorrencia 64]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+async def executar_cenario(nome: str, client: httpx.AsyncClient, requisicao, total: int, concorrencia: int) -> None:
+    semaphore = asyncio.Semaphore(concorrencia)
+    latencies = []
+    erros = 0
+    
+    async def uma(i: int) -> None:
+        nonlocal erros
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await requisicao(i)
+                if response.status_code >= 400:
+                    erros += 1
+            except httpx.HTTPError:
+                erros += 1
+            latencies.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(uma(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    print(f"{nome:24} {total / elapsed:9.0f} req/s   p50 {percentile(latencies, 0.50) * 1000:7.2f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms   erros {erros}")
+
+
+async def main_async(args) -> None:
+    limits = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        ids = []
+        for i in range(args.usuarios):
+            response = await client.post("/usuarios", json={"prenome": f"Carga{i}", "sobrenome": "Benchmark"})
+            ids.append(response.json()["id"])
+        
+        print(f"📊 {args.requisicoes} requisições por cenário, concorrência {args.concorrencia}")
+        await executar_cenario(
+            "GET /usuarios/{id}", client,
+            lambda i: client.get(f"/usuarios/{ids[i % len(ids)]}"),
+            args.requisicoes, args.concorrencia
+        )
+        await executar_cenario(
+            "POST /usuarios", client,
+            lambda i: client.post("/usuarios", json={"prenome": f"Post{i}", "sobrenome": "Benchmark"}),
+            args.requisicoes, args.concorrencia
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API do SB")
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--requisicoes", type=int, default=5000)
+    parser.add_argument("--concorrencia", type=int, default=64)
+    parser.add_argument("--usuarios", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
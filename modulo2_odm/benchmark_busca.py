@@ -0,0 +1,121 @@
+"""
+Busca no catálogo de obras do Sistema de Biblioteca (SB)
+
+Gera um catálogo sintético (1 milhão de obras por padrão) em um banco
+separado, cria os índices do SB e mede a latência (p50/p99) da busca por
+texto, por prefixo e por ISBN de AsyncObraRepository.search, comparando com
+o regex sem âncora e sem índice que o filtro no cliente equivaleria. Exige
+um mongod local.
+
+Uso (a partir da raiz do projeto):
+    python modulo2_odm/benchmark_busca.py [--obras 1000000] [--consultas 200] [--reusar] [--manter]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modulo2_odm.application.async_repository import AsyncObraRepository
+from modulo2_odm.domain.entities import chave_busca
+from modulo2_odm.infrastructure.database import AsyncMongoDB, MongoDB
+
+BANCO = "biblioteca_benchmark_busca"
+PALAVRAS = ["memórias", "póstumas", "sertão", "cidade", "história", "vidas", "secas", "capitães", "areia",
+            "quincas", "borba", "triste", "fim", "policarpo", "quaresma", "hora", "estrela", "grande",
+            "veredas", "angústia", "amor", "noite", "mar", "morte", "tempo", "vento", "casa", "rio"]
+AUTORES = ["Machado de Assis", "Graciliano Ramos", "Jorge Amado", "Clarice Lispector", "Lima Barreto",
+           "Guimarães Rosa", "Cecília Meireles", "Érico Veríssimo", "Rachel de Queiroz", "Aluísio Azevedo"]
+
+
+def popular(total: int, lote: int = 10000) -> None:
+    """Insere `total` obras sintéticas (com as chaves de busca) e cria os índices"""
+    mongodb = MongoDB(database_name=BANCO, create_indexes=False)
+    colecao = mongodb.get_collection("obras")
+    colecao.drop()
+    aleatorio = random.Random(42)
+    inicio = time.perf_counter()
+    for base in range(0, total, lote):
+        documentos = []
+        for i in range(base, min(base + lote, total)):
+            titulo = " ".join(aleatorio.sample(PALAVRAS, 3)).capitalize()
+            autor = aleatorio.choice(AUTORES)
+            documentos.append({
+                "codigo": f"OB{i:07d}", "isbn": f"978{i:010d}",
+                "titulo_principal": titulo, "autor_principal": autor,
+                "busca_titulo": chave_busca(titulo), "busca_autor": chave_busca(autor),
+            })
+        colecao.insert_many(documentos, ordered=False)
+    print(f"  {total} obras inseridas em {time.perf_counter() - inicio:.1f} s")
+    inicio = time.perf_counter()
+    mongodb.close()
+    MongoDB(database_name=BANCO, create_indexes=True).close()
+    print(f"  índices criados em {time.perf_counter() - inicio:.1f} s")
+
+
+async def latencias(consulta, termos: list) -> dict:
+    amostras = []
+    for termo in termos:
+        inicio = time.perf_counter()
+        await consulta(termo)
+        amostras.append((time.perf_counter() - inicio) * 1000)
+    amostras.sort()
+    return {"p50": statistics.median(amostras), "p99": amostras[min(len(amostras) - 1, int(len(amostras) * 0.99))]}
+
+
+async def medir(args) -> None:
+    mongodb = AsyncMongoDB(database_name=BANCO)
+    repo = AsyncObraRepository(mongodb, enable_crud_publishing=False)
+    aleatorio = random.Random(7)
+    palavras = [aleatorio.choice(PALAVRAS) for _ in range(args.consultas)]
+    prefixos = [p[:3] for p in palavras]
+    isbns = [f"978{aleatorio.randrange(args.obras):010d}" for _ in range(args.consultas)]
+
+    async def sem_indice(termo: str) -> None:
+        # Equivalente a filtrar no cliente: regex sem âncora, sem índice utilizável
+        padrao = re.compile(re.escape(termo), re.IGNORECASE)
+        consulta = {"$or": [{"titulo_principal": padrao}, {"autor_principal": padrao}]}
+        await repo.collection.find(consulta).limit(args.limit).to_list(args.limit)
+
+    cenarios = [
+        ("texto", lambda t: repo.search(q=t, mode="texto", limit=args.limit), palavras),
+        ("prefixo", lambda t: repo.search(q=t, mode="prefixo", limit=args.limit), prefixos),
+        ("isbn", lambda t: repo.search(isbn=t), isbns),
+        ("regex sem índice", sem_indice, palavras[:max(1, args.consultas // 10)]),
+    ]
+    print(f"📊 {args.consultas} consultas por cenário, limit={args.limit}")
+    for nome, consulta, termos in cenarios:
+        resultado = await latencias(consulta, termos)
+        print(f"  {nome:17}: p50 {resultado['p50']:8.2f} ms   p99 {resultado['p99']:8.2f} ms")
+    mongodb.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência da busca no catálogo do SB")
+    parser.add_argument("--obras", type=int, default=1_000_000)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--reusar", action="store_true", help="Usa o catálogo já gerado em vez de recriá-lo")
+    parser.add_argument("--manter", action="store_true", help="Não apaga o banco de benchmark ao final")
+    args = parser.parse_args()
+
+    print(f"📚 Catálogo sintético em '{BANCO}'")
+    if not args.reusar:
+        popular(args.obras)
+    try:
+        asyncio.run(medir(args))
+    finally:
+        if not args.manter:
+            mongodb = MongoDB(database_name=BANCO, create_indexes=False)
+            mongodb.client.drop_database(BANCO)
+            mongodb.close()
+
+
+if __name__ == "__main__":
+    main()
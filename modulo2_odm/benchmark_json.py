@@ -0,0 +1,120 @@
+"""
+Serialização das listagens da API do Sistema de Biblioteca (SB)
+
+Compara, para GET /usuarios com 10 mil documentos, o caminho antigo
+(response_model=List[dict]: validação e jsonable_encoder do FastAPI, depois
+json.dumps) com o caminho rápido atual (documentos serializados direto com
+orjson em um FastJSONResponse). A primeira medição usa os documentos em
+memória e isola o custo do framework e da serialização; com --com-mongo, a
+API real é percorrida página a página contra um mongod local.
+
+Uso (a partir da raiz do projeto):
+    python modulo2_odm/benchmark_json.py [--documentos 10000] [--limit 1000] [--repeticoes 20] [--com-mongo]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modulo2_odm.presentation.schemas import FastJSONResponse, UsuarioResponse
+
+
+def usuarios_sinteticos(total: int) -> List[dict]:
+    return [{"id": f"{i:024x}", "prenome": f"Usuário {i}", "sobrenome": "Benchmark", "situacao_matricula": "ATIVO"}
+            for i in range(total)]
+
+
+def app_comparacao(paginas: List[List[dict]]) -> FastAPI:
+    """Mesmas páginas servidas pelos dois caminhos, sem banco"""
+    app = FastAPI()
+
+    @app.get("/antigo", response_model=List[dict])
+    async def antigo(pagina: int):
+        return paginas[pagina]
+
+    @app.get("/novo", response_model=List[UsuarioResponse])
+    async def novo(pagina: int):
+        return FastJSONResponse(paginas[pagina])
+
+    return app
+
+
+async def percorrer(client: httpx.AsyncClient, rota: str, paginas: int, repeticoes: int) -> float:
+    """Requisições por segundo ao percorrer todas as páginas `repeticoes` vezes"""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for pagina in range(paginas):
+            (await client.get(rota, params={"pagina": pagina})).raise_for_status()
+    return paginas * repeticoes / (time.perf_counter() - inicio)
+
+
+async def medir_em_memoria(args) -> None:
+    documentos = usuarios_sinteticos(args.documentos)
+    paginas = [documentos[i:i + args.limit] for i in range(0, len(documentos), args.limit)]
+    transport = httpx.ASGITransport(app=app_comparacao(paginas))
+    async with httpx.AsyncClient(transport=transport, base_url="http://sb") as client:
+        print(f"📊 {args.documentos} usuários em memória, páginas de {args.limit}, {args.repeticoes} passadas")
+        base = None
+        for nome, rota in (("antigo (List[dict])", "/antigo"), ("rápido (orjson)", "/novo")):
+            throughput = await percorrer(client, rota, len(paginas), args.repeticoes)
+            base = base or throughput
+            print(f"  {nome:20}: {throughput:8.0f} req/s  {throughput * args.limit:10.0f} docs/s  ({throughput / base:.2f}x)")
+
+
+async def medir_com_mongo(args) -> None:
+    from modulo2_odm.presentation.api import app, lifespan
+
+    os.environ.setdefault("SB_CREATE_INDEXES", "0")
+    async with lifespan(app):
+        repo = app.state.usuario_repo
+        await repo.set_enable_crud_publishing(False)
+        resultados = await repo.create_many([
+            repo.entity_class(prenome=f"Usuário {i}", sobrenome="BenchmarkJSON") for i in range(args.documentos)
+        ])
+        ids = [r["id"] for r in resultados if r["ok"]]
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://sb") as client:
+                inicio, requisicoes = time.perf_counter(), 0
+                for _ in range(args.repeticoes):
+                    after = None
+                    while True:
+                        params = {"limit": args.limit, "sobrenome": "BenchmarkJSON"}
+                        if after:
+                            params["after"] = after
+                        resposta = await client.get("/usuarios", params=params)
+                        resposta.raise_for_status()
+                        requisicoes += 1
+                        after = resposta.headers.get("X-Next-Cursor")
+                        if not after:
+                            break
+                decorrido = time.perf_counter() - inicio
+            print(f"📊 GET /usuarios com MongoDB: {len(ids)} usuários, páginas de {args.limit}")
+            print(f"  {requisicoes / decorrido:8.0f} req/s  {len(ids) * args.repeticoes / decorrido:10.0f} docs/s")
+        finally:
+            await repo.delete_many(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput da serialização de GET /usuarios")
+    parser.add_argument("--documentos", type=int, default=10000)
+    parser.add_argument("--limit", type=int, default=1000, help="Tamanho da página (máximo da API: 1000)")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--com-mongo", action="store_true", help="Mede também a API real contra o MongoDB")
+    args = parser.parse_args()
+
+    asyncio.run(medir_em_memoria(args))
+    if args.com_mongo:
+        asyncio.run(medir_com_mongo(args))
+
+
+if __name__ == "__main__":
+    main()
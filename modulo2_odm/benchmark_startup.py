@@ -0,0 +1,74 @@
+"""
+Tempo de cold start da API do Sistema de Biblioteca (SB)
+
+Mede, em interpretadores novos (como um worker recém-criado), o tempo de
+importar modulo2_odm.presentation.api e o tempo do lifespan até a API ficar
+pronta para atender. O import não deve abrir conexões; a inicialização é
+medida com SB_CREATE_INDEXES=0, como nos workers após o deploy, e também com
+a criação de índices quando --com-indices for informado (exige MongoDB).
+
+O script falha (código de saída 1) se a mediana do total passar do alvo.
+
+Uso (a partir da raiz do projeto):
+    python modulo2_odm/benchmark_startup.py [--execucoes 10] [--alvo-ms 1000] [--com-indices]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Executado em um processo novo a cada medição
+MEDICAO = """
+import asyncio, json, time
+inicio = time.perf_counter()
+from modulo2_odm.presentation.api import app, lifespan
+importado = time.perf_counter()
+
+async def iniciar():
+    async with lifespan(app):
+        return time.perf_counter()
+
+pronto = asyncio.run(iniciar())
+print(json.dumps({"import_ms": (importado - inicio) * 1000, "startup_ms": (pronto - importado) * 1000}))
+"""
+
+
+def medir(execucoes: int, com_indices: bool) -> dict:
+    env = dict(os.environ, SB_CREATE_INDEXES="1" if com_indices else "0")
+    amostras = []
+    for _ in range(execucoes):
+        saida = subprocess.run([sys.executable, "-c", MEDICAO], cwd=RAIZ, env=env,
+                               capture_output=True, text=True, check=True).stdout
+        amostras.append(json.loads(saida.strip().splitlines()[-1]))
+
+    import_ms = statistics.median(a["import_ms"] for a in amostras)
+    startup_ms = statistics.median(a["startup_ms"] for a in amostras)
+    return {"import_ms": import_ms, "startup_ms": startup_ms, "total_ms": import_ms + startup_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start da API do SB")
+    parser.add_argument("--execucoes", type=int, default=10)
+    parser.add_argument("--alvo-ms", type=float, default=1000.0, help="Alvo para a mediana de import + startup")
+    parser.add_argument("--com-indices", action="store_true", help="Inclui a criação de índices (exige MongoDB)")
+    args = parser.parse_args()
+
+    resultado = medir(args.execucoes, args.com_indices)
+    print(f"🚀 Cold start do SB (mediana de {args.execucoes} execuções, índices {'ligados' if args.com_indices else 'desligados'})")
+    print(f"  import:  {resultado['import_ms']:8.1f} ms")
+    print(f"  startup: {resultado['startup_ms']:8.1f} ms")
+    print(f"  total:   {resultado['total_ms']:8.1f} ms (alvo {args.alvo_ms:.0f} ms)")
+
+    if resultado["total_ms"] > args.alvo_ms:
+        print("❌ Cold start acima do alvo")
+        sys.exit(1)
+    print("✅ Cold start dentro do alvo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Escalabilidade da API do Sistema de Biblioteca (SB) por número de workers
+
+Para cada quantidade de workers, sobe `main.py --workers N` em uma porta
+livre, espera o /health responder, cria um conjunto de usuários e mede
+GET /usuarios/{id} com vários processos cliente (um único processo Python
+gerando carga satura antes do servidor). Exige um mongod local.
+
+Uso (a partir da raiz do projeto):
+    python modulo2_odm/benchmark_workers.py [--workers 1,2,4] [--requisicoes 20000] [--processos-cliente 4]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def esperar_health(url: str, timeout: float = 30.0) -> None:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            if httpx.get(f"{url}/health", timeout=1).json().get("database") == "connected":
+                return
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Servidor em {url} não respondeu ao /health")
+
+
+async def carga(url: str, ids: list, total: int, concorrencia: int) -> int:
+    """Dispara `total` GETs com `concorrencia` requisições em voo; retorna quantas falharam"""
+    limits = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    erros = 0
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        semaphore = asyncio.Semaphore(concorrencia)
+
+        async def uma(i: int) -> None:
+            nonlocal erros
+            async with semaphore:
+                try:
+                    if (await client.get(f"/usuarios/{ids[i % len(ids)]}")).status_code >= 400:
+                        erros += 1
+                except httpx.HTTPError:
+                    erros += 1
+
+        await asyncio.gather(*(uma(i) for i in range(total)))
+    return erros
+
+
+def processo_cliente(args) -> int:
+    return asyncio.run(carga(*args))
+
+
+def medir(workers: int, args) -> float:
+    url = f"http://127.0.0.1:{porta_livre()}"
+    servidor = subprocess.Popen(
+        [sys.executable, MAIN, "--workers", str(workers), "--host", "127.0.0.1", "--port", url.rsplit(":", 1)[1]],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        esperar_health(url)
+        with httpx.Client(base_url=url, timeout=30) as client:
+            resposta = client.post("/usuarios/batch", json=[
+                {"prenome": f"Workers{i}", "sobrenome": "Benchmark"} for i in range(args.usuarios)
+            ])
+            ids = [r["id"] for r in resposta.json()["resultados"] if r["ok"]]
+
+        por_processo = args.requisicoes // args.processos_cliente
+        tarefas = [(url, ids, por_processo, args.concorrencia)] * args.processos_cliente
+        with multiprocessing.Pool(args.processos_cliente) as pool:
+            inicio = time.perf_counter()
+            erros = sum(pool.map(processo_cliente, tarefas))
+            decorrido = time.perf_counter() - inicio
+
+        with httpx.Client(base_url=url, timeout=30) as client:
+            client.post("/usuarios/batch/delete", json=ids)
+        if erros:
+            print(f"⚠️ {erros} requisições com erro")
+        return por_processo * args.processos_cliente / decorrido
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput da API do SB por número de workers")
+    parser.add_argument("--workers", default="1,2,4", help="Quantidades de workers separadas por vírgula")
+    parser.add_argument("--requisicoes", type=int, default=20000)
+    parser.add_argument("--concorrencia", type=int, default=32, help="Requisições em voo por processo cliente")
+    parser.add_argument("--processos-cliente", type=int, default=4)
+    parser.add_argument("--usuarios", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"📊 GET /usuarios/{{id}}: {args.requisicoes} requisições, {args.processos_cliente} processos cliente, "
+          f"{os.cpu_count()} CPUs")
+    base = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        throughput = medir(workers, args)
+        base = base or throughput
+        print(f"  {workers:2} workers: {throughput:9.0f} req/s   ({throughput / base:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
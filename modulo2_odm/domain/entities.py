@@ -1,6 +1,40 @@
+import unicodedata
 from dataclasses import dataclass
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
+
+# Formatos aceitos na entrada de datas, além de ISO 8601
+FORMATOS_DATA = ("%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d")
+
+
+def normalizar_data(valor) -> str:
+    """
+    Normaliza uma data para o formato ISO (AAAA-MM-DD).
+    
+    As datas são gravadas como texto; no formato ISO a ordem alfabética é a
+    cronológica, o que permite filtros de intervalo e ordenação por índice.
+    """
+    if valor is None or valor == "":
+        return ""
+    if isinstance(valor, (date, datetime)):
+        return valor.strftime("%Y-%m-%d")
+    texto = str(valor).strip()
+    try:
+        return datetime.fromisoformat(texto.replace("Z", "+00:00")).strftime("%Y-%m-%d")
+    except ValueError:
+        pass
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: {valor}")
+
+
+def chave_busca(texto: str) -> str:
+    """Texto em minúsculas e sem acentos, usado nos índices de busca por prefixo"""
+    decomposto = unicodedata.normalize("NFKD", (texto or "").casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
 
 
 @dataclass
@@ -0,0 +1,66 @@
+import asyncio
+import json
+from typing import Callable, Optional
+
+import redis.asyncio as aioredis
+
+from .redis_publisher import DEFAULT_CHANNEL, DEFAULT_REDIS_URL
+
+
+class CrudEventSubscriber:
+    """
+    Assina o canal de eventos CRUD e repassa (entidade, id) de cada evento.
+    
+    Usado para invalidar caches em memória quando outro worker ou outro
+    sistema altera um documento. Erros de conexão são registrados e a
+    assinatura é refeita após `retry_interval` segundos.
+    """
+    
+    def __init__(self, on_event: Callable[[str, str], None], redis_url: str = DEFAULT_REDIS_URL,
+                 channel: str = DEFAULT_CHANNEL, retry_interval: float = 5.0):
+        self.on_event = on_event
+        self.redis_url = redis_url
+        self.channel = channel
+        self.retry_interval = retry_interval
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Inicia a assinatura em uma task do event loop atual"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Cancela a assinatura e aguarda o encerramento da task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self) -> None:
+        while True:
+            client = aioredis.from_url(self.redis_url, decode_responses=True)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self._dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Assinatura de eventos CRUD interrompida: {e}")
+            finally:
+                await client.aclose()
+            await asyncio.sleep(self.retry_interval)
+    
+    def _dispatch(self, raw: str) -> None:
+        try:
+            operation = json.loads(raw)
+            entity_id = json.loads(operation["data"]).get("id")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return
+        if entity_id is not None:
+            self.on_event(operation.get("entity", ""), str(entity_id))
@@ -1,10 +1,45 @@
-from pymongo import MongoClient
-from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, TEXT, IndexModel, MongoClient
 import os
 
 
+# Índices por coleção. create_indexes é idempotente (índices já existentes
+# não são recriados) e envia um único comando por coleção.
+INDEXES = {
+    # Índice único para código do empréstimo; compostos para as consultas por
+    # usuário/obra ordenadas por devolução e simples para o relatório de atrasos
+    "registros_emprestimo": [
+        IndexModel("codigo_emprestimo", unique=True),
+        IndexModel([("usuario_id", ASCENDING), ("data_previsao_devolucao", ASCENDING)]),
+        IndexModel([("obra_id", ASCENDING), ("data_previsao_devolucao", ASCENDING)]),
+        IndexModel("data_previsao_devolucao"),
+    ],
+    # Índice único para ISBN da obra, compostos para os filtros da listagem paginada
+    # por _id e, para a busca do catálogo, texto (título pesa mais) e prefixo
+    "obras": [
+        IndexModel("isbn", unique=True),
+        IndexModel([("autor_principal", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("codigo", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("titulo_principal", TEXT), ("autor_principal", TEXT)],
+                   weights={"titulo_principal": 3, "autor_principal": 1}, default_language="portuguese"),
+        IndexModel("busca_titulo"),
+        IndexModel("busca_autor"),
+    ],
+    # Compostos para os filtros da listagem paginada por _id
+    "usuarios": [
+        IndexModel([("situacao_matricula", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("sobrenome", ASCENDING), ("_id", ASCENDING)]),
+    ],
+}
+
+
+def indexes_enabled() -> bool:
+    """Criação de índices na inicialização; desative com SB_CREATE_INDEXES=0 (ex.: workers após o deploy)"""
+    return os.getenv("SB_CREATE_INDEXES", "1").lower() not in ("0", "false", "no")
+
+
 class MongoDB:
-    def __init__(self, connection_string: str = None, database_name: str = "biblioteca"):
+    def __init__(self, connection_string: str = None, database_name: str = "biblioteca", create_indexes: bool = None):
         if connection_string is None:
             connection_string = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
         
@@ -12,17 +47,16 @@ class MongoDB:
         self.database = self.client[database_name]
         
         # Cria índices se necessário
-        self._create_indexes()
+        if indexes_enabled() if create_indexes is None else create_indexes:
+            self._create_indexes()
     
     def _create_indexes(self):
         """Cria índices para melhor performance"""
-        try:
-            # Índice único para código do empréstimo
-            self.database.registros_emprestimo.create_index("codigo_emprestimo", unique=True)
-            # Índice único para ISBN da obra
-            self.database.obras.create_index("isbn", unique=True)
-        except Exception as e:
-            print(f"⚠️ Aviso ao criar índices: {e}")
+        for collection_name, indexes in INDEXES.items():
+            try:
+                self.database[collection_name].create_indexes(indexes)
+            except Exception as e:
+                print(f"⚠️ Aviso ao criar índices de {collection_name}: {e}")
     
     def get_collection(self, collection_name: str):
         """Retorna uma coleção específica"""
@@ -38,4 +72,39 @@ class MongoDB:
             self.client.admin.command('ping')
             return True
         except Exception:
-            return False
\ No newline at end of file
+            return False
+
+
+class AsyncMongoDB:
+    """Equivalente assíncrono de MongoDB, sobre o driver Motor"""
+    
+    def __init__(self, connection_string: str = None, database_name: str = "biblioteca"):
+        if connection_string is None:
+            connection_string = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+        
+        self.client = AsyncIOMotorClient(connection_string)
+        self.database = self.client[database_name]
+    
+    async def create_indexes(self):
+        """Cria índices para melhor performance"""
+        for collection_name, indexes in INDEXES.items():
+            try:
+                await self.database[collection_name].create_indexes(indexes)
+            except Exception as e:
+                print(f"⚠️ Aviso ao criar índices de {collection_name}: {e}")
+    
+    def get_collection(self, collection_name: str):
+        """Retorna uma coleção específica"""
+        return self.database[collection_name]
+    
+    def close(self):
+        """Fecha a conexão com o MongoDB"""
+        self.client.close()
+    
+    async def ping(self) -> bool:
+        """Verifica se a conexão está funcionando"""
+        try:
+            await self.client.admin.command('ping')
+            return True
+        except Exception:
+            return False
@@ -0,0 +1,92 @@
+import asyncio
+from typing import List, Optional
+
+from .async_redis_publisher import AsyncRedisPublisher
+from .redis_publisher import CrudOperation
+
+
+class AsyncEventDispatcher:
+    """
+    Publica os eventos CRUD em segundo plano, fora do caminho da requisição.
+    
+    Tem a mesma interface de AsyncRedisPublisher (publish_operation e
+    publish_operations), então os repositórios o recebem no lugar do publisher:
+    publicar passa a ser só enfileirar, e a resposta HTTP não espera o Redis.
+    Uma task do event loop retira os eventos da fila em lotes de até
+    `batch_size` e publica cada lote em um único pipeline, na ordem em que
+    foram enfileirados.
+    
+    A fila é limitada a `max_queue_size` eventos: com o Redis lento ou fora do
+    ar, os eventos excedentes são descartados (contador `descartados`) em vez
+    de acumular memória ou latência. Lotes cuja publicação falhou são contados
+    em `falhas`.
+    """
+    
+    def __init__(self, publisher: AsyncRedisPublisher, max_queue_size: int = 10000, batch_size: int = 500):
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {"enfileirados": 0, "publicados": 0, "descartados": 0, "falhas": 0, "lotes": 0}
+    
+    def start(self) -> None:
+        """Inicia o envio em uma task do event loop atual"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def publish_operation(self, operation: CrudOperation) -> None:
+        """Enfileira uma operação CRUD (não bloqueia)"""
+        self._enqueue([operation])
+    
+    async def publish_operations(self, operations: List[CrudOperation]) -> bool:
+        """Enfileira um lote de operações; retorna False se alguma foi descartada"""
+        return self._enqueue(operations)
+    
+    def _enqueue(self, operations: List[CrudOperation]) -> bool:
+        for index, operation in enumerate(operations):
+            try:
+                self._queue.put_nowait(operation)
+            except asyncio.QueueFull:
+                descartados = len(operations) - index
+                if self.counters["descartados"] == 0:
+                    print(f"⚠️ Fila de eventos CRUD cheia ({self._queue.maxsize}); descartando eventos")
+                self.counters["descartados"] += descartados
+                self.counters["enfileirados"] += index
+                return False
+        self.counters["enfileirados"] += len(operations)
+        return True
+    
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                published = await self.publisher.publish_operations(batch)
+            except Exception as e:
+                print(f"❌ Erro ao publicar lote de eventos: {e}")
+                published = False
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            self.counters["lotes"] += 1
+            self.counters["publicados" if published else "falhas"] += len(batch)
+    
+    async def close(self, timeout: float = 5.0) -> None:
+        """Publica os eventos ainda na fila (até `timeout` segundos) e encerra a task"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ {self._queue.qsize()} eventos CRUD não publicados no encerramento")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    def stats(self) -> dict:
+        """Profundidade da fila e contadores de envio"""
+        return {"fila": self._queue.qsize(), "capacidade": self._queue.maxsize, **self.counters}
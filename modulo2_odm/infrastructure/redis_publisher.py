@@ -1,8 +1,14 @@
 import redis
 import json
+import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_REDIS_URL = "redis://localhost:6379"
+DEFAULT_CHANNEL = "crud-channel"
 
 
 class OperationType(Enum):
@@ -35,12 +41,23 @@ class CrudOperation:
 
 
 class RedisPublisher:
-    def __init__(self, redis_url: str = "redis://localhost:6379", channel: str = "crud-channel"):
-        self.redis_client = redis.from_url(redis_url, decode_responses=True)
+    def __init__(self, redis_url: str = DEFAULT_REDIS_URL, channel: str = DEFAULT_CHANNEL,
+                 connection_pool: Optional[redis.ConnectionPool] = None):
+        if connection_pool is not None:
+            self.redis_client = redis.Redis(connection_pool=connection_pool)
+        else:
+            self.redis_client = redis.from_url(redis_url, decode_responses=True)
         self.channel = channel
+        # Publishers do registro são compartilhados e só são fechados por close_publishers()
+        self.shared = False
+        self._local = threading.local()
     
     def publish_operation(self, operation: CrudOperation) -> None:
-        """Publica uma operação CRUD no Redis"""
+        """Publica uma operação CRUD no Redis (ou a acumula, dentro de batch())"""
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending.append(operation)
+            return
         try:
             message = json.dumps(operation.to_dict())
             self.redis_client.publish(self.channel, message)
@@ -48,5 +65,95 @@ class RedisPublisher:
         except Exception as e:
             print(f"❌ Erro ao publicar evento: {e}")
     
+    def publish_operations(self, operations: List[CrudOperation]) -> bool:
+        """Publica um lote de operações CRUD no Redis em um único pipeline"""
+        if not operations:
+            return True
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for operation in operations:
+                pipeline.publish(self.channel, json.dumps(operation.to_dict()))
+            pipeline.execute()
+            print(f"✅ Lote publicado: {len(operations)} eventos {operations[0].entity} - {operations[0].operation.value}")
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao publicar lote de eventos: {e}")
+            return False
+    
+    @contextmanager
+    def batch(self):
+        """Acumula as publicações feitas pela thread atual e as envia em um único pipeline ao sair"""
+        if getattr(self._local, "pending", None) is not None:
+            # Blocos aninhados são enviados pelo bloco mais externo
+            yield
+            return
+        self._local.pending = []
+        try:
+            yield
+        finally:
+            pending, self._local.pending = self._local.pending, None
+            self.publish_operations(pending)
+    
     def close(self):
-        self.redis_client.close()
\ No newline at end of file
+        if not self.shared:
+            self.redis_client.close()
+
+
+# Registro de publishers do processo: um pool de conexões por URL e um publisher por (URL, canal)
+_registry_lock = threading.Lock()
+_pools: Dict[str, redis.ConnectionPool] = {}
+_publishers: Dict[Tuple[str, str], RedisPublisher] = {}
+_config: Dict[str, Any] = {
+    "redis_url": os.getenv("REDIS_URL", DEFAULT_REDIS_URL),
+    "max_connections": int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+}
+
+
+def configure_publishers(redis_url: Optional[str] = None, max_connections: Optional[int] = None) -> None:
+    """Define URL padrão e tamanho máximo dos pools usados pelos publishers compartilhados"""
+    with _registry_lock:
+        if redis_url is not None:
+            _config["redis_url"] = redis_url
+        if max_connections is not None:
+            _config["max_connections"] = max_connections
+
+
+def get_publisher(redis_url: Optional[str] = None, channel: str = DEFAULT_CHANNEL) -> RedisPublisher:
+    """Retorna o publisher compartilhado do processo para (URL, canal)"""
+    url = redis_url or _config["redis_url"]
+    with _registry_lock:
+        publisher = _publishers.get((url, channel))
+        if publisher is None:
+            pool = _pools.get(url)
+            if pool is None:
+                pool = redis.ConnectionPool.from_url(
+                    url, max_connections=_config["max_connections"], decode_responses=True
+                )
+                _pools[url] = pool
+            publisher = RedisPublisher(url, channel, connection_pool=pool)
+            publisher.shared = True
+            _publishers[(url, channel)] = publisher
+        return publisher
+
+
+def close_publishers() -> None:
+    """Fecha todos os publishers compartilhados e seus pools"""
+    with _registry_lock:
+        for publisher in _publishers.values():
+            publisher.redis_client.close()
+        for pool in _pools.values():
+            pool.disconnect()
+        _publishers.clear()
+        _pools.clear()
+
+
+def _reset_after_fork() -> None:
+    """No processo filho, descarta o registro herdado sem fechar os sockets do processo pai"""
+    global _registry_lock
+    _registry_lock = threading.Lock()
+    _publishers.clear()
+    _pools.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,15 +1,94 @@
+import argparse
+import os
+import sys
+
 import uvicorn
-from presentation.api import app
+
+# Permite executar `python main.py` de dentro de modulo2_odm: o app usa imports relativos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modulo2_odm.infrastructure.database import MongoDB, indexes_enabled
+
+APP = "modulo2_odm.presentation.api:app"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Opções do servidor; cada uma pode vir da linha de comando ou de variável de ambiente"""
+    parser = argparse.ArgumentParser(description="Servidor da API do Sistema de Biblioteca (SB)")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8080")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SB_WORKERS", "1")),
+                        help="Processos worker (1 = processo único)")
+    parser.add_argument("--reload", action="store_true", default=os.getenv("SB_RELOAD", "0") == "1",
+                        help="Recarrega ao alterar o código (desenvolvimento, processo único)")
+    parser.add_argument("--keep-alive", type=int, default=int(os.getenv("SB_KEEP_ALIVE", "5")),
+                        help="Segundos que uma conexão ociosa fica aberta")
+    parser.add_argument("--backlog", type=int, default=int(os.getenv("SB_BACKLOG", "2048")),
+                        help="Conexões pendentes aceitas pelo socket")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("SB_GRACEFUL_TIMEOUT", "30")),
+                        help="Segundos para os workers concluírem as requisições ao encerrar/recarregar")
+    return parser.parse_args(argv)
+
+
+def create_indexes_once() -> None:
+    """
+    Cria os índices uma única vez no processo principal, antes de iniciar os
+    workers, que então sobem com SB_CREATE_INDEXES=0. O cliente é fechado
+    antes do fork: cada worker cria seus próprios clientes no lifespan.
+    """
+    if indexes_enabled():
+        MongoDB(create_indexes=True).close()
+    os.environ["SB_CREATE_INDEXES"] = "0"
 
 
-def main():
+def run_gunicorn(args: argparse.Namespace) -> None:
+    """Executa N workers Uvicorn sob o gunicorn (reinício de workers e reload gracioso com SIGHUP)"""
+    from gunicorn.app.base import BaseApplication
+
+    class SBApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{args.host}:{args.port}")
+            self.cfg.set("workers", args.workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("keepalive", args.keep_alive)
+            self.cfg.set("backlog", args.backlog)
+            self.cfg.set("graceful_timeout", args.graceful_timeout)
+            # Sem preload: o app é importado em cada worker, depois do fork
+            self.cfg.set("preload_app", False)
+
+        def load(self):
+            from modulo2_odm.presentation.api import app
+            return app
+
+    SBApplication().run()
+
+
+def main(argv=None):
+    args = parse_args(argv)
     print("🚀 Sistema de Biblioteca (SB) - Módulo ODM")
     print("📚 Servidor FastAPI iniciando...")
-    print("🌐 Acesse: http://localhost:8080")
-    print("📖 Documentação: http://localhost:8080/docs")
-    
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+    print(f"🌐 Acesse: http://localhost:{args.port}")
+    print(f"📖 Documentação: http://localhost:{args.port}/docs")
+
+    if args.reload or args.workers <= 1:
+        uvicorn.run(APP, host=args.host, port=args.port, reload=args.reload,
+                    timeout_keep_alive=args.keep_alive, backlog=args.backlog,
+                    timeout_graceful_shutdown=args.graceful_timeout)
+        return
+
+    print(f"⚙️ Modo produção: {args.workers} workers")
+    create_indexes_once()
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        # Sem gunicorn (ex.: Windows): workers do próprio uvicorn, sem reload gracioso
+        print("⚠️ gunicorn não instalado; usando os workers do uvicorn")
+        uvicorn.run(APP, host=args.host, port=args.port, workers=args.workers,
+                    timeout_keep_alive=args.keep_alive, backlog=args.backlog,
+                    timeout_graceful_shutdown=args.graceful_timeout)
+    else:
+        run_gunicorn(args)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
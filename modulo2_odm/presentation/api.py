@@ -1,17 +1,250 @@
-from fastapi import FastAPI, HTTPException
-from typing import List
+import hashlib
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import fields as dataclass_fields
+from fastapi import Body, Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import date
+from typing import AsyncIterator, List, Optional
 
-from ..infrastructure.database import MongoDB
-from ..application.repository import UsuarioRepository, ObraRepository, RegistroEmprestimoRepository
+from ..infrastructure.database import AsyncMongoDB, indexes_enabled
+from ..infrastructure.async_redis_publisher import close_async_publishers, get_async_publisher
+from ..infrastructure.crud_event_subscriber import CrudEventSubscriber
+from ..infrastructure.redis_publisher import _config
+from ..infrastructure.event_dispatcher import AsyncEventDispatcher
+from ..application.async_repository import AsyncUsuarioRepository, AsyncObraRepository, AsyncRegistroEmprestimoRepository
 from ..domain.entities import Usuario, Obra, RegistroEmprestimo
+from .schemas import (
+    BuscaObrasResponse, EmprestimoResponse, FastJSONResponse, LoteResponse, MensagemResponse,
+    ObraResponse, UsuarioResponse, json_bytes
+)
 
-app = FastAPI(title="Sistema de Biblioteca (SB)", version="1.0.0")
 
-# Inicializa o banco de dados
-mongodb = MongoDB()
-usuario_repo = UsuarioRepository(mongodb)
-obra_repo = ObraRepository(mongodb)
-registro_repo = RegistroEmprestimoRepository(mongodb)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Cria os recursos do SB na inicialização do worker e os libera no encerramento.
+    
+    Nada é conectado na importação do módulo: o cliente Motor e o publisher
+    Redis (um só, compartilhado pelos repositórios) nascem aqui, já dentro do
+    event loop e do processo do worker, o que mantém o import barato e seguro
+    para servidores pre-fork.
+    
+    Os eventos CRUD são publicados em segundo plano por um AsyncEventDispatcher
+    (fila limitada a SB_EVENT_QUEUE_SIZE; 0 publica dentro da requisição).
+    """
+    inicio = time.perf_counter()
+    mongodb = AsyncMongoDB()
+    redis_publisher = get_async_publisher()
+    if indexes_enabled():
+        await mongodb.create_indexes()
+    
+    dispatcher = None
+    queue_size = int(os.getenv("SB_EVENT_QUEUE_SIZE", "10000"))
+    if queue_size > 0:
+        dispatcher = AsyncEventDispatcher(redis_publisher, max_queue_size=queue_size,
+                                          batch_size=int(os.getenv("SB_EVENT_BATCH_SIZE", "500")))
+        dispatcher.start()
+    publisher = dispatcher or redis_publisher
+    
+    app.state.mongodb = mongodb
+    app.state.redis_publisher = redis_publisher
+    app.state.event_dispatcher = dispatcher
+    app.state.usuario_repo = AsyncUsuarioRepository(mongodb, redis_publisher=publisher)
+    app.state.obra_repo = AsyncObraRepository(mongodb, redis_publisher=publisher)
+    app.state.registro_repo = AsyncRegistroEmprestimoRepository(mongodb, redis_publisher=publisher)
+    app.state.metrics = {"respostas_304": 0, "respostas_200": 0}
+    
+    # Cache opcional de GET /{recurso}/{id}: SB_CACHE_SIZE=0 (padrão) desabilita
+    subscriber = None
+    cache_size = int(os.getenv("SB_CACHE_SIZE", "0"))
+    if cache_size > 0:
+        repos_por_entidade = {"Usuario": app.state.usuario_repo, "Obra": app.state.obra_repo}
+        for repo in repos_por_entidade.values():
+            repo.enable_cache(max_size=cache_size, ttl=float(os.getenv("SB_CACHE_TTL", "60")))
+        
+        def invalidar(entidade: str, entity_id: str) -> None:
+            if entidade in repos_por_entidade:
+                repos_por_entidade[entidade].invalidate_cache([entity_id])
+        
+        # Eventos CRUD de outros workers/sistemas invalidam as entradas alteradas
+        subscriber = CrudEventSubscriber(invalidar, redis_url=_config["redis_url"])
+        subscriber.start()
+    print(f"✅ SB pronto em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    try:
+        yield
+    finally:
+        if subscriber is not None:
+            await subscriber.stop()
+        for repo in (app.state.usuario_repo, app.state.obra_repo, app.state.registro_repo):
+            await repo.close()
+        if dispatcher is not None:
+            await dispatcher.close()
+        await close_async_publishers()
+        mongodb.close()
+
+
+app = FastAPI(title="Sistema de Biblioteca (SB)", version="1.0.0", lifespan=lifespan,
+              default_response_class=FastJSONResponse)
+
+
+# Dependências: os recursos criados no lifespan ficam em app.state
+def get_mongodb(request: Request) -> AsyncMongoDB:
+    return request.app.state.mongodb
+
+
+def get_usuario_repo(request: Request) -> AsyncUsuarioRepository:
+    return request.app.state.usuario_repo
+
+
+def get_obra_repo(request: Request) -> AsyncObraRepository:
+    return request.app.state.obra_repo
+
+
+def get_registro_repo(request: Request) -> AsyncRegistroEmprestimoRepository:
+    return request.app.state.registro_repo
+
+
+# Tamanho máximo de página aceito pelas listagens
+MAX_PAGE_SIZE = 1000
+
+
+async def _listar_pagina(repo, limit: int, after: Optional[str], fields: Optional[str], filters: dict) -> Response:
+    """
+    Executa a busca paginada e devolve o cursor da próxima página no header X-Next-Cursor.
+    
+    Caminho rápido: os documentos do MongoDB são serializados diretamente,
+    sem passar por entidade nem pela validação de response_model.
+    """
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    filters = {k: v for k, v in filters.items() if v is not None}
+    try:
+        items, next_cursor = await repo.find_page(limit=limit, after=after, filters=filters, fields=field_list)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(items, headers=headers)
+
+
+def _etag_confere(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara o header If-None-Match (lista de ETags, fracas ou não, ou *) com o ETag atual"""
+    if not if_none_match:
+        return False
+    candidatos = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidatos or etag in (c[2:] if c.startswith("W/") else c for c in candidatos)
+
+
+# Modelo de resposta de cada entidade
+MODELOS_RESPOSTA = {Usuario: UsuarioResponse, Obra: ObraResponse, RegistroEmprestimo: EmprestimoResponse}
+
+
+def _modelo(entidade):
+    """Valida a entidade no seu modelo de resposta (a única validação da resposta)"""
+    return MODELOS_RESPOSTA[type(entidade)].model_validate(entidade)
+
+
+def _resposta_entidade(entidade) -> Response:
+    return FastJSONResponse(_modelo(entidade))
+
+
+def _resposta_condicional(request: Request, entidade) -> Response:
+    """Serializa o recurso com ETag (hash do conteúdo) e responde 304 se o cliente já o tiver"""
+    conteudo = json_bytes(_modelo(entidade))
+    etag = f'"{hashlib.sha1(conteudo).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    metrics = request.app.state.metrics
+    if _etag_confere(request.headers.get("if-none-match"), etag):
+        metrics["respostas_304"] += 1
+        return Response(status_code=304, headers=headers)
+    metrics["respostas_200"] += 1
+    return Response(content=conteudo, media_type="application/json", headers=headers)
+
+
+async def _atualizar_campos(repo, entity_id: str, changes: dict, nao_encontrado: str) -> Response:
+    """$set dos campos informados em uma única ida ao MongoDB (find_one_and_update)"""
+    changes = {k: v for k, v in changes.items() if k != "id"}
+    try:
+        entidade = await repo.update_fields(entity_id, changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if entidade is None:
+        raise HTTPException(status_code=404, detail=nao_encontrado)
+    return _resposta_entidade(entidade)
+
+
+# Quantidade máxima de itens aceita pelos endpoints em lote
+MAX_BATCH_SIZE = 1000
+
+
+def _campos_editaveis(entity_class) -> List[str]:
+    """Campos da entidade que podem ser informados no corpo das requisições"""
+    return [f.name for f in dataclass_fields(entity_class) if f.name != "id"]
+
+
+def _validar_lote(itens: list) -> None:
+    """Rejeita lotes vazios ou maiores que MAX_BATCH_SIZE"""
+    if not itens:
+        raise HTTPException(status_code=400, detail="O lote não pode ser vazio")
+    if len(itens) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"O lote excede o limite de {MAX_BATCH_SIZE} itens")
+
+
+def _resposta_lote(resultados: List[dict]) -> Response:
+    """Resumo de uma operação em lote com o resultado de cada item"""
+    sucessos = sum(1 for r in resultados if r["ok"])
+    return FastJSONResponse({"total": len(resultados), "sucessos": sucessos, "falhas": len(resultados) - sucessos,
+                             "resultados": resultados})
+
+
+async def _criar_lote(repo, itens: List[dict]) -> Response:
+    """Cria as entidades de um lote com um único bulk_write"""
+    _validar_lote(itens)
+    campos = _campos_editaveis(repo.entity_class)
+    entidades = [repo.entity_class(**{k: v for k, v in item.items() if k in campos}) for item in itens]
+    try:
+        return _resposta_lote(await repo.create_many(entidades))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _atualizar_lote(repo, itens: List[dict]) -> Response:
+    """Aplica atualizações parciais (id + campos alterados) de um lote com um único bulk_write"""
+    _validar_lote(itens)
+    campos = _campos_editaveis(repo.entity_class)
+    try:
+        existentes = await repo.find_by_ids([str(item.get("id") or "") for item in itens])
+        resultados, entidades, posicoes = [None] * len(itens), [], []
+        for index, item in enumerate(itens):
+            entidade = existentes.get(item.get("id"))
+            if entidade is None:
+                resultados[index] = {"index": index, "id": item.get("id"), "ok": False,
+                                      "error": f"Entidade com ID {item.get('id')} não encontrada"}
+                continue
+            for campo in campos:
+                if campo in item:
+                    setattr(entidade, campo, item[campo])
+            entidades.append(entidade)
+            posicoes.append(index)
+        
+        for posicao, resultado in zip(posicoes, await repo.update_many(entidades)):
+            resultados[posicao] = {**resultado, "index": posicao}
+        return _resposta_lote(resultados)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _deletar_lote(repo, ids: List[str]) -> Response:
+    """Remove as entidades de um lote de IDs"""
+    _validar_lote(ids)
+    try:
+        return _resposta_lote(await repo.delete_many(ids))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/")
@@ -20,8 +253,8 @@ async def root():
 
 
 # Endpoints para Usuários
-@app.post("/usuarios", response_model=dict)
-async def criar_usuario(usuario_data: dict):
+@app.post("/usuarios", response_model=UsuarioResponse)
+async def criar_usuario(usuario_data: dict, usuario_repo: AsyncUsuarioRepository = Depends(get_usuario_repo)):
     """Cria um novo usuário"""
     try:
         usuario = Usuario(
@@ -30,89 +263,80 @@ async def criar_usuario(usuario_data: dict):
             situacao_matricula=usuario_data.get("situacao_matricula", "ATIVO")
         )
         
-        usuario_criado = usuario_repo.create(usuario)
-        return {
-            "id": usuario_criado.id,
-            "prenome": usuario_criado.prenome,
-            "sobrenome": usuario_criado.sobrenome,
-            "situacao_matricula": usuario_criado.situacao_matricula
-        }
+        return _resposta_entidade(await usuario_repo.create(usuario))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/usuarios", response_model=List[dict])
-async def listar_usuarios():
-    """Lista todos os usuários"""
-    try:
-        usuarios = usuario_repo.find_all()
-        return [
-            {
-                "id": u.id,
-                "prenome": u.prenome,
-                "sobrenome": u.sobrenome,
-                "situacao_matricula": u.situacao_matricula
-            }
-            for u in usuarios
-        ]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@app.post("/usuarios/batch", response_model=LoteResponse)
+async def criar_usuarios_lote(itens: List[dict] = Body(...), usuario_repo: AsyncUsuarioRepository = Depends(get_usuario_repo)):
+    """Cria usuários em lote (bulk_write não ordenado, resultado por item)"""
+    return await _criar_lote(usuario_repo, itens)
 
 
-@app.get("/usuarios/{usuario_id}", response_model=dict)
-async def obter_usuario(usuario_id: str):
-    """Obtém um usuário por ID"""
+@app.put("/usuarios/batch", response_model=LoteResponse)
+async def atualizar_usuarios_lote(itens: List[dict] = Body(...), usuario_repo: AsyncUsuarioRepository = Depends(get_usuario_repo)):
+    """Atualiza usuários em lote; cada item traz o id e os campos alterados"""
+    return await _atualizar_lote(usuario_repo, itens)
+
+
+@app.post("/usuarios/batch/delete", response_model=LoteResponse)
+async def deletar_usuarios_lote(ids: List[str] = Body(...), usuario_repo: AsyncUsuarioRepository = Depends(get_usuario_repo)):
+    """Remove usuários em lote a partir de uma lista de IDs"""
+    return await _deletar_lote(usuario_repo, ids)
+
+
+@app.get("/usuarios", response_model=List[UsuarioResponse])
+async def listar_usuarios(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    situacao_matricula: Optional[str] = None,
+    sobrenome: Optional[str] = None,
+    usuario_repo: AsyncUsuarioRepository = Depends(get_usuario_repo)
+):
+    """Lista usuários paginados por cursor (limit/after), com projeção e filtros"""
+    filters = {"situacao_matricula": situacao_matricula, "sobrenome": sobrenome}
+    return await _listar_pagina(usuario_repo, limit, after, fields, filters)
+
+
+@app.get("/usuarios/{usuario_id}", response_model=UsuarioResponse)
+async def obter_usuario(usuario_id: str, request: Request,
+                        usuario_repo: AsyncUsuarioRepository = Depends(get_usuario_repo)):
+    """Obtém um usuário por ID (com ETag; If-None-Match igual responde 304)"""
     try:
-        usuario = usuario_repo.find_by_id(usuario_id)
+        usuario = await usuario_repo.find_by_id(usuario_id)
         if not usuario:
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
         
-        return {
-            "id": usuario.id,
-            "prenome": usuario.prenome,
-            "sobrenome": usuario.sobrenome,
-            "situacao_matricula": usuario.situacao_matricula
-        }
+        return _resposta_condicional(request, usuario)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.put("/usuarios/{usuario_id}", response_model=dict)
-async def atualizar_usuario(usuario_id: str, usuario_data: dict):
+@app.put("/usuarios/{usuario_id}", response_model=UsuarioResponse)
+async def atualizar_usuario(usuario_id: str, usuario_data: dict, usuario_repo: AsyncUsuarioRepository = Depends(get_usuario_repo)):
     """Atualiza um usuário existente"""
-    try:
-        usuario = usuario_repo.find_by_id(usuario_id)
-        if not usuario:
-            raise HTTPException(status_code=404, detail="Usuário não encontrado")
-        
-        usuario.prenome = usuario_data.get("prenome", usuario.prenome)
-        usuario.sobrenome = usuario_data.get("sobrenome", usuario.sobrenome)
-        usuario.situacao_matricula = usuario_data.get("situacao_matricula", usuario.situacao_matricula)
-        
-        usuario_atualizado = usuario_repo.update(usuario)
-        return {
-            "id": usuario_atualizado.id,
-            "prenome": usuario_atualizado.prenome,
-            "sobrenome": usuario_atualizado.sobrenome,
-            "situacao_matricula": usuario_atualizado.situacao_matricula
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    campos = _campos_editaveis(Usuario)
+    return await _atualizar_campos(usuario_repo, usuario_id, {k: v for k, v in usuario_data.items() if k in campos},
+                                   "Usuário não encontrado")
 
 
-@app.delete("/usuarios/{usuario_id}")
-async def deletar_usuario(usuario_id: str):
+@app.patch("/usuarios/{usuario_id}", response_model=UsuarioResponse)
+async def atualizar_usuario_parcial(usuario_id: str, usuario_data: dict,
+                                    usuario_repo: AsyncUsuarioRepository = Depends(get_usuario_repo)):
+    """Atualiza apenas os campos informados; campos desconhecidos retornam 400"""
+    return await _atualizar_campos(usuario_repo, usuario_id, usuario_data, "Usuário não encontrado")
+
+
+@app.delete("/usuarios/{usuario_id}", response_model=MensagemResponse)
+async def deletar_usuario(usuario_id: str, usuario_repo: AsyncUsuarioRepository = Depends(get_usuario_repo)):
     """Deleta um usuário"""
     try:
-        usuario = usuario_repo.find_by_id(usuario_id)
-        if not usuario:
+        if await usuario_repo.delete_by_id(usuario_id) is None:
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
-        
-        usuario_repo.delete(usuario)
         return {"message": "Usuário deletado com sucesso"}
     except HTTPException:
         raise
@@ -121,8 +345,8 @@ async def deletar_usuario(usuario_id: str):
 
 
 # Endpoints para Obras
-@app.post("/obras", response_model=dict)
-async def criar_obra(obra_data: dict):
+@app.post("/obras", response_model=ObraResponse)
+async def criar_obra(obra_data: dict, obra_repo: AsyncObraRepository = Depends(get_obra_repo)):
     """Cria uma nova obra"""
     try:
         obra = Obra(
@@ -132,46 +356,216 @@ async def criar_obra(obra_data: dict):
             isbn=obra_data.get("isbn", "")
         )
         
-        obra_criada = obra_repo.create(obra)
-        return {
-            "id": obra_criada.id,
-            "codigo": obra_criada.codigo,
-            "titulo_principal": obra_criada.titulo_principal,
-            "autor_principal": obra_criada.autor_principal,
-            "isbn": obra_criada.isbn
-        }
+        return _resposta_entidade(await obra_repo.create(obra))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/obras", response_model=List[dict])
-async def listar_obras():
-    """Lista todas as obras"""
+@app.post("/obras/batch", response_model=LoteResponse)
+async def criar_obras_lote(itens: List[dict] = Body(...), obra_repo: AsyncObraRepository = Depends(get_obra_repo)):
+    """Cria obras em lote (bulk_write não ordenado, resultado por item)"""
+    return await _criar_lote(obra_repo, itens)
+
+
+@app.put("/obras/batch", response_model=LoteResponse)
+async def atualizar_obras_lote(itens: List[dict] = Body(...), obra_repo: AsyncObraRepository = Depends(get_obra_repo)):
+    """Atualiza obras em lote; cada item traz o id e os campos alterados"""
+    return await _atualizar_lote(obra_repo, itens)
+
+
+@app.post("/obras/batch/delete", response_model=LoteResponse)
+async def deletar_obras_lote(ids: List[str] = Body(...), obra_repo: AsyncObraRepository = Depends(get_obra_repo)):
+    """Remove obras em lote a partir de uma lista de IDs"""
+    return await _deletar_lote(obra_repo, ids)
+
+
+@app.get("/obras", response_model=List[ObraResponse])
+async def listar_obras(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    autor_principal: Optional[str] = None,
+    codigo: Optional[str] = None,
+    isbn: Optional[str] = None,
+    obra_repo: AsyncObraRepository = Depends(get_obra_repo)
+):
+    """Lista obras paginadas por cursor (limit/after), com projeção e filtros"""
+    filters = {"autor_principal": autor_principal, "codigo": codigo, "isbn": isbn}
+    return await _listar_pagina(obra_repo, limit, after, fields, filters)
+
+
+@app.get("/obras/search", response_model=BuscaObrasResponse)
+async def buscar_obras(
+    q: Optional[str] = None,
+    isbn: Optional[str] = None,
+    modo: str = "auto",
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    obra_repo: AsyncObraRepository = Depends(get_obra_repo)
+):
+    """Busca obras por ISBN exato, texto (ranqueado por relevância) ou prefixo de título/autor"""
+    try:
+        return FastJSONResponse(await obra_repo.search(q=q, isbn=isbn, mode=modo, limit=limit, offset=offset))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/obras/{obra_id}", response_model=ObraResponse)
+async def obter_obra(obra_id: str, request: Request, obra_repo: AsyncObraRepository = Depends(get_obra_repo)):
+    """Obtém uma obra por ID (com ETag; If-None-Match igual responde 304)"""
     try:
-        obras = obra_repo.find_all()
-        return [
-            {
-                "id": o.id,
-                "codigo": o.codigo,
-                "titulo_principal": o.titulo_principal,
-                "autor_principal": o.autor_principal,
-                "isbn": o.isbn
-            }
-            for o in obras
-        ]
+        obra = await obra_repo.find_by_id(obra_id)
+        if not obra:
+            raise HTTPException(status_code=404, detail="Obra não encontrada")
+        
+        return _resposta_condicional(request, obra)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.patch("/obras/{obra_id}", response_model=ObraResponse)
+async def atualizar_obra_parcial(obra_id: str, obra_data: dict, obra_repo: AsyncObraRepository = Depends(get_obra_repo)):
+    """Atualiza apenas os campos informados; campos desconhecidos retornam 400"""
+    return await _atualizar_campos(obra_repo, obra_id, obra_data, "Obra não encontrada")
+
+
+# Endpoints para Empréstimos
+@app.post("/emprestimos", response_model=EmprestimoResponse)
+async def criar_emprestimo(emprestimo_data: dict,
+                           registro_repo: AsyncRegistroEmprestimoRepository = Depends(get_registro_repo)):
+    """Registra um empréstimo (datas aceitas em ISO ou DD/MM/AAAA, gravadas como AAAA-MM-DD)"""
+    try:
+        campos = _campos_editaveis(RegistroEmprestimo)
+        registro = RegistroEmprestimo(**{k: v for k, v in emprestimo_data.items() if k in campos})
+        return _resposta_entidade(await registro_repo.create(registro))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/emprestimos/atrasados", response_model=dict)
+async def relatorio_atrasados(
+    data: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    registro_repo: AsyncRegistroEmprestimoRepository = Depends(get_registro_repo)
+):
+    """Empréstimos com devolução prevista antes de `data` (padrão: hoje), com resumo por usuário"""
+    try:
+        return FastJSONResponse(await registro_repo.overdue_report(data or date.today().isoformat(), limit=limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/emprestimos/{emprestimo_id}", response_model=EmprestimoResponse)
+async def obter_emprestimo(emprestimo_id: str,
+                           registro_repo: AsyncRegistroEmprestimoRepository = Depends(get_registro_repo)):
+    """Obtém um empréstimo por ID"""
+    try:
+        registro = await registro_repo.find_by_id(emprestimo_id)
+        if not registro:
+            raise HTTPException(status_code=404, detail="Empréstimo não encontrado")
+        return _resposta_entidade(registro)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.patch("/emprestimos/{emprestimo_id}", response_model=EmprestimoResponse)
+async def atualizar_emprestimo(emprestimo_id: str, emprestimo_data: dict,
+                               registro_repo: AsyncRegistroEmprestimoRepository = Depends(get_registro_repo)):
+    """Atualiza apenas os campos informados de um empréstimo"""
+    return await _atualizar_campos(registro_repo, emprestimo_id, emprestimo_data, "Empréstimo não encontrado")
+
+
+@app.delete("/emprestimos/{emprestimo_id}", response_model=MensagemResponse)
+async def deletar_emprestimo(emprestimo_id: str,
+                             registro_repo: AsyncRegistroEmprestimoRepository = Depends(get_registro_repo)):
+    """Remove um empréstimo"""
+    try:
+        if await registro_repo.delete_by_id(emprestimo_id) is None:
+            raise HTTPException(status_code=404, detail="Empréstimo não encontrado")
+        return {"message": "Empréstimo deletado com sucesso"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/usuarios/{usuario_id}/emprestimos", response_model=List[EmprestimoResponse])
+async def listar_emprestimos_usuario(usuario_id: str, limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+                                     registro_repo: AsyncRegistroEmprestimoRepository = Depends(get_registro_repo)):
+    """Empréstimos de um usuário, ordenados pela data prevista de devolução"""
+    return FastJSONResponse(await registro_repo.find_by_usuario(usuario_id, limit=limit, raw=True))
+
+
+@app.get("/obras/{obra_id}/emprestimos", response_model=List[EmprestimoResponse])
+async def listar_emprestimos_obra(obra_id: str, limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+                                  registro_repo: AsyncRegistroEmprestimoRepository = Depends(get_registro_repo)):
+    """Empréstimos de uma obra, ordenados pela data prevista de devolução"""
+    return FastJSONResponse(await registro_repo.find_by_obra(obra_id, limit=limit, raw=True))
+
+
+# Exportação
+async def _ndjson(documentos: AsyncIterator[dict], batch_size: int) -> AsyncIterator[bytes]:
+    """Serializa os documentos em NDJSON, emitindo um bloco de texto por lote do cursor"""
+    linhas = []
+    async for documento in documentos:
+        linhas.append(json_bytes(documento))
+        if len(linhas) >= batch_size:
+            yield b"\n".join(linhas) + b"\n"
+            linhas = []
+    if linhas:
+        yield b"\n".join(linhas) + b"\n"
+
+
+@app.get("/export/{collection}")
+async def exportar_colecao(
+    request: Request,
+    collection: str,
+    batch_size: int = Query(1000, ge=1, le=10000),
+    since: Optional[str] = None
+):
+    """Exporta uma coleção inteira em NDJSON, em streaming direto do cursor do MongoDB"""
+    state = request.app.state
+    repos = {"usuarios": state.usuario_repo, "obras": state.obra_repo, "registros_emprestimo": state.registro_repo}
+    if collection not in repos:
+        raise HTTPException(status_code=404, detail=f"Coleção desconhecida: {collection}")
+    try:
+        documentos = repos[collection].iter_documents(batch_size=batch_size, since=since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(_ndjson(documentos, batch_size), media_type="application/x-ndjson")
+
+
 # Health check
 @app.get("/health")
-async def health_check():
+async def health_check(mongodb: AsyncMongoDB = Depends(get_mongodb)):
     """Verifica o status da aplicação"""
     try:
-        db_status = mongodb.ping()
+        db_status = await mongodb.ping()
         return {
             "status": "healthy" if db_status else "unhealthy",
             "database": "connected" if db_status else "disconnected"
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    """Contadores de respostas condicionais (ETag), do cache de GET por ID e da fila de eventos CRUD"""
+    state = request.app.state
+    return {
+        "etag": dict(state.metrics),
+        "cache": {
+            "usuarios": state.usuario_repo.cache_stats(),
+            "obras": state.obra_repo.cache_stats()
+        },
+        "eventos": state.event_dispatcher.stats() if state.event_dispatcher else None
+    }
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Modelos de resposta e serialização JSON da API do SB.
+
+Os handlers validam cada resposta uma única vez, ao montar o modelo, e a
+devolvem já serializada em um FastJSONResponse. Como o retorno é um Response,
+o FastAPI não repete a validação nem passa pelo jsonable_encoder; os modelos
+informados em response_model servem à documentação OpenAPI. As listagens
+serializam os documentos do MongoDB diretamente, sem passar por entidades.
+"""
+
+import json
+from typing import Any, List, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele, usa o json da biblioteca padrão
+    orjson = None
+
+
+def json_bytes(conteudo: Any) -> bytes:
+    """Serializa em JSON compacto (UTF-8, sem escapar acentos); tipos desconhecidos viram str"""
+    if isinstance(conteudo, BaseModel):
+        return conteudo.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        # Datetimes também via str(), como no json: mesma saída com ou sem orjson
+        return orjson.dumps(conteudo, default=str, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(conteudo, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Resposta JSON serializada com orjson (ou pelo próprio modelo Pydantic)"""
+    
+    def render(self, content: Any) -> bytes:
+        return json_bytes(content)
+
+
+class UsuarioResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: Optional[str] = None
+    prenome: str = ""
+    sobrenome: str = ""
+    situacao_matricula: str = "ATIVO"
+
+
+class ObraResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: Optional[str] = None
+    codigo: str = ""
+    titulo_principal: str = ""
+    autor_principal: str = ""
+    isbn: str = ""
+
+
+class ObraBuscaResponse(ObraResponse):
+    score: Optional[float] = None
+
+
+class EmprestimoResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: Optional[str] = None
+    usuario_id: str = ""
+    obra_id: str = ""
+    codigo_emprestimo: str = ""
+    data_inicio: str = ""
+    data_previsao_devolucao: str = ""
+
+
+class BuscaObrasResponse(BaseModel):
+    modo: str
+    resultados: List[ObraBuscaResponse]
+    proximo_offset: Optional[int] = None
+
+
+class ItemLoteResponse(BaseModel):
+    index: int
+    id: Optional[str] = None
+    ok: bool
+    error: Optional[str] = None
+
+
+class LoteResponse(BaseModel):
+    total: int
+    sucessos: int
+    falhas: int
+    resultados: List[ItemLoteResponse]
+
+
+class MensagemResponse(BaseModel):
+    message: str
@@ -1,7 +1,21 @@
+import json
+import os
+import sys
 import unittest
-from infrastructure.database import MongoDB
+from functools import partial
+from unittest.mock import AsyncMock, Mock, patch
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from infrastructure.database import MongoDB, AsyncMongoDB
+from infrastructure.crud_event_subscriber import CrudEventSubscriber
+from infrastructure.event_dispatcher import AsyncEventDispatcher
 from application.repository import UsuarioRepository
-from domain.entities import Usuario
+from application.async_repository import AsyncUsuarioRepository, AsyncObraRepository, AsyncRegistroEmprestimoRepository
+from domain.entities import Usuario, Obra, RegistroEmprestimo
+
+# A API usa imports relativos ao pacote modulo2_odm: importa a partir da raiz do projeto
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modulo2_odm.presentation import api
 
 
 class TestUsuarioRepository(unittest.TestCase):
@@ -92,6 +106,346 @@ class TestUsuarioRepository(unittest.TestCase):
         
         found = self.repo.find_by_id(user_id)
         self.assertIsNone(found)
+    
+    def test_bulk_operations(self):
+        """Testa create_many, update_many e delete_many com um publish por lote"""
+        self.repo.redis_publisher = Mock()
+        usuarios = [Usuario(prenome=f"Lote{i}", sobrenome="Silva") for i in range(3)]
+        
+        results = self.repo.create_many(usuarios)
+        self.assertTrue(all(r["ok"] for r in results))
+        self.assertEqual(3, self.mongodb.get_collection("usuarios").count_documents({}))
+        self.assertEqual(1, self.repo.redis_publisher.publish_operations.call_count)
+        
+        usuarios[0].situacao_matricula = "TRANCADO"
+        fantasma = Usuario(id="507f1f77bcf86cd799439011", prenome="Fantasma")
+        results = self.repo.update_many([usuarios[0], fantasma])
+        self.assertEqual([True, False], [r["ok"] for r in results])
+        self.assertEqual("TRANCADO", self.repo.find_by_id(usuarios[0].id).situacao_matricula)
+        
+        results = self.repo.delete_many([usuarios[1].id, usuarios[2].id, "invalido"])
+        self.assertEqual([True, True, False], [r["ok"] for r in results])
+        self.assertEqual(1, self.mongodb.get_collection("usuarios").count_documents({}))
+        self.assertEqual(3, self.repo.redis_publisher.publish_operations.call_count)
+
+
+class TestAsyncUsuarioRepository(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mongodb = AsyncMongoDB(database_name="biblioteca_test")
+        self.repo = AsyncUsuarioRepository(self.mongodb, enable_crud_publishing=False)
+        await self.mongodb.get_collection("usuarios").delete_many({})
+    
+    async def asyncTearDown(self):
+        await self.mongodb.get_collection("usuarios").delete_many({})
+        self.mongodb.close()
+    
+    async def test_crud(self):
+        """Testa create, find_by_id, update e delete assíncronos"""
+        created = await self.repo.create(Usuario(prenome="Carla", sobrenome="Dias"))
+        self.assertIsNotNone(created.id)
+        
+        found = await self.repo.find_by_id(created.id)
+        self.assertEqual("Carla", found.prenome)
+        
+        found.prenome = "Carla Maria"
+        await self.repo.update(found)
+        self.assertEqual("Carla Maria", (await self.repo.find_by_id(created.id)).prenome)
+        self.assertEqual(1, len(await self.repo.find_all()))
+        
+        await self.repo.delete(found)
+        self.assertIsNone(await self.repo.find_by_id(created.id))
+    
+    async def test_find_page(self):
+        """Testa paginação por cursor com filtro e projeção"""
+        for i in range(5):
+            await self.repo.create(Usuario(prenome=f"U{i}", situacao_matricula="ATIVO" if i % 2 == 0 else "TRANCADO"))
+        
+        page, cursor = await self.repo.find_page(limit=2, filters={"situacao_matricula": "ATIVO"}, fields=["prenome"])
+        self.assertEqual(["U0", "U2"], [u["prenome"] for u in page])
+        self.assertEqual({"id", "prenome"}, set(page[0]))
+        self.assertEqual(page[-1]["id"], cursor)
+        
+        page, cursor = await self.repo.find_page(limit=2, after=cursor, filters={"situacao_matricula": "ATIVO"})
+        self.assertEqual(["U4"], [u["prenome"] for u in page])
+        self.assertIsNone(cursor)
+        
+        with self.assertRaises(ValueError):
+            await self.repo.find_page(filters={"senha": "x"})
+    
+    async def test_iter_documents(self):
+        """Testa a exportação em streaming, completa e incremental (since)"""
+        ids = [(await self.repo.create(Usuario(prenome=f"E{i}"))).id for i in range(5)]
+        
+        exported = [doc async for doc in self.repo.iter_documents(batch_size=2)]
+        self.assertEqual(ids, [doc["id"] for doc in exported])
+        
+        incremental = [doc async for doc in self.repo.iter_documents(batch_size=2, since=ids[2])]
+        self.assertEqual(ids[3:], [doc["id"] for doc in incremental])
+        
+        with self.assertRaises(ValueError):
+            self.repo.iter_documents(since="ontem")
+    
+    async def test_update_fields_and_delete_by_id(self):
+        """Testa $set parcial e remoção com uma única ida ao MongoDB"""
+        self.repo.redis_publisher = Mock(publish_operation=AsyncMock())
+        self.repo.enable_crud_publishing = True
+        created = await self.repo.create(Usuario(prenome="Ana", sobrenome="Lima"))
+        
+        updated = await self.repo.update_fields(created.id, {"situacao_matricula": "TRANCADO"})
+        self.assertEqual(("Ana", "TRANCADO"), (updated.prenome, updated.situacao_matricula))
+        evento = self.repo.redis_publisher.publish_operation.call_args[0][0]
+        self.assertEqual("TRANCADO", json.loads(evento.data)["situacao_matricula"])
+        
+        with self.assertRaises(ValueError):
+            await self.repo.update_fields(created.id, {"senha": "x"})
+        self.assertIsNone(await self.repo.update_fields("507f1f77bcf86cd799439011", {"prenome": "X"}))
+        
+        self.assertEqual("Ana", (await self.repo.delete_by_id(created.id)).prenome)
+        self.assertIsNone(await self.repo.delete_by_id(created.id))
+    
+    async def test_cache_invalidation(self):
+        """Testa o cache de find_by_id e sua invalidação por update e por evento CRUD"""
+        self.repo.enable_cache(max_size=10)
+        created = await self.repo.create(Usuario(prenome="Cache"))
+        
+        await self.repo.find_by_id(created.id)
+        cached = await self.repo.find_by_id(created.id)
+        self.assertEqual(1, self.repo.cache_stats()["hits"])
+        
+        cached.prenome = "Alterado"
+        await self.repo.update(cached)
+        self.assertEqual("Alterado", (await self.repo.find_by_id(created.id)).prenome)
+        
+        # Alteração feita por outro processo, notificada via evento CRUD
+        await self.mongodb.get_collection("usuarios").update_one({"_id": ObjectId(created.id)}, {"$set": {"prenome": "Externo"}})
+        subscriber = CrudEventSubscriber(lambda entidade, entity_id: self.repo.invalidate_cache([entity_id]))
+        subscriber._dispatch(json.dumps({"entity": "Usuario", "data": json.dumps({"id": created.id})}))
+        self.assertEqual("Externo", (await self.repo.find_by_id(created.id)).prenome)
+    
+    async def test_delete_many_reconcilia_por_item(self):
+        """Testa que delete_many só confirma e publica os itens existentes, uma vez por ID"""
+        publisher = Mock(publish_operations=AsyncMock(return_value=True))
+        repo = AsyncUsuarioRepository(self.mongodb, redis_publisher=publisher)
+        usuarios = [Usuario(prenome=f"Lote{i}") for i in range(3)]
+        await repo.create_many(usuarios)
+        # Removido por outro processo antes do lote
+        await self.mongodb.get_collection("usuarios").delete_one({"_id": ObjectId(usuarios[1].id)})
+        
+        results = await repo.delete_many([u.id for u in usuarios] + [usuarios[0].id, "invalido"])
+        self.assertEqual([True, False, True, False, False], [r["ok"] for r in results])
+        eventos = publisher.publish_operations.call_args.args[0]
+        self.assertEqual({usuarios[0].id, usuarios[2].id}, {json.loads(e.data)["id"] for e in eventos})
+        self.assertEqual("Lote0", json.loads(eventos[0].data)["prenome"])
+    
+    async def test_background_event_dispatch(self):
+        """Testa a publicação dos eventos CRUD em lotes, fora da operação, com fila limitada"""
+        publisher = Mock(publish_operations=AsyncMock(return_value=True))
+        dispatcher = AsyncEventDispatcher(publisher, max_queue_size=3, batch_size=2)
+        repo = AsyncUsuarioRepository(self.mongodb, redis_publisher=dispatcher)
+        
+        created = await repo.create(Usuario(prenome="Eva"))
+        await repo.create_many([Usuario(prenome="Lote1"), Usuario(prenome="Lote2"), Usuario(prenome="Lote3")])
+        publisher.publish_operations.assert_not_called()
+        self.assertEqual({"fila": 3, "enfileirados": 3, "descartados": 1},
+                         {k: dispatcher.stats()[k] for k in ("fila", "enfileirados", "descartados")})
+        
+        dispatcher.start()
+        await dispatcher.close()
+        lotes = [call.args[0] for call in publisher.publish_operations.call_args_list]
+        self.assertEqual([2, 1], [len(lote) for lote in lotes])
+        self.assertEqual(created.id, json.loads(lotes[0][0].data)["id"])
+        self.assertEqual({"fila": 0, "publicados": 3, "lotes": 2},
+                         {k: dispatcher.stats()[k] for k in ("fila", "publicados", "lotes")})
+
+
+
+class TestAsyncObraRepository(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mongodb = AsyncMongoDB(database_name="biblioteca_test")
+        self.repo = AsyncObraRepository(self.mongodb, enable_crud_publishing=False)
+        await self.mongodb.get_collection("obras").delete_many({})
+    
+    async def asyncTearDown(self):
+        await self.mongodb.get_collection("obras").delete_many({})
+        self.mongodb.close()
+    
+    async def test_search_prefixo_e_isbn(self):
+        """Testa a busca por prefixo (sem acentos/maiúsculas, títulos primeiro) e por ISBN"""
+        await self.repo.create_many([
+            Obra(codigo="1", isbn="111", titulo_principal="Dom Casmurro", autor_principal="Machado de Assis"),
+            Obra(codigo="2", isbn="222", titulo_principal="Macunaíma", autor_principal="Mário de Andrade"),
+        ])
+        
+        result = await self.repo.search(q="MAC", mode="prefixo")
+        self.assertEqual(["Macunaíma", "Dom Casmurro"], [o["titulo_principal"] for o in result["resultados"]])
+        self.assertNotIn("busca_titulo", result["resultados"][0])
+        
+        page = await self.repo.search(q="mac", mode="prefixo", limit=1, offset=1)
+        self.assertEqual(["Dom Casmurro"], [o["titulo_principal"] for o in page["resultados"]])
+        
+        result = await self.repo.search(isbn="222")
+        self.assertEqual("isbn", result["modo"])
+        self.assertEqual("Macunaíma", result["resultados"][0]["titulo_principal"])
+    
+    async def test_backfill_search_keys(self):
+        """Testa a migração das chaves de busca em obras antigas"""
+        await self.mongodb.get_collection("obras").insert_one({"codigo": "1", "isbn": "1", "titulo_principal": "Ébano"})
+        self.assertEqual(1, await self.repo.backfill_search_keys())
+        self.assertEqual(1, len((await self.repo.search(q="eba", mode="prefixo"))["resultados"]))
+
+
+class TestAsyncRegistroEmprestimoRepository(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mongodb = AsyncMongoDB(database_name="biblioteca_test")
+        self.repo = AsyncRegistroEmprestimoRepository(self.mongodb, enable_crud_publishing=False)
+        await self.mongodb.get_collection("registros_emprestimo").delete_many({})
+    
+    async def asyncTearDown(self):
+        await self.mongodb.get_collection("registros_emprestimo").delete_many({})
+        self.mongodb.close()
+    
+    async def test_datas_normalizadas_e_atrasos(self):
+        """Testa a normalização das datas e o relatório de atrasos por agregação"""
+        created = await self.repo.create(RegistroEmprestimo(
+            usuario_id="u1", obra_id="o1", codigo_emprestimo="E1",
+            data_inicio="01/01/2024", data_previsao_devolucao="10/01/2024"
+        ))
+        self.assertEqual(("2024-01-01", "2024-01-10"), (created.data_inicio, created.data_previsao_devolucao))
+        await self.repo.create(RegistroEmprestimo(usuario_id="u1", obra_id="o2", codigo_emprestimo="E2",
+                                                  data_inicio="2024-01-01", data_previsao_devolucao="2024-03-01"))
+        
+        self.assertEqual(["E1", "E2"], [r.codigo_emprestimo for r in await self.repo.find_by_usuario("u1")])
+        raw = await self.repo.find_by_usuario("u1", raw=True)
+        self.assertEqual([created.id, "2024-01-10"], [raw[0]["id"], raw[0]["data_previsao_devolucao"]])
+        self.assertNotIn("_id", raw[0])
+        
+        report = await self.repo.overdue_report("2024-01-20")
+        self.assertEqual(1, report["total"])
+        self.assertEqual(10, report["emprestimos"][0]["dias_atraso"])
+        self.assertEqual([{"usuario_id": "u1", "quantidade": 1, "previsao_mais_antiga": "2024-01-10"}], report["por_usuario"])
+        
+        # O resumo por usuário também respeita o limit; total_usuarios conta todos
+        await self.repo.create(RegistroEmprestimo(usuario_id="u2", obra_id="o3", codigo_emprestimo="E4",
+                                                  data_inicio="2024-01-01", data_previsao_devolucao="2024-01-15"))
+        report = await self.repo.overdue_report("2024-01-20", limit=1)
+        self.assertEqual((2, 2, 1), (report["total"], report["total_usuarios"], len(report["por_usuario"])))
+        
+        with self.assertRaises(ValueError):
+            await self.repo.create(RegistroEmprestimo(codigo_emprestimo="E3", data_inicio="ontem"))
+    
+    async def test_normalize_stored_dates(self):
+        """Testa a migração das datas gravadas como texto livre"""
+        await self.mongodb.get_collection("registros_emprestimo").insert_one(
+            {"codigo_emprestimo": "E1", "data_inicio": "05/02/2024", "data_previsao_devolucao": "2024-02-20"}
+        )
+        self.assertEqual(1, await self.repo.normalize_stored_dates())
+        doc = await self.mongodb.get_collection("registros_emprestimo").find_one({"codigo_emprestimo": "E1"})
+        self.assertEqual("2024-02-05", doc["data_inicio"])
+
+
+class TestApi(unittest.TestCase):
+    def setUp(self):
+        # Cache de GET por ID habilitado, sem criação de índices e sobre a base de teste
+        env = patch.dict(os.environ, {"SB_CACHE_SIZE": "100", "SB_CREATE_INDEXES": "0", "SB_EVENT_QUEUE_SIZE": "0"})
+        env.start()
+        self.addCleanup(env.stop)
+        mongodb = patch.object(api, "AsyncMongoDB", partial(api.AsyncMongoDB, database_name="biblioteca_test"))
+        mongodb.start()
+        self.addCleanup(mongodb.stop)
+        
+        self.client = TestClient(api.app)
+        self.client.__enter__()
+        self.addCleanup(self.client.__exit__, None, None, None)
+        for repo in (api.app.state.usuario_repo, api.app.state.obra_repo):
+            repo.enable_crud_publishing = False
+            self.client.portal.call(repo.collection.delete_many, {})
+    
+    def test_etag_e_invalidacao_do_cache(self):
+        """Testa ETag/304, a invalidação do cache por PUT/DELETE e o hit_ratio em /metrics"""
+        usuario_id = self.client.post("/usuarios", json={"prenome": "Ana"}).json()["id"]
+        
+        resposta = self.client.get(f"/usuarios/{usuario_id}")
+        etag = resposta.headers["etag"]
+        self.assertEqual(200, resposta.status_code)
+        self.assertEqual(304, self.client.get(f"/usuarios/{usuario_id}", headers={"If-None-Match": etag}).status_code)
+        
+        self.client.put(f"/usuarios/{usuario_id}", json={"prenome": "Bia"})
+        resposta = self.client.get(f"/usuarios/{usuario_id}", headers={"If-None-Match": etag})
+        self.assertEqual(200, resposta.status_code)
+        self.assertEqual("Bia", resposta.json()["prenome"])
+        self.assertNotEqual(etag, resposta.headers["etag"])
+        
+        self.client.delete(f"/usuarios/{usuario_id}")
+        self.assertEqual(404, self.client.get(f"/usuarios/{usuario_id}").status_code)
+        
+        metrics = self.client.get("/metrics").json()
+        self.assertEqual({"respostas_304": 1, "respostas_200": 2}, metrics["etag"])
+        self.assertEqual({"hits": 1, "misses": 3, "hit_ratio": 0.25},
+                         {k: metrics["cache"]["usuarios"][k] for k in ("hits", "misses", "hit_ratio")})
+    
+    def test_lote_usuarios(self):
+        """Testa POST, PUT e delete em lote de /usuarios/batch com resultado por item"""
+        criados = self.client.post("/usuarios/batch", json=[{"prenome": f"Lote{i}"} for i in range(3)]).json()
+        self.assertEqual({"total": 3, "sucessos": 3, "falhas": 0}, {k: criados[k] for k in ("total", "sucessos", "falhas")})
+        ids = [r["id"] for r in criados["resultados"]]
+        
+        atualizados = self.client.put("/usuarios/batch", json=[{"id": ids[0], "sobrenome": "Novo"}, {"id": "invalido"}]).json()
+        self.assertEqual([True, False], [r["ok"] for r in atualizados["resultados"]])
+        self.assertEqual("Novo", self.client.get(f"/usuarios/{ids[0]}").json()["sobrenome"])
+        self.assertEqual("Lote0", self.client.get(f"/usuarios/{ids[0]}").json()["prenome"])
+        
+        removidos = self.client.post("/usuarios/batch/delete", json=ids[:2] + [ids[0], "invalido"]).json()
+        self.assertEqual([True, True, False, False], [r["ok"] for r in removidos["resultados"]])
+        self.assertEqual(404, self.client.get(f"/usuarios/{ids[0]}").status_code)
+        self.assertEqual(200, self.client.get(f"/usuarios/{ids[2]}").status_code)
+        
+        self.assertEqual(400, self.client.post("/usuarios/batch", json=[]).status_code)
+    
+    def test_lote_obras(self):
+        """Testa POST, PUT e delete em lote de /obras/batch, incluindo as chaves de busca"""
+        criados = self.client.post("/obras/batch", json=[
+            {"codigo": "L1", "titulo_principal": "Dom Casmurro", "isbn": "111"},
+            {"codigo": "L2", "titulo_principal": "Iracema", "isbn": "222"}
+        ]).json()
+        self.assertEqual(2, criados["sucessos"])
+        ids = [r["id"] for r in criados["resultados"]]
+        
+        atualizados = self.client.put("/obras/batch", json=[{"id": ids[1], "titulo_principal": "Ubirajara"}]).json()
+        self.assertEqual(1, atualizados["sucessos"])
+        self.assertEqual("Ubirajara", self.client.get(f"/obras/{ids[1]}").json()["titulo_principal"])
+        doc = self.client.portal.call(api.app.state.obra_repo.collection.find_one, {"_id": ObjectId(ids[1])})
+        self.assertEqual(("222", "ubirajara"), (doc["isbn"], doc["busca_titulo"]))
+        
+        removidos = self.client.post("/obras/batch/delete", json=ids).json()
+        self.assertEqual({"total": 2, "sucessos": 2, "falhas": 0}, {k: removidos[k] for k in ("total", "sucessos", "falhas")})
+        self.assertEqual(404, self.client.get(f"/obras/{ids[1]}").status_code)
+    
+    def test_listagem_paginada(self):
+        """Testa a paginação por cursor (X-Next-Cursor/after) com projeção e filtros em GET /usuarios e /obras"""
+        itens = [{"prenome": f"P{i}", "sobrenome": "Silva" if i % 2 else "Souza"} for i in range(9)]
+        ids = [r["id"] for r in self.client.post("/usuarios/batch", json=itens).json()["resultados"]]
+        
+        paginas, after = [], None
+        while True:
+            params = {"limit": 2, "sobrenome": "Silva", "fields": "prenome", **({"after": after} if after else {})}
+            resposta = self.client.get("/usuarios", params=params)
+            paginas.append(resposta.json())
+            after = resposta.headers.get("x-next-cursor")
+            if after is None:
+                break
+        self.assertEqual([2, 2], [len(pagina) for pagina in paginas])
+        self.assertEqual([{"id": ids[i], "prenome": f"P{i}"} for i in (1, 3, 5, 7)], paginas[0] + paginas[1])
+        
+        self.client.post("/usuarios/batch", json=[{"prenome": "Extra"}] * 100)
+        resposta = self.client.get("/usuarios")
+        self.assertEqual(100, len(resposta.json()))
+        self.assertIn("x-next-cursor", resposta.headers)
+        self.assertEqual(400, self.client.get("/usuarios", params={"fields": "senha"}).status_code)
+        
+        self.client.post("/obras/batch", json=[{"codigo": "C1", "titulo_principal": "Iracema"}, {"codigo": "C2"}])
+        obras = self.client.get("/obras", params={"codigo": "C1"}).json()
+        self.assertEqual(["Iracema"], [obra["titulo_principal"] for obra in obras])
+        self.assertNotIn("busca_titulo", obras[0])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,53 @@
+from typing import Optional
+
+from .processors import CrudProcessor
+from .async_processors import AsyncHttpProcessor, AsyncPersistenciaCanonicoProcessor
+
+
+class AsyncIntegrationRouter:
+    """
+    Equivalente assíncrono do IntegrationRouter.
+    
+    A tradução da mensagem é a mesma (CrudProcessor/EstudanteProcessor); o
+    envio ao SB e a persistência canônica são aguardados sem bloquear o event
+    loop, então várias mensagens podem estar em andamento ao mesmo tempo.
+    """
+    
+    def __init__(self, http_processor: Optional[AsyncHttpProcessor] = None,
+                 persistencia_processor: Optional[AsyncPersistenciaCanonicoProcessor] = None):
+        self.crud_processor = CrudProcessor()
+        self.http_processor = http_processor or AsyncHttpProcessor()
+        self.persistencia_processor = persistencia_processor or AsyncPersistenciaCanonicoProcessor()
+    
+    async def start(self):
+        """Cria as tabelas do banco do integrador"""
+        await self.persistencia_processor.db.create_tables()
+    
+    async def route_message(self, channel: str, message: str) -> None:
+        """Rota principal que processa mensagens do Redis (Message Router)"""
+        try:
+            print(f"📥 Mensagem recebida do canal {channel}")
+            
+            # 1. Processa a mensagem CRUD (Message Translator)
+            request_data = self.crud_processor.process(message)
+            
+            if not request_data:
+                print("⚠️ Mensagem ignorada pelo processador")
+                return
+            
+            print(f"✅ JSON processado: {request_data['body']}")
+            
+            # 2. Envia requisição HTTP para sistema de destino
+            response = await self.http_processor.send_request(request_data)
+            
+            if response:
+                # 3. Persiste dados canônicos e mapeamento (apenas para Estudante/CREATE)
+                await self.persistencia_processor.process(request_data, response)
+            
+        except Exception as e:
+            print(f"❌ Erro no roteamento da mensagem: {e}")
+    
+    async def close(self):
+        """Fecha o cliente HTTP e o banco do integrador"""
+        await self.http_processor.close()
+        await self.persistencia_processor.close()
\ No newline at end of file
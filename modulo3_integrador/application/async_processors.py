@@ -0,0 +1,194 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+import httpx
+
+from .processors import HttpProcessor, PersistenciaCanonicoProcessor, EstudanteProcessor
+from ..infrastructure.models import AsyncIntegratorDatabase
+
+
+class AsyncHttpProcessor:
+    """
+    Equivalente assíncrono de HttpProcessor, sobre httpx.AsyncClient.
+    
+    O cliente mantém até `pool_size` conexões keep-alive, reutilizadas por
+    todas as mensagens em andamento. Timeouts e a política de novas tentativas
+    (métodos idempotentes, backoff exponencial com jitter) são os mesmos do
+    HttpProcessor, inclusive as variáveis de ambiente SB_HTTP_*.
+    """
+    
+    def __init__(self, pool_size: Optional[int] = None, connect_timeout: Optional[float] = None,
+                 read_timeout: Optional[float] = None, max_retries: Optional[int] = None,
+                 backoff: float = 0.2, max_backoff: float = 5.0):
+        self.pool_size = pool_size or int(os.getenv("SB_HTTP_POOL_SIZE", "10"))
+        connect = connect_timeout if connect_timeout is not None else float(os.getenv("SB_HTTP_CONNECT_TIMEOUT", "3"))
+        read = read_timeout if read_timeout is not None else float(os.getenv("SB_HTTP_READ_TIMEOUT", "10"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("SB_HTTP_RETRIES", "3"))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        )
+        self._latencies = deque(maxlen=1000)
+        self._in_flight = 0
+        self.counters = {"requisicoes": 0, "erros": 0, "retentativas": 0, "timeouts": 0,
+                         "pico_em_andamento": 0, "saturacoes": 0}
+    
+    async def send_request(self, request_data: Dict[str, Any]) -> Optional[str]:
+        """Envia requisição HTTP e retorna a resposta"""
+        try:
+            method = request_data["http_method"]
+            url = request_data["target_endpoint"]
+            headers = request_data.get("headers", {})
+            body = request_data.get("body") if method in ("POST", "PUT") else None
+            
+            print(f"📤 Enviando {method} para {url}")
+            print(f"📋 Body: {body}")
+            
+            response = await self._request_with_retry(method, url, body, headers)
+            
+            print(f"📥 Resposta HTTP: Status={response.status_code}, Body={response.text}")
+            
+            if response.status_code in [200, 201]:
+                return response.text
+            else:
+                print(f"⚠️ Resposta HTTP não esperada: {response.status_code}")
+                return None
+        
+        except Exception as e:
+            self.counters["erros"] += 1
+            print(f"❌ Erro ao enviar requisição HTTP: {e}")
+            return None
+    
+    async def _request_with_retry(self, method: str, url: str, body: Optional[str], headers: Dict[str, str]):
+        attempt = 0
+        while True:
+            try:
+                response = await self._request(method, url, body, headers)
+                retryable = (response.status_code in HttpProcessor.RETRY_STATUS
+                             and method in HttpProcessor.IDEMPOTENT_METHODS)
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                print(f"⚠️ {method} {url} respondeu {response.status_code}; nova tentativa")
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                if isinstance(e, httpx.TimeoutException):
+                    self.counters["timeouts"] += 1
+                retryable = method in HttpProcessor.IDEMPOTENT_METHODS or isinstance(e, httpx.ConnectTimeout)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                print(f"⚠️ {method} {url} falhou ({e.__class__.__name__}); nova tentativa")
+            attempt += 1
+            self.counters["retentativas"] += 1
+            await asyncio.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1))))
+    
+    async def _request(self, method: str, url: str, body: Optional[str], headers: Dict[str, str]):
+        """Uma requisição pelo cliente, registrando latência e ocupação do pool"""
+        if self._in_flight >= self.pool_size:
+            self.counters["saturacoes"] += 1
+        self._in_flight += 1
+        self.counters["requisicoes"] += 1
+        self.counters["pico_em_andamento"] = max(self.counters["pico_em_andamento"], self._in_flight)
+        inicio = time.perf_counter()
+        try:
+            return await self.client.request(method, url, content=body, headers=headers)
+        finally:
+            self._in_flight -= 1
+            self._latencies.append((time.perf_counter() - inicio) * 1000)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Contadores, ocupação do pool e latência (ms) das últimas requisições"""
+        latencies = sorted(self._latencies)
+        stats = {**self.counters, "em_andamento": self._in_flight, "pool_size": self.pool_size}
+        if latencies:
+            stats["latencia_ms"] = {
+                "p50": latencies[len(latencies) // 2],
+                "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+                "max": latencies[-1]
+            }
+        return stats
+    
+    async def close(self):
+        """Fecha as conexões do pool"""
+        await self.client.aclose()
+
+
+class AsyncPersistenciaCanonicoProcessor(PersistenciaCanonicoProcessor):
+    """
+    Equivalente assíncrono de PersistenciaCanonicoProcessor, sobre SQLite assíncrono.
+    
+    Monta os registros como a versão síncrona (montar_registros). O SQLite
+    aceita um escritor por vez, então, em vez de cada mensagem em andamento
+    abrir a sua transação e disputar o lock do arquivo, uma task do event loop
+    grava os registros pendentes em lotes de até `batch_size` mensagens, cada
+    lote em uma única transação (group commit). process só retorna depois do
+    commit do lote da sua mensagem.
+    """
+    
+    def __init__(self, db: Optional[AsyncIntegratorDatabase] = None, batch_size: int = 100):
+        self.db = db or AsyncIntegratorDatabase()
+        self.estudante_processor = EstudanteProcessor()
+        self.batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {"gravados": 0, "lotes": 0, "falhas": 0}
+    
+    async def process(self, operation_data: Dict[str, Any], response_data: str) -> None:
+        """Persiste dados canônicos e mapeamento após resposta HTTP"""
+        try:
+            registros = self.montar_registros(operation_data, response_data)
+            if not registros:
+                return
+            
+            if self._task is None:
+                self._queue = asyncio.Queue()
+                self._task = asyncio.create_task(self._writer_loop())
+            gravado = asyncio.get_running_loop().create_future()
+            await self._queue.put((registros, gravado))
+            await gravado
+            
+            estudante_canonico, id_mapping = registros
+            print(f"✅ EstudanteCanonico persistido: {id_mapping.id_canonico}")
+            print(f"✅ Mapeamento ID persistido: SGA={id_mapping.id_sga}, SB={id_mapping.id_sb}")
+        
+        except Exception as e:
+            print(f"❌ Erro ao persistir dados canônicos: {e}")
+    
+    async def _writer_loop(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                async with self.db.get_session() as session:
+                    async with session.begin():
+                        for (estudante_canonico, id_mapping), _ in batch:
+                            session.add(self._canonico_model(estudante_canonico))
+                            session.add(self._mapping_model(id_mapping))
+                self.counters["lotes"] += 1
+                self.counters["gravados"] += len(batch)
+                for _, gravado in batch:
+                    if not gravado.done():
+                        gravado.set_result(None)
+            except Exception as e:
+                self.counters["falhas"] += len(batch)
+                for _, gravado in batch:
+                    if not gravado.done():
+                        gravado.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def close(self):
+        """Conclui as gravações pendentes e fecha o banco do integrador"""
+        if self._task is not None:
+            await self._queue.join()
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.db.close()
\ No newline at end of file
@@ -44,5 +44,6 @@ class IntegrationRouter:
     
     def close(self):
         """Fecha recursos utilizados pelos processadores"""
+        self.http_processor.close()
         if hasattr(self.persistencia_processor, 'db'):
             self.persistencia_processor.db.close()
\ No newline at end of file
@@ -1,8 +1,15 @@
 import json
+import os
+import random
+import threading
+import time
 import uuid
 import requests
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from typing import Dict, Any, Optional, Tuple
 
 from ..domain.canonical_model import EstudanteCanonico, EstudanteIdMapping
 from ..infrastructure.models import IntegratorDatabase, EstudanteCanonicoModel, EstudanteIdMappingModel
@@ -141,65 +148,84 @@ class PersistenciaCanonicoProcessor:
     def process(self, operation_data: Dict[str, Any], response_data: str) -> None:
         """Persiste dados canônicos e mapeamento após resposta HTTP"""
         try:
-            operation = operation_data["operation"]
-            
-            # Verifica se deve processar (apenas Estudante/CREATE)
-            if (operation.entity.lower() != "estudante" or 
-                operation.operation != "CREATE"):
+            registros = self.montar_registros(operation_data, response_data)
+            if not registros:
                 return
-            
-            # Extrai IDs
-            response_json = json.loads(response_data)
-            id_sb = response_json.get("id")
-            
-            operation_json = json.loads(operation.data)
-            id_sga = str(operation_json.get("id", ""))
-            
-            # Gera ID canônico
-            id_canonico = str(uuid.uuid4())
-            
-            # Cria EstudanteCanonico
-            estudante_canonico = self.estudante_processor.estudante_para_estudante_canonico(
-                operation.data, id_canonico
-            )
-            
-            if not estudante_canonico:
-                print("❌ Erro ao criar EstudanteCanonico")
-                return
-            
-            # Cria mapeamento de IDs
-            id_mapping = EstudanteIdMapping(
-                id_canonico=id_canonico,
-                id_sga=id_sga,
-                id_sb=id_sb,
-                ultima_atualizacao=datetime.now().isoformat()
-            )
+            estudante_canonico, id_mapping = registros
             
             # Persiste no banco de dados
             self._persistir_canonico(estudante_canonico)
             self._persistir_mapping(id_mapping)
             
-            print(f"✅ EstudanteCanonico persistido: {id_canonico}")
-            print(f"✅ Mapeamento ID persistido: SGA={id_sga}, SB={id_sb}")
+            print(f"✅ EstudanteCanonico persistido: {id_mapping.id_canonico}")
+            print(f"✅ Mapeamento ID persistido: SGA={id_mapping.id_sga}, SB={id_mapping.id_sb}")
             
         except Exception as e:
             print(f"❌ Erro ao persistir dados canônicos: {e}")
     
+    def montar_registros(self, operation_data: Dict[str, Any],
+                         response_data: str) -> Optional[Tuple[EstudanteCanonico, EstudanteIdMapping]]:
+        """Monta o EstudanteCanonico e o mapeamento de IDs (None se a operação não deve ser persistida)"""
+        operation = operation_data["operation"]
+        
+        # Verifica se deve processar (apenas Estudante/CREATE)
+        if (operation.entity.lower() != "estudante" or 
+            operation.operation != "CREATE"):
+            return None
+        
+        # Extrai IDs
+        response_json = json.loads(response_data)
+        id_sb = response_json.get("id")
+        
+        operation_json = json.loads(operation.data)
+        id_sga = str(operation_json.get("id", ""))
+        
+        # Gera ID canônico
+        id_canonico = str(uuid.uuid4())
+        
+        # Cria EstudanteCanonico
+        estudante_canonico = self.estudante_processor.estudante_para_estudante_canonico(
+            operation.data, id_canonico
+        )
+        
+        if not estudante_canonico:
+            print("❌ Erro ao criar EstudanteCanonico")
+            return None
+        
+        # Cria mapeamento de IDs
+        id_mapping = EstudanteIdMapping(
+            id_canonico=id_canonico,
+            id_sga=id_sga,
+            id_sb=id_sb,
+            ultima_atualizacao=datetime.now().isoformat()
+        )
+        return estudante_canonico, id_mapping
+    
+    def _canonico_model(self, estudante_canonico: EstudanteCanonico) -> EstudanteCanonicoModel:
+        return EstudanteCanonicoModel(
+            id_canonico=estudante_canonico.id_canonico,
+            prenome=estudante_canonico.prenome,
+            sobrenome=estudante_canonico.sobrenome,
+            nome_completo=estudante_canonico.nome_completo,
+            data_de_nascimento=estudante_canonico.data_de_nascimento,
+            matricula=estudante_canonico.matricula,
+            status_academico=estudante_canonico.status_academico,
+            status_biblioteca=estudante_canonico.status_biblioteca
+        )
+    
+    def _mapping_model(self, id_mapping: EstudanteIdMapping) -> EstudanteIdMappingModel:
+        return EstudanteIdMappingModel(
+            id_canonico=id_mapping.id_canonico,
+            id_sga=id_mapping.id_sga,
+            id_sb=id_mapping.id_sb,
+            ultima_atualizacao=id_mapping.ultima_atualizacao
+        )
+    
     def _persistir_canonico(self, estudante_canonico: EstudanteCanonico) -> None:
         """Persiste EstudanteCanonico no banco"""
         session = self.db.get_session()
         try:
-            model = EstudanteCanonicoModel(
-                id_canonico=estudante_canonico.id_canonico,
-                prenome=estudante_canonico.prenome,
-                sobrenome=estudante_canonico.sobrenome,
-                nome_completo=estudante_canonico.nome_completo,
-                data_de_nascimento=estudante_canonico.data_de_nascimento,
-                matricula=estudante_canonico.matricula,
-                status_academico=estudante_canonico.status_academico,
-                status_biblioteca=estudante_canonico.status_biblioteca
-            )
-            session.add(model)
+            session.add(self._canonico_model(estudante_canonico))
             session.commit()
         except Exception as e:
             session.rollback()
@@ -211,13 +237,7 @@ class PersistenciaCanonicoProcessor:
         """Persiste mapeamento de IDs no banco"""
         session = self.db.get_session()
         try:
-            model = EstudanteIdMappingModel(
-                id_canonico=id_mapping.id_canonico,
-                id_sga=id_mapping.id_sga,
-                id_sb=id_mapping.id_sb,
-                ultima_atualizacao=id_mapping.ultima_atualizacao
-            )
-            session.add(model)
+            session.add(self._mapping_model(id_mapping))
             session.commit()
         except Exception as e:
             session.rollback()
@@ -227,7 +247,54 @@ class PersistenciaCanonicoProcessor:
 
 
 class HttpProcessor:
-    """Processa requisições HTTP para endpoints externos"""
+    """
+    Processa requisições HTTP para endpoints externos.
+    
+    Usa uma única requests.Session, cujo adapter mantém um pool de conexões
+    keep-alive por host de destino (até `pool_size` conexões por host; acima
+    disso a requisição espera uma conexão livre). Toda requisição tem timeout
+    de conexão e de leitura, para que um SB lento não trave o integrador.
+    
+    Métodos idempotentes (GET, PUT, DELETE) são repetidos até `max_retries`
+    vezes em erros de conexão, timeouts e respostas 502/503/504, com backoff
+    exponencial e jitter. Um POST só é repetido quando a conexão nem chegou a
+    ser aberta (timeout de conexão), para não criar o recurso em duplicidade.
+    Os valores padrão podem vir de variáveis de ambiente (SB_HTTP_*).
+    
+    O pool é por host: até `pool_hosts` hosts mantêm cada um até `pool_size`
+    conexões, e a ocupação e as saturações são contadas por host em stats().
+    """
+    
+    IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+    RETRY_STATUS = {502, 503, 504}
+    
+    def __init__(self, pool_size: Optional[int] = None, connect_timeout: Optional[float] = None,
+                 read_timeout: Optional[float] = None, max_retries: Optional[int] = None,
+                 backoff: float = 0.2, max_backoff: float = 5.0, pool_hosts: Optional[int] = None):
+        self.pool_size = pool_size or int(os.getenv("SB_HTTP_POOL_SIZE", "10"))
+        self.pool_hosts = pool_hosts or int(os.getenv("SB_HTTP_POOL_HOSTS", "10"))
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else float(os.getenv("SB_HTTP_CONNECT_TIMEOUT", "3")),
+            read_timeout if read_timeout is not None else float(os.getenv("SB_HTTP_READ_TIMEOUT", "10"))
+        )
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("SB_HTTP_RETRIES", "3"))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        
+        self.session = requests.Session()
+        # As repetições são feitas em send_request (backoff com jitter e contadores próprios)
+        adapter = HTTPAdapter(pool_connections=self.pool_hosts, pool_maxsize=self.pool_size,
+                              pool_block=True, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._in_flight = 0
+        # Por host (esquema + host:porta), como os pools do HTTPAdapter
+        self._in_flight_by_host: Dict[str, int] = {}
+        self._saturations_by_host: Dict[str, int] = {}
+        self.counters = {"requisicoes": 0, "erros": 0, "retentativas": 0, "timeouts": 0, "pico_em_andamento": 0}
     
     def send_request(self, request_data: Dict[str, Any]) -> Optional[str]:
         """Envia requisição HTTP e retorna a resposta"""
@@ -235,19 +302,12 @@ class HttpProcessor:
             method = request_data["http_method"]
             url = request_data["target_endpoint"]
             headers = request_data.get("headers", {})
-            body = request_data.get("body")
+            body = request_data.get("body") if method in ("POST", "PUT") else None
             
             print(f"📤 Enviando {method} para {url}")
             print(f"📋 Body: {body}")
             
-            if method == "POST":
-                response = requests.post(url, data=body, headers=headers)
-            elif method == "PUT":
-                response = requests.put(url, data=body, headers=headers)
-            elif method == "DELETE":
-                response = requests.delete(url, headers=headers)
-            else:
-                response = requests.get(url, headers=headers)
+            response = self._request_with_retry(method, url, body, headers)
             
             print(f"📥 Resposta HTTP: Status={response.status_code}, Body={response.text}")
             
@@ -258,5 +318,72 @@ class HttpProcessor:
                 return None
                 
         except Exception as e:
+            with self._lock:
+                self.counters["erros"] += 1
             print(f"❌ Erro ao enviar requisição HTTP: {e}")
-            return None
\ No newline at end of file
+            return None
+    
+    def _request_with_retry(self, method: str, url: str, body: Optional[str], headers: Dict[str, str]):
+        attempt = 0
+        while True:
+            try:
+                response = self._request(method, url, body, headers)
+                retryable = response.status_code in self.RETRY_STATUS and method in self.IDEMPOTENT_METHODS
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                print(f"⚠️ {method} {url} respondeu {response.status_code}; nova tentativa")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if isinstance(e, requests.Timeout):
+                    with self._lock:
+                        self.counters["timeouts"] += 1
+                retryable = method in self.IDEMPOTENT_METHODS or isinstance(e, requests.ConnectTimeout)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                print(f"⚠️ {method} {url} falhou ({e.__class__.__name__}); nova tentativa")
+            attempt += 1
+            with self._lock:
+                self.counters["retentativas"] += 1
+            # Backoff exponencial com jitter completo: espera aleatória em [0, backoff * 2^tentativa]
+            time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1))))
+    
+    def _request(self, method: str, url: str, body: Optional[str], headers: Dict[str, str]):
+        """Uma requisição pela sessão, registrando latência e ocupação do pool do host"""
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            host_in_flight = self._in_flight_by_host.get(host, 0)
+            if host_in_flight >= self.pool_size:
+                # Todas as conexões do pool do host em uso: a requisição espera uma ser devolvida
+                self._saturations_by_host[host] = self._saturations_by_host.get(host, 0) + 1
+            self._in_flight_by_host[host] = host_in_flight + 1
+            self._in_flight += 1
+            self.counters["requisicoes"] += 1
+            self.counters["pico_em_andamento"] = max(self.counters["pico_em_andamento"], self._in_flight)
+        inicio = time.perf_counter()
+        try:
+            return self.session.request(method=method, url=url, data=body, headers=headers, timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._in_flight_by_host[host] -= 1
+                self._latencies.append((time.perf_counter() - inicio) * 1000)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Contadores, ocupação e saturações do pool por host e latência (ms) das últimas requisições"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {**self.counters, "em_andamento": self._in_flight, "pool_size": self.pool_size,
+                     "pool_hosts": self.pool_hosts,
+                     "hosts": {host: {"em_andamento": in_flight, "saturacoes": self._saturations_by_host.get(host, 0)}
+                               for host, in_flight in self._in_flight_by_host.items()}}
+        if latencies:
+            stats["latencia_ms"] = {
+                "p50": latencies[len(latencies) // 2],
+                "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+                "max": latencies[-1]
+            }
+        return stats
+    
+    def close(self):
+        """Fecha as conexões do pool"""
+        self.session.close()
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Throughput do integrador: modo com threads x modo asyncio
+
+Entrega N eventos CREATE de Estudante ao pipeline completo (conversão, POST
+para o SB e gravação do modelo canônico em SQLite) nos dois modos do
+integrador: IntegrationRouter com um PartitionedDispatchPool de --workers
+threads (INTEGRATOR_MODE=threads) e AsyncIntegrationRouter com o despacho do
+AsyncRedisListener e --concorrencia mensagens em andamento
+(INTEGRATOR_MODE=asyncio). As mensagens são entregues direto ao despacho, no
+lugar do Redis. O SB é substituído por um servidor HTTP asyncio em outro
+processo, que responde após --latencia-ms sem limitar a concorrência (o
+servidor com threads de benchmark_listener.py satura antes dos dois modos) e
+sem disputar o GIL com o integrador medido.
+
+Uso (a partir da raiz do projeto):
+    python modulo3_integrador/benchmark_async.py [--mensagens 2000] [--workers 8] [--concorrencia 8,32] [--latencia-ms 5]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modulo3_integrador.application.async_integration_router import AsyncIntegrationRouter
+from modulo3_integrador.application.async_processors import AsyncHttpProcessor
+from modulo3_integrador.benchmark_listener import medir, mensagens
+from modulo3_integrador.infrastructure.async_redis_listener import AsyncRedisListener
+
+
+async def medir_asyncio(concorrencia: int, lote: list, url_sb: str, queue_size: int) -> float:
+    """Mensagens por segundo no modo asyncio com `concorrencia` mensagens em andamento"""
+    router = AsyncIntegrationRouter(AsyncHttpProcessor(pool_size=concorrencia))
+    process = router.crud_processor.process
+
+    def process_local(message_data: str):
+        request_data = process(message_data)
+        if request_data:
+            request_data["target_endpoint"] = f"{url_sb}/usuarios"
+        return request_data
+
+    router.crud_processor.process = process_local
+    await router.start()
+    try:
+        # Os prints por mensagem do router dominariam o tempo medido
+        with contextlib.redirect_stdout(io.StringIO()):
+            listener = AsyncRedisListener(concurrency=concorrencia, queue_size=queue_size)
+            listener.set_message_handler(router.route_message)
+            listener.start_workers()
+            inicio = time.perf_counter()
+            for mensagem in lote:
+                await listener.dispatch("crud-channel", mensagem)
+            await listener.join()
+            decorrido = time.perf_counter() - inicio
+            await listener.stop()
+            return len(lote) / decorrido
+    finally:
+        await router.close()
+
+
+def _servir_sb(latencia: float, porta):
+    """Substituto do SB (HTTP/1.1 keep-alive): cada requisição responde 200 com um id após `latencia` segundos"""
+    contador = itertools.count()
+
+    async def atender(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                cabecalho = await reader.readuntil(b"\r\n\r\n")
+                tamanho = 0
+                for linha in cabecalho.split(b"\r\n"):
+                    if linha.lower().startswith(b"content-length:"):
+                        tamanho = int(linha.split(b":", 1)[1])
+                await reader.readexactly(tamanho)
+                await asyncio.sleep(latencia)
+                corpo = json.dumps({"id": f"{next(contador):024x}"}).encode("utf-8")
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: " + str(len(corpo)).encode() + b"\r\n\r\n" + corpo)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    async def servir():
+        servidor = await asyncio.start_server(atender, "127.0.0.1", 0, backlog=1024)
+        porta.put(servidor.sockets[0].getsockname()[1])
+        await servidor.serve_forever()
+
+    asyncio.run(servir())
+
+
+def em_diretorio_temporario(func, *args) -> float:
+    """Executa a medição com um banco do integrador novo (integrador.db é criado no diretório atual)"""
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)
+        try:
+            return func(*args)
+        finally:
+            os.chdir(diretorio_original)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput do integrador: threads x asyncio")
+    parser.add_argument("--mensagens", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=8, help="Workers do modo com threads")
+    parser.add_argument("--concorrencia", default="8,32", help="Mensagens em andamento no modo asyncio, separadas por vírgula")
+    parser.add_argument("--latencia-ms", type=float, default=5.0, help="Latência simulada do SB por requisição")
+    parser.add_argument("--queue-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    porta = multiprocessing.Queue()
+    processo_sb = multiprocessing.Process(target=_servir_sb, args=(args.latencia_ms / 1000, porta), daemon=True)
+    processo_sb.start()
+    url_sb = f"http://127.0.0.1:{porta.get(timeout=10)}"
+    lote = mensagens(args.mensagens)
+    print(f"📊 {args.mensagens} eventos CREATE de Estudante, SB com {args.latencia_ms:.0f} ms por requisição")
+    try:
+        base = em_diretorio_temporario(medir, args.workers, lote, url_sb, args.queue_size)
+        print(f"  {'threads, ' + str(args.workers) + ' workers':24}: {base:8.0f} msg/s   (1.00x)")
+        for concorrencia in (int(c) for c in args.concorrencia.split(",")):
+            throughput = em_diretorio_temporario(
+                lambda: asyncio.run(medir_asyncio(concorrencia, lote, url_sb, args.queue_size)))
+            nome = f"asyncio, {concorrencia} em andamento"
+            print(f"  {nome:24}: {throughput:8.0f} msg/s   ({throughput / base:.2f}x)")
+    finally:
+        processo_sb.terminate()
+        processo_sb.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Throughput do integrador por número de workers do pool de despacho
+
+Entrega N eventos CREATE de Estudante ao IntegrationRouter real (conversão,
+POST para o SB e gravação do modelo canônico em SQLite), como faria a thread
+do RedisListener: primeiro um de cada vez na própria thread (workers=0, o
+comportamento anterior) e depois por um PartitionedDispatchPool com 1, 2, 4...
+workers. O SB é substituído por um servidor HTTP local que responde após
+--latencia-ms, e o banco do integrador fica em um diretório temporário, então
+não são necessários Redis nem a API do SB.
+
+Uso (a partir da raiz do projeto):
+    python modulo3_integrador/benchmark_listener.py [--mensagens 2000] [--workers 0,1,2,4,8] [--latencia-ms 5]
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modulo3_integrador.application.integration_router import IntegrationRouter
+from modulo3_integrador.infrastructure.dispatch_pool import PartitionedDispatchPool
+
+
+def servidor_sb(latencia: float) -> ThreadingHTTPServer:
+    """Substituto do SB: POST /usuarios responde 200 com um id após `latencia` segundos"""
+    contador = itertools.count()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Cabeçalho e corpo saem em escritas separadas; sem TCP_NODELAY o keep-alive esbarra no ACK atrasado
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latencia)
+            corpo = json.dumps({"id": f"{next(contador):024x}"}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def mensagens(total: int) -> list:
+    return [json.dumps({
+        "entity": "Estudante", "operation": "CREATE", "source": "ORM",
+        "data": json.dumps({"id": i, "nome_completo": f"Estudante {i}", "matricula": 100000 + i}),
+        "timestamp": "2024-01-01T10:00:00"
+    }) for i in range(total)]
+
+
+def criar_router(url_sb: str) -> IntegrationRouter:
+    """IntegrationRouter real, com o endpoint de destino apontando para o substituto do SB"""
+    router = IntegrationRouter()
+    process = router.crud_processor.process
+
+    def process_local(message_data: str):
+        request_data = process(message_data)
+        if request_data:
+            request_data["target_endpoint"] = f"{url_sb}/usuarios"
+        return request_data
+
+    router.crud_processor.process = process_local
+    return router
+
+
+def medir(workers: int, lote: list, url_sb: str, queue_size: int) -> float:
+    """Mensagens por segundo entregues ao router com `workers` workers (0 = na própria thread)"""
+    router = criar_router(url_sb)
+    try:
+        # Os prints por mensagem do router dominariam o tempo medido
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            if workers == 0:
+                for mensagem in lote:
+                    router.route_message("crud-channel", mensagem)
+            else:
+                pool = PartitionedDispatchPool(router.route_message, workers=workers, queue_size=queue_size)
+                pool.start()
+                for mensagem in lote:
+                    pool.submit("crud-channel", mensagem)
+                pool.join()
+                pool.stop()
+            return len(lote) / (time.perf_counter() - inicio)
+    finally:
+        router.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput do integrador por número de workers")
+    parser.add_argument("--mensagens", type=int, default=2000)
+    parser.add_argument("--workers", default="0,1,2,4,8", help="Quantidades de workers separadas por vírgula")
+    parser.add_argument("--latencia-ms", type=float, default=5.0, help="Latência simulada do SB por requisição")
+    parser.add_argument("--queue-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    servidor = servidor_sb(args.latencia_ms / 1000)
+    url_sb = f"http://127.0.0.1:{servidor.server_address[1]}"
+    lote = mensagens(args.mensagens)
+    diretorio_original = os.getcwd()
+    print(f"📊 {args.mensagens} eventos CREATE de Estudante, SB com {args.latencia_ms:.0f} ms por requisição")
+    try:
+        base = None
+        for workers in (int(w) for w in args.workers.split(",")):
+            # Banco do integrador novo a cada medição (integrador.db é criado no diretório atual)
+            with tempfile.TemporaryDirectory() as diretorio:
+                os.chdir(diretorio)
+                try:
+                    throughput = medir(workers, lote, url_sb, args.queue_size)
+                finally:
+                    os.chdir(diretorio_original)
+            base = base or throughput
+            nome = "na thread" if workers == 0 else f"{workers:2} workers"
+            print(f"  {nome:10}: {throughput:8.0f} msg/s   ({throughput / base:.2f}x)")
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
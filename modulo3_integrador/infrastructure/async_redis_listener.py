@@ -0,0 +1,97 @@
+import asyncio
+import zlib
+from typing import Awaitable, Callable, List, Optional
+
+import redis.asyncio as aioredis
+
+from .dispatch_pool import entity_key
+
+
+class AsyncRedisListener:
+    """
+    Equivalente asyncio do RedisListener com o pool de despacho.
+    
+    As mensagens do canal são distribuídas entre `concurrency` tasks worker
+    pelo hash de entity_key, como no PartitionedDispatchPool: a ordem é
+    preservada por entidade + ID e até `concurrency` mensagens ficam em
+    andamento ao mesmo tempo. Cada fila aceita `queue_size` mensagens; com
+    uma fila cheia, a leitura do canal aguarda (backpressure).
+    """
+    
+    def __init__(self, redis_url: str = "redis://localhost:6379", channel: str = "crud-channel",
+                 concurrency: int = 16, queue_size: int = 1000):
+        if concurrency < 1:
+            raise ValueError("concurrency deve ser maior que zero")
+        self.redis_url = redis_url
+        self.channel = channel
+        self.message_handler: Optional[Callable[[str, str], Awaitable[None]]] = None
+        self.queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=queue_size) for _ in range(concurrency)]
+        self._workers: List[asyncio.Task] = []
+        self.counters = {"recebidas": 0, "processadas": 0, "erros": 0}
+    
+    def set_message_handler(self, handler: Callable[[str, str], Awaitable[None]]):
+        """Define a corrotina que processa as mensagens recebidas"""
+        self.message_handler = handler
+    
+    def start_workers(self):
+        """Cria as tasks worker no event loop atual"""
+        if not self.message_handler:
+            raise ValueError("Message handler deve ser definido antes de iniciar")
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker_loop(q)) for q in self.queues]
+    
+    async def listen(self):
+        """Assina o canal e despacha as mensagens até a task ser cancelada"""
+        self.start_workers()
+        client = aioredis.from_url(self.redis_url, decode_responses=True)
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(self.channel)
+                print(f"🟢 Escutando canal Redis (asyncio): {self.channel}")
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        print(f"🔔 [{message['channel']}] {message['data']}")
+                        await self.dispatch(message["channel"], message["data"])
+        finally:
+            await client.aclose()
+    
+    async def dispatch(self, channel: str, data: str):
+        """Enfileira a mensagem na partição da sua chave (aguarda se a fila estiver cheia)"""
+        index = zlib.crc32(entity_key(data).encode("utf-8")) % len(self.queues)
+        await self.queues[index].put((channel, data))
+        self.counters["recebidas"] += 1
+    
+    async def _worker_loop(self, queue: asyncio.Queue):
+        while True:
+            channel, data = await queue.get()
+            try:
+                await self.message_handler(channel, data)
+                self.counters["processadas"] += 1
+            except Exception as e:
+                self.counters["erros"] += 1
+                print(f"❌ Erro ao processar mensagem: {e}")
+            finally:
+                queue.task_done()
+    
+    async def join(self):
+        """Aguarda o processamento das mensagens já enfileiradas"""
+        for queue in self.queues:
+            await queue.join()
+    
+    async def stop(self, timeout: float = 5.0):
+        """Conclui as mensagens enfileiradas (até `timeout` segundos) e encerra os workers"""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ {sum(q.qsize() for q in self.queues)} mensagens não processadas no encerramento")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        print("🛑 Listener Redis (asyncio) parado")
+    
+    def stats(self) -> dict:
+        """Profundidade de cada fila e contadores de processamento"""
+        return {"filas": [q.qsize() for q in self.queues], **self.counters}
\ No newline at end of file
@@ -0,0 +1,120 @@
+import json
+import queue
+import threading
+import time
+import zlib
+from typing import Callable, List, Optional
+
+# Sinaliza o fim da fila para o worker
+_STOP = object()
+
+
+def entity_key(message: str) -> str:
+    """
+    Chave de ordenação de um evento CRUD: entidade + ID de origem (ex.: "Estudante:42").
+    
+    Eventos sem ID legível compartilham a chave da entidade, e mensagens
+    inválidas a chave vazia; em ambos os casos continuam em ordem entre si.
+    """
+    try:
+        operation = json.loads(message)
+        entity = str(operation.get("entity", ""))
+    except (ValueError, AttributeError):
+        return ""
+    try:
+        entity_id = json.loads(operation.get("data") or "{}").get("id")
+    except (ValueError, AttributeError, TypeError):
+        entity_id = None
+    return entity if entity_id is None else f"{entity}:{entity_id}"
+
+
+class PartitionedDispatchPool:
+    """
+    Distribui as mensagens entre N workers, particionadas por chave.
+    
+    Cada mensagem vai para a fila do worker escolhido pelo hash da sua chave
+    (por padrão, entity_key): mensagens com a mesma chave são processadas por
+    um único worker, na ordem em que chegaram, enquanto chaves diferentes
+    seguem em paralelo. As filas são limitadas a `queue_size` mensagens; com
+    uma fila cheia, submit bloqueia a thread do listener (backpressure) até o
+    worker liberar espaço, e o tempo bloqueado é contado em `bloqueado_s`.
+    """
+    
+    def __init__(self, handler: Callable[[str, str], None], workers: int = 4, queue_size: int = 1000,
+                 key_func: Callable[[str], str] = entity_key):
+        if workers < 1:
+            raise ValueError("workers deve ser maior que zero")
+        self.handler = handler
+        self.key_func = key_func
+        self.queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.counters = {"recebidas": 0, "processadas": 0, "erros": 0, "bloqueios": 0, "bloqueado_s": 0.0}
+    
+    def start(self):
+        """Inicia as threads worker"""
+        if self.threads:
+            return
+        for index, worker_queue in enumerate(self.queues):
+            thread = threading.Thread(target=self._worker_loop, args=(worker_queue,),
+                                      name=f"dispatch-{index}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        print(f"🟢 Pool de despacho iniciado: {len(self.queues)} workers")
+    
+    def partition(self, message: str) -> int:
+        """Índice da fila da mensagem (crc32 da chave: estável entre execuções)"""
+        return zlib.crc32(self.key_func(message).encode("utf-8")) % len(self.queues)
+    
+    def submit(self, channel: str, message: str) -> None:
+        """Enfileira a mensagem na partição da sua chave, bloqueando enquanto a fila estiver cheia"""
+        worker_queue = self.queues[self.partition(message)]
+        try:
+            worker_queue.put_nowait((channel, message))
+        except queue.Full:
+            inicio = time.perf_counter()
+            worker_queue.put((channel, message))
+            with self._lock:
+                self.counters["bloqueios"] += 1
+                self.counters["bloqueado_s"] += time.perf_counter() - inicio
+        with self._lock:
+            self.counters["recebidas"] += 1
+    
+    def _worker_loop(self, worker_queue: queue.Queue):
+        while True:
+            item = worker_queue.get()
+            try:
+                if item is _STOP:
+                    return
+                try:
+                    self.handler(*item)
+                    counter = "processadas"
+                except Exception as e:
+                    print(f"❌ Erro ao processar mensagem: {e}")
+                    counter = "erros"
+                with self._lock:
+                    self.counters[counter] += 1
+            finally:
+                worker_queue.task_done()
+    
+    def join(self):
+        """Aguarda o processamento de todas as mensagens já enfileiradas"""
+        for worker_queue in self.queues:
+            worker_queue.join()
+    
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Processa o que já está nas filas e encerra os workers"""
+        if not self.threads:
+            return
+        for worker_queue in self.queues:
+            worker_queue.put(_STOP)
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+        self.threads = []
+        print("🛑 Pool de despacho parado")
+    
+    def stats(self) -> dict:
+        """Profundidade de cada fila e contadores de processamento"""
+        with self._lock:
+            counters = dict(self.counters)
+        return {"filas": [q.qsize() for q in self.queues], **counters}
@@ -1,7 +1,11 @@
-from sqlalchemy import Column, String, create_engine
+from typing import Optional
+from sqlalchemy import Column, String
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from .sqlite_profile import SQLiteProfile
+
 Base = declarative_base()
 
 
@@ -28,8 +32,9 @@ class EstudanteIdMappingModel(Base):
 
 
 class IntegratorDatabase:
-    def __init__(self, db_name: str = "integrador.db"):
-        self.engine = create_engine(f"sqlite:///{db_name}")
+    def __init__(self, db_name: str = "integrador.db", profile: Optional[SQLiteProfile] = None):
+        self.profile = profile or SQLiteProfile()
+        self.engine = self.profile.create_engine(db_name)
         Base.metadata.create_all(self.engine)
         self.SessionLocal = sessionmaker(bind=self.engine)
     
@@ -37,4 +42,24 @@ class IntegratorDatabase:
         return self.SessionLocal()
     
     def close(self):
-        self.engine.dispose()
\ No newline at end of file
+        self.engine.dispose()
+
+
+class AsyncIntegratorDatabase:
+    """Equivalente assíncrono de IntegratorDatabase, sobre sqlalchemy.ext.asyncio + aiosqlite"""
+    
+    def __init__(self, db_name: str = "integrador.db", profile: Optional[SQLiteProfile] = None):
+        self.profile = profile or SQLiteProfile()
+        self.engine = self.profile.create_async_engine(db_name)
+        self.SessionLocal = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+    
+    async def create_tables(self):
+        """Cria as tabelas (equivalente ao create_all do IntegratorDatabase)"""
+        async with self.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    
+    def get_session(self):
+        return self.SessionLocal()
+    
+    async def close(self):
+        await self.engine.dispose()
\ No newline at end of file
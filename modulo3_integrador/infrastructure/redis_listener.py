@@ -1,17 +1,33 @@
 import redis
 import json
 import threading
-from typing import Callable, Any
+from typing import Callable, Any, Optional
+
+from .dispatch_pool import PartitionedDispatchPool
 
 
 class RedisListener:
-    def __init__(self, redis_url: str = "redis://localhost:6379", channel: str = "crud-channel"):
+    """
+    Escuta o canal de eventos CRUD e repassa cada mensagem ao handler.
+    
+    Com workers=0 o handler roda na própria thread do listener, uma mensagem
+    por vez. Com workers > 0 as mensagens são distribuídas por um
+    PartitionedDispatchPool: a ordem é preservada por entidade + ID, chaves
+    diferentes são processadas em paralelo, e filas cheias (queue_size)
+    seguram a leitura do canal.
+    """
+    
+    def __init__(self, redis_url: str = "redis://localhost:6379", channel: str = "crud-channel",
+                 workers: int = 0, queue_size: int = 1000):
         self.redis_client = redis.from_url(redis_url, decode_responses=True)
         self.pubsub = self.redis_client.pubsub()
         self.channel = channel
         self.message_handler: Callable[[str, str], None] = None
         self.is_listening = False
         self.listener_thread = None
+        self.workers = workers
+        self.queue_size = queue_size
+        self.dispatch_pool: Optional[PartitionedDispatchPool] = None
     
     def set_message_handler(self, handler: Callable[[str, str], None]):
         """Define o handler para processar mensagens recebidas"""
@@ -26,6 +42,10 @@ class RedisListener:
         if not self.message_handler:
             raise ValueError("Message handler deve ser definido antes de iniciar")
         
+        if self.workers > 0:
+            self.dispatch_pool = PartitionedDispatchPool(self.message_handler, self.workers, self.queue_size)
+            self.dispatch_pool.start()
+        
         self.pubsub.subscribe(self.channel)
         self.is_listening = True
         
@@ -48,17 +68,24 @@ class RedisListener:
                     
                     print(f"🔔 [{channel}] {data}")
                     
-                    # Chama o handler definido
-                    if self.message_handler:
-                        try:
-                            self.message_handler(channel, data)
-                        except Exception as e:
-                            print(f"❌ Erro ao processar mensagem: {e}")
+                    self._dispatch(channel, data)
         except Exception as e:
             print(f"❌ Erro no loop de escuta: {e}")
         finally:
             self.is_listening = False
     
+    def _dispatch(self, channel: str, data: str):
+        """Entrega a mensagem ao pool de workers ou, sem pool, chama o handler nesta thread"""
+        if self.dispatch_pool:
+            self.dispatch_pool.submit(channel, data)
+            return
+        
+        if self.message_handler:
+            try:
+                self.message_handler(channel, data)
+            except Exception as e:
+                print(f"❌ Erro ao processar mensagem: {e}")
+    
     def stop(self):
         """Para a escuta do canal Redis"""
         if not self.is_listening:
@@ -71,9 +98,16 @@ class RedisListener:
         if self.listener_thread and self.listener_thread.is_alive():
             self.listener_thread.join(timeout=5)
         
+        if self.dispatch_pool:
+            self.dispatch_pool.stop()
+            self.dispatch_pool = None
+        
         print("🛑 Listener Redis parado")
     
     def close(self):
         """Fecha a conexão Redis"""
         self.stop()
+        if self.dispatch_pool:
+            self.dispatch_pool.stop()
+            self.dispatch_pool = None
         self.redis_client.close()
\ No newline at end of file
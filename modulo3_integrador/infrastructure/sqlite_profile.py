@@ -0,0 +1,117 @@
+# Cópia idêntica de modulo1_orm/infrastructure/sqlite_profile.py: cada módulo é implantado e testado
+# isoladamente (como redis_publisher.py); correções devem ser aplicadas nas duas.
+from dataclasses import dataclass
+from typing import List, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_LEVELS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+@dataclass
+class SQLiteProfile:
+    """
+    Perfil de desempenho do SQLite aplicado a cada nova conexão do pool.
+    
+    O perfil padrão usa WAL com synchronous=NORMAL: escritores não bloqueiam
+    leitores e cada commit deixa de fazer fsync do arquivo principal (uma
+    queda de energia pode perder as últimas transações, mas nunca corrompe
+    o banco). Campos com valor None mantêm o padrão do SQLite.
+    """
+    journal_mode: Optional[str] = "WAL"
+    synchronous: Optional[str] = "NORMAL"
+    mmap_size: Optional[int] = 256 * 1024 * 1024  # bytes
+    cache_size: Optional[int] = -64000  # valores negativos são KiB
+    busy_timeout: Optional[int] = 5000  # ms
+    temp_store: Optional[str] = "MEMORY"
+    use_queue_pool: bool = True
+    pool_size: int = 5
+    max_overflow: int = 10
+    
+    @classmethod
+    def sqlite_defaults(cls) -> "SQLiteProfile":
+        """Perfil sem ajustes: rollback journal, synchronous=FULL e pool padrão do SQLAlchemy"""
+        return cls(journal_mode=None, synchronous=None, mmap_size=None, cache_size=None,
+                   busy_timeout=None, temp_store=None, use_queue_pool=False)
+    
+    def pragmas(self) -> List[str]:
+        """Retorna os comandos PRAGMA executados em cada conexão"""
+        pragmas = []
+        if self.journal_mode is not None:
+            pragmas.append(f"PRAGMA journal_mode={self._checked(self.journal_mode, JOURNAL_MODES)}")
+        if self.synchronous is not None:
+            pragmas.append(f"PRAGMA synchronous={self._checked(self.synchronous, SYNCHRONOUS_LEVELS)}")
+        if self.mmap_size is not None:
+            pragmas.append(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        if self.cache_size is not None:
+            pragmas.append(f"PRAGMA cache_size={int(self.cache_size)}")
+        if self.busy_timeout is not None:
+            pragmas.append(f"PRAGMA busy_timeout={int(self.busy_timeout)}")
+        if self.temp_store is not None:
+            pragmas.append(f"PRAGMA temp_store={self._checked(self.temp_store, TEMP_STORES)}")
+        return pragmas
+    
+    def _checked(self, value: str, allowed: set) -> str:
+        """Valida valores textuais antes de interpolá-los no PRAGMA"""
+        normalized = value.upper()
+        if normalized not in allowed:
+            raise ValueError(f"Valor de PRAGMA inválido: {value} (esperado um de {sorted(allowed)})")
+        return normalized
+    
+    def create_engine(self, db_name: str) -> Engine:
+        """Cria o engine SQLAlchemy com o pool e os PRAGMAs do perfil"""
+        url = f"sqlite:///{db_name}"
+        if not self.use_queue_pool:
+            engine = create_engine(url)
+        elif db_name == ":memory:":
+            # Um banco em memória só existe dentro de uma única conexão
+            engine = create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+        else:
+            engine = create_engine(
+                url,
+                poolclass=QueuePool,
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                connect_args={"check_same_thread": False}
+            )
+        
+        pragmas = self.pragmas()
+        if pragmas:
+            event.listen(engine, "connect", self._connect_hook(pragmas))
+        return engine
+    
+    def create_async_engine(self, db_name: str) -> AsyncEngine:
+        """Cria o engine assíncrono (aiosqlite) com o pool e os PRAGMAs do perfil"""
+        url = f"sqlite+aiosqlite:///{db_name}"
+        if not self.use_queue_pool:
+            engine = create_async_engine(url)
+        elif db_name == ":memory:":
+            engine = create_async_engine(url, poolclass=StaticPool)
+        else:
+            # O padrão do aiosqlite para arquivos é NullPool (uma conexão nova por sessão)
+            engine = create_async_engine(
+                url,
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow
+            )
+        
+        pragmas = self.pragmas()
+        if pragmas:
+            event.listen(engine.sync_engine, "connect", self._connect_hook(pragmas))
+        return engine
+    
+    def _connect_hook(self, pragmas: List[str]):
+        """Cria o listener de conexão que aplica os PRAGMAs"""
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+        return apply_pragmas
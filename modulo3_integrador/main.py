@@ -1,3 +1,5 @@
+import asyncio
+import os
 import signal
 import sys
 import time
@@ -7,7 +9,11 @@ from application.integration_router import IntegrationRouter
 
 class IntegratorMain:
     def __init__(self):
-        self.redis_listener = RedisListener()
+        # Workers em paralelo (ordem preservada por entidade + ID); 0 processa na thread do listener
+        self.redis_listener = RedisListener(
+            workers=int(os.getenv("INTEGRATOR_WORKERS", "4")),
+            queue_size=int(os.getenv("INTEGRATOR_QUEUE_SIZE", "1000"))
+        )
         self.integration_router = IntegrationRouter()
         self.running = True
     
@@ -59,7 +65,54 @@ class IntegratorMain:
         print("✅ Integrador parado com sucesso")
 
 
+class AsyncIntegratorMain:
+    """Integrador em um único event loop (INTEGRATOR_MODE=asyncio)"""
+    
+    def __init__(self):
+        # Importados só neste modo: o modo com threads não depende de httpx, aiosqlite e redis.asyncio
+        from infrastructure.async_redis_listener import AsyncRedisListener
+        from application.async_integration_router import AsyncIntegrationRouter
+        
+        # Mensagens em andamento ao mesmo tempo (ordem preservada por entidade + ID)
+        self.redis_listener = AsyncRedisListener(
+            concurrency=int(os.getenv("INTEGRATOR_CONCURRENCY", "16")),
+            queue_size=int(os.getenv("INTEGRATOR_QUEUE_SIZE", "1000"))
+        )
+        self.integration_router = AsyncIntegrationRouter()
+    
+    async def start(self):
+        """Inicia o sistema integrador"""
+        print("🚀 Sistema Integrador Python (asyncio)")
+        print("📡 Conectando ao Redis...")
+        
+        await self.integration_router.start()
+        self.redis_listener.set_message_handler(self.integration_router.route_message)
+        
+        loop = asyncio.get_running_loop()
+        listen_task = asyncio.create_task(self.redis_listener.listen())
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, listen_task.cancel)
+        
+        print("✅ Integrador iniciado com sucesso!")
+        print("📖 Para parar, pressione Ctrl+C")
+        
+        try:
+            await listen_task
+        except asyncio.CancelledError:
+            print("\n🛑 Sinal recebido, parando integrador...")
+        except Exception as e:
+            print(f"❌ Erro no integrador: {e}")
+        finally:
+            print("🧹 Limpando recursos...")
+            await self.redis_listener.stop()
+            await self.integration_router.close()
+            print("✅ Integrador parado com sucesso")
+
+
 def main():
+    if os.getenv("INTEGRATOR_MODE", "threads") in ("asyncio", "async"):
+        asyncio.run(AsyncIntegratorMain().start())
+        return
     integrator = IntegratorMain()
     integrator.start()
 
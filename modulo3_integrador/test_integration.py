@@ -1,9 +1,20 @@
 import unittest
+import asyncio
 import json
+import os
+import tempfile
+import threading
 import time
-from unittest.mock import Mock, patch
+import requests
+from unittest.mock import AsyncMock, Mock, patch
+from sqlalchemy import select
 from application.processors import CrudProcessor, EstudanteProcessor, HttpProcessor
 from application.integration_router import IntegrationRouter
+from infrastructure.dispatch_pool import PartitionedDispatchPool, entity_key
+from application.async_integration_router import AsyncIntegrationRouter
+from application.async_processors import AsyncHttpProcessor, AsyncPersistenciaCanonicoProcessor
+from infrastructure.async_redis_listener import AsyncRedisListener
+from infrastructure.models import AsyncIntegratorDatabase, EstudanteIdMappingModel
 
 
 class TestEstudanteProcessor(unittest.TestCase):
@@ -96,7 +107,7 @@ class TestHttpProcessor(unittest.TestCase):
     def setUp(self):
         self.processor = HttpProcessor()
     
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_send_post_request(self, mock_post):
         """Testa envio de requisição POST"""
         # Mock da resposta
@@ -117,13 +128,54 @@ class TestHttpProcessor(unittest.TestCase):
         self.assertIsNotNone(response)
         self.assertIn("507f1f77bcf86cd799439011", response)
         mock_post.assert_called_once()
+        self.assertEqual((3.0, 10.0), mock_post.call_args[1]['timeout'])
+    
+    @patch('requests.Session.request')
+    def test_retry_idempotente(self, mock_request):
+        """Testa as novas tentativas (erro de conexão e 503) em PUT e a ausência delas em POST"""
+        processor = HttpProcessor(backoff=0, max_retries=3)
+        indisponivel, ok = Mock(status_code=503, text=""), Mock(status_code=200, text='{"id": "1"}')
+        mock_request.side_effect = [requests.ConnectionError("recusada"), indisponivel, ok]
+        
+        request_data = {"http_method": "PUT", "target_endpoint": "http://localhost:8080/usuarios/1", "body": "{}"}
+        self.assertEqual('{"id": "1"}', processor.send_request(request_data))
+        self.assertEqual(3, mock_request.call_count)
+        self.assertEqual(2, processor.stats()["retentativas"])
+        
+        mock_request.reset_mock()
+        mock_request.side_effect = [requests.ConnectionError("recusada"), ok]
+        self.assertIsNone(processor.send_request({**request_data, "http_method": "POST"}))
+        self.assertEqual(1, mock_request.call_count)
+        self.assertEqual(1, processor.stats()["erros"])
+    
+    @patch('requests.Session.request')
+    def test_saturacao_por_host(self, mock_request):
+        """Testa que a ocupação e as saturações do pool são contadas por host"""
+        processor = HttpProcessor(pool_size=1, pool_hosts=2)
+        liberar = threading.Event()
+        mock_request.side_effect = lambda **kwargs: liberar.wait(5) and Mock(status_code=200, text="{}")
+        
+        urls = ["http://sb-a:8080/usuarios", "http://sb-a:8080/usuarios", "http://sb-b:8080/usuarios"]
+        threads = [threading.Thread(target=processor.send_request,
+                                    args=({"http_method": "GET", "target_endpoint": url},)) for url in urls]
+        for thread in threads:
+            thread.start()
+        while processor.stats()["em_andamento"] < len(urls):
+            time.sleep(0.001)
+        liberar.set()
+        for thread in threads:
+            thread.join()
+        
+        hosts = processor.stats()["hosts"]
+        self.assertEqual({"em_andamento": 0, "saturacoes": 1}, hosts["http://sb-a:8080"])
+        self.assertEqual({"em_andamento": 0, "saturacoes": 0}, hosts["http://sb-b:8080"])
 
 
 class TestIntegrationRouter(unittest.TestCase):
     def setUp(self):
         self.router = IntegrationRouter()
     
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_route_message_complete_flow(self, mock_post):
         """Testa o fluxo completo de roteamento de mensagem"""
         # Mock da resposta HTTP
@@ -153,6 +205,102 @@ class TestIntegrationRouter(unittest.TestCase):
         self.assertIn('{"prenome": "João", "sobrenome": "Silva"', call_args[1]['data'])
 
 
+class TestPartitionedDispatchPool(unittest.TestCase):
+    def _mensagem(self, id_sga, seq):
+        return json.dumps({"entity": "Estudante", "operation": "CREATE", "source": "ORM",
+                           "data": json.dumps({"id": id_sga, "seq": seq})})
+    
+    def test_entity_key(self):
+        """Testa a chave de ordenação (entidade + ID de origem)"""
+        self.assertEqual("Estudante:7", entity_key(self._mensagem(7, 0)))
+        self.assertEqual("Estudante", entity_key(json.dumps({"entity": "Estudante", "data": "{}"})))
+        self.assertEqual("", entity_key("não é JSON"))
+    
+    def test_ordem_por_chave(self):
+        """Testa que mensagens da mesma chave são processadas em ordem, com chaves em paralelo"""
+        processadas = []
+        
+        def handler(channel, message):
+            dados = json.loads(json.loads(message)["data"])
+            time.sleep(0.001 * (dados["id"] % 3))
+            processadas.append((dados["id"], dados["seq"]))
+        
+        pool = PartitionedDispatchPool(handler, workers=4, queue_size=2)
+        pool.start()
+        for seq in range(10):
+            for id_sga in range(8):
+                pool.submit("crud-channel", self._mensagem(id_sga, seq))
+        pool.join()
+        pool.stop()
+        
+        for id_sga in range(8):
+            self.assertEqual(list(range(10)), [seq for i, seq in processadas if i == id_sga])
+        stats = pool.stats()
+        self.assertEqual((80, 80, 0), (stats["recebidas"], stats["processadas"], stats["erros"]))
+        self.assertEqual([0, 0, 0, 0], stats["filas"])
+        self.assertGreater(stats["bloqueios"], 0)
+
+
+class TestAsyncIntegrationRouter(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = AsyncIntegratorDatabase(os.path.join(self.tmpdir.name, "integrador.db"))
+        self.http_processor = AsyncHttpProcessor()
+        self.router = AsyncIntegrationRouter(self.http_processor, AsyncPersistenciaCanonicoProcessor(self.db))
+        await self.router.start()
+    
+    async def asyncTearDown(self):
+        await self.router.close()
+        self.tmpdir.cleanup()
+    
+    async def test_route_message_persiste_mapeamento(self):
+        """Testa o fluxo assíncrono: POST para o SB e gravação do mapeamento de IDs"""
+        message = json.dumps({
+            "entity": "Estudante",
+            "operation": "CREATE",
+            "source": "ORM",
+            "data": '{"id": 1, "nome_completo": "João Silva", "matricula": 123456}',
+            "timestamp": "2024-01-01T10:00:00"
+        })
+        
+        with patch.object(self.http_processor, "send_request",
+                          AsyncMock(return_value='{"id": "507f1f77bcf86cd799439011"}')) as mock_send:
+            await self.router.route_message("crud-channel", message)
+        
+        request_data = mock_send.call_args[0][0]
+        self.assertEqual("POST", request_data["http_method"])
+        self.assertEqual("http://localhost:8080/usuarios", request_data["target_endpoint"])
+        
+        async with self.db.get_session() as session:
+            mappings = (await session.execute(select(EstudanteIdMappingModel))).scalars().all()
+        self.assertEqual([("1", "507f1f77bcf86cd799439011")], [(m.id_sga, m.id_sb) for m in mappings])
+
+
+class TestAsyncRedisListener(unittest.IsolatedAsyncioTestCase):
+    async def test_ordem_por_chave(self):
+        """Testa que o despacho assíncrono mantém a ordem por chave com várias mensagens em andamento"""
+        processadas = []
+        
+        async def handler(channel, message):
+            dados = json.loads(json.loads(message)["data"])
+            await asyncio.sleep(0.001 * (dados["id"] % 3))
+            processadas.append((dados["id"], dados["seq"]))
+        
+        listener = AsyncRedisListener(concurrency=4, queue_size=2)
+        listener.set_message_handler(handler)
+        listener.start_workers()
+        for seq in range(10):
+            for id_sga in range(8):
+                await listener.dispatch("crud-channel", json.dumps(
+                    {"entity": "Estudante", "data": json.dumps({"id": id_sga, "seq": seq})}))
+        await listener.stop()
+        
+        for id_sga in range(8):
+            self.assertEqual(list(range(10)), [seq for i, seq in processadas if i == id_sga])
+        stats = listener.stats()
+        self.assertEqual((80, 80, 0), (stats["recebidas"], stats["processadas"], stats["erros"]))
+
+
 if __name__ == '__main__':
     # Executa os testes
     unittest.main()
\ No newline at end of file